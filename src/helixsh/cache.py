@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+from helixsh.trace import iter_trace_tasks, task_path
 
 
 @dataclass(frozen=True)
@@ -27,3 +29,78 @@ def summarize_cache(total_tasks: int, cached_tasks: int, invalidated: list[str])
         invalidated_processes=tuple(invalidated),
         recommendation=recommendation,
     )
+
+
+@dataclass
+class ProcessCacheStats:
+    process: str
+    total: int
+    cached: int
+    invalidated: int   # re-ran although the previous run completed the same task
+
+
+@dataclass
+class TraceCacheReport:
+    trace_file: str
+    previous_trace: str | None
+    total_tasks: int
+    cached_tasks: int
+    new_tasks: int     # no same-named task in the previous run
+    report: CacheReport
+    processes: list[ProcessCacheStats] = field(default_factory=list)
+    warnings: list[str] = field(default_factory=list)
+
+
+def summarize_cache_from_traces(trace: str, previous_trace: str | None = None) -> TraceCacheReport:
+    """Derive cache-report inputs from a (resumed) run's trace.
+
+    Cached counts come from the `CACHED` status.  With the previous run's
+    trace, a task that re-executed even though a same-named task completed
+    there under a different hash is counted as invalidated — the signature
+    of accidental cache busting (changed inputs, params or container).
+    Processes are reported by their fully qualified path (`task_path`).
+    """
+    warnings: list[str] = []
+    previous: dict[str, str] = {}
+    if previous_trace:
+        try:
+            for t in iter_trace_tasks(previous_trace, warnings):
+                if t.status.upper() in {"COMPLETED", "CACHED"} and t.hash:
+                    previous[t.name] = t.hash
+        except (FileNotFoundError, ValueError) as exc:
+            warnings.append(f"previous: {exc}")
+
+    stats: dict[str, ProcessCacheStats] = {}
+    total = cached = new = 0
+    try:
+        for t in iter_trace_tasks(trace, warnings):
+            process = task_path(t.name)
+            s = stats.get(process)
+            if s is None:
+                s = stats[process] = ProcessCacheStats(process=process, total=0, cached=0, invalidated=0)
+            s.total += 1
+            total += 1
+            if t.status.upper() == "CACHED":
+                s.cached += 1
+                cached += 1
+            elif previous_trace:
+                prev_hash = previous.get(t.name)
+                if prev_hash is None:
+                    new += 1
+                elif prev_hash != t.hash:
+                    s.invalidated += 1
+    except (FileNotFoundError, ValueError) as exc:
+        warnings.append(str(exc))
+
+    processes = sorted(stats.values(), key=lambda s: (-s.invalidated, s.process))
+    invalidated = [s.process for s in processes if s.invalidated]
+    return TraceCacheReport(
+        trace_file=trace,
+        previous_trace=previous_trace,
+        total_tasks=total,
+        cached_tasks=cached,
+        new_tasks=new,
+        report=summarize_cache(total, cached, invalidated),
+        processes=processes,
+        warnings=warnings,
+    )
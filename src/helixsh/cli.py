@@ -7,6 +7,7 @@ import hashlib
 import json
 import subprocess
 import sys
+import time
 from dataclasses import asdict, dataclass
 from datetime import UTC, datetime
 from pathlib import Path
@@ -26,8 +27,8 @@ from helixsh.nextflow import (
 from helixsh.schema import load_json, validate_params
 from helixsh.workflow import container_violations, parse_process_nodes
 from helixsh.diagnostics import diagnose_failure
-from helixsh.cache import summarize_cache
-from helixsh.rbac import check_access
+from helixsh.cache import summarize_cache, summarize_cache_from_traces
+from helixsh.rbac import WRITE_OPTIONS, check_access
 from helixsh.reporting import build_validation_report, write_report
 from helixsh.profiles import recommend_profile
 from helixsh.provenance import make_provenance_record
@@ -44,16 +45,9 @@ from helixsh.claude_cli import generate_plan
 from helixsh.empirical import fit_calibration_from_file, write_calibration
 from helixsh.mcp_runtime import execute_approved_proposal
 from helixsh.lifecycle import create_execution_context
-from helixsh.lifecycle import sha256_file, file_size_bytes
-from helixsh.provenance_db import (
-    add_audit_event,
-    create_execution,
-    finish_execution,
-    get_execution_bundle,
-    init_db,
-    insert_container,
-    insert_input,
-)
+from helixsh.lifecycle import DEFAULT_FINGERPRINT_BLOCKS, compare_fingerprints, file_size_bytes
+from helixsh.hashing import ALGORITHMS as HASH_ALGORITHMS, DEFAULT_ALGORITHM as DEFAULT_HASH_ALGORITHM
+from helixsh.provenance_db import ProvenanceSession, get_execution_bundle, init_db
 from helixsh.haps import AgentResponse, run_agent_task
 from helixsh.arbitration import arbitrate
 from helixsh.compliance import evaluate_compliance
@@ -67,7 +61,30 @@ from helixsh.bioconda import (
 from helixsh.nf_launch import LaunchConfig, check_auth as nf_check_auth, launch_pipeline
 from helixsh.samplesheet import generate_samplesheet, validate_samplesheet
 from helixsh.ref_genome import download_genome, list_genomes, plan_download
-from helixsh.trace import parse_trace
+from helixsh.trace import (
+    DEFAULT_TRACE_GLOB,
+    GROUP_KEYS,
+    SKETCH_METRICS,
+    TraceFollower,
+    TraceSummary,
+    find_trace_files,
+    group_trace,
+    parse_trace,
+    summarize_traces,
+)
+from helixsh.timeline import build_timeline, write_timeline
+from helixsh.critical_path import analyze_critical_path
+from helixsh.queue_wait import analyze_queue_wait
+from helixsh.io_profile import profile_io
+from helixsh.rightsize import rightsize_trace, write_rightsize_config
+from helixsh.waste import analyze_waste
+from helixsh.trace_diff import DEFAULT_METRICS as DEFAULT_DIFF_METRICS, diff_traces
+from helixsh.stragglers import STRAGGLER_METRICS, find_stragglers
+from helixsh.sample_cost import attribute_samples
+from helixsh.contention import detect_contention
+from helixsh.simulate import DISCIPLINES, parse_shape, sweep_shapes, tasks_from_estimate, tasks_from_trace
+from helixsh.retry_ladder import optimise_retry_ladders, write_retry_config
+from helixsh.workdir import DEFAULT_SCAN_WORKERS, rebuild_trace
 from helixsh.cloud_cost import compare_providers, estimate_cost
 from helixsh.pipeline_registry import (
     check_pipeline_version,
@@ -209,9 +226,12 @@ def make_parser() -> argparse.ArgumentParser:
     diag_parser.add_argument("--memory-gb", type=int)
 
     cache_parser = subparsers.add_parser("cache-report", help="Summarize cache/resume efficiency.")
-    cache_parser.add_argument("--total", required=True, type=int)
-    cache_parser.add_argument("--cached", required=True, type=int)
+    cache_parser.add_argument("--total", type=int)
+    cache_parser.add_argument("--cached", type=int)
     cache_parser.add_argument("--invalidated", action="append", default=[])
+    cache_parser.add_argument("--trace", help="Derive counts from this run's trace.txt instead of --total/--cached.")
+    cache_parser.add_argument("--previous-trace",
+                              help="Previous run's trace.txt; re-run tasks with changed hashes count as invalidated.")
 
 
     rbac_parser = subparsers.add_parser("rbac-check", help="Check role-based access for an action.")
@@ -270,6 +290,12 @@ def make_parser() -> argparse.ArgumentParser:
     pre_parser.add_argument("--samplesheet")
     pre_parser.add_argument("--config")
     pre_parser.add_argument("--image")
+    pre_parser.add_argument("--input", dest="input_files", action="append", default=[],
+                            help="Input file to fingerprint for change detection (repeatable).")
+    pre_parser.add_argument("--fingerprints",
+                            help="JSON manifest of previous input fingerprints; compared, then updated.")
+    pre_parser.add_argument("--fingerprint-blocks", type=int, default=DEFAULT_FINGERPRINT_BLOCKS,
+                            help="Evenly spaced blocks sampled between head and tail (default: 16).")
 
     # ── Execution lifecycle ────────────────────────────────────────────────────
     exec_start = subparsers.add_parser("execution-start", help="Record execution start in provenance DB.")
@@ -280,6 +306,12 @@ def make_parser() -> argparse.ArgumentParser:
     exec_start.add_argument("--image", help="Container image reference.")
     exec_start.add_argument("--agent")
     exec_start.add_argument("--model")
+    exec_start.add_argument("--verify-hashes", action="store_true",
+                            help="Re-hash every input instead of trusting the on-disk hash cache.")
+    exec_start.add_argument("--hash-algorithm", choices=HASH_ALGORITHMS, default=DEFAULT_HASH_ALGORITHM,
+                            help="Input digest algorithm; blake2b is faster but not for regulated work (default: sha256).")
+    exec_start.add_argument("--hash-workers", type=int, default=None,
+                            help="Threads hashing inputs concurrently (default: executor default).")
 
     exec_finish = subparsers.add_parser("execution-finish", help="Record execution completion in provenance DB.")
     exec_finish.add_argument("--execution-id", required=True)
@@ -361,7 +393,125 @@ def make_parser() -> argparse.ArgumentParser:
 
     # ── trace-summary ─────────────────────────────────────────────────────────
     trace_p = subparsers.add_parser("trace-summary", help="Summarise a Nextflow trace.txt file.")
-    trace_p.add_argument("--file", required=True, help="Path to trace.txt.")
+    trace_src = trace_p.add_mutually_exclusive_group(required=True)
+    trace_src.add_argument("--file", help="Path to trace.txt.")
+    trace_src.add_argument("--dir", help="Directory of past runs to summarise together.")
+    trace_src.add_argument("--work-dir", help="Rebuild the trace from task directories (.command.trace etc.) under a Nextflow work dir.")
+    trace_p.add_argument("--glob", default=DEFAULT_TRACE_GLOB, help=f"Trace file pattern under --dir (default: {DEFAULT_TRACE_GLOB}).")
+    trace_p.add_argument("--workers", type=int, default=None,
+                         help=f"Worker processes for --dir (default: CPU count) or scanner threads for --work-dir (default: {DEFAULT_SCAN_WORKERS}).")
+    trace_p.add_argument("--rebuild-out", default=None, help="With --work-dir, also write the rebuilt trace.txt here.")
+    trace_p.add_argument("--follow", action="store_true", help="Tail a growing trace, emitting one JSON summary line per update.")
+    trace_p.add_argument("--interval", type=float, default=30.0, help="Seconds between polls in --follow mode.")
+    trace_p.add_argument("--max-polls", type=int, default=None, help="Stop --follow after N polls (default: until interrupted).")
+    trace_p.add_argument("--cache", action="store_true", help="Read/write a memory-mappable columnar sidecar (<trace>.hxcol); speeds up repeat trace-summary runs.")
+    trace_p.add_argument("--cache-dir", default=None, help="Directory for columnar sidecars instead of next to the trace.")
+
+    gb_p = subparsers.add_parser("trace-groupby", help="Aggregate a trace by several group-by keys in one pass.")
+    gb_p.add_argument("--file", required=True, help="Path to trace.txt.")
+    gb_p.add_argument("--by", action="append", dest="group_bys", required=True,
+                      help=f"Comma-separated keys for one view, e.g. leaf,sample (repeatable). Keys: {', '.join(GROUP_KEYS)}.")
+    gb_p.add_argument("--agg", action="append", dest="aggregators",
+                      help="count, or sum:/max:/sketch:<metric> (repeatable; default: count, sum:cpu_hours, "
+                           "max:peak_rss_mb, sketch:realtime_s).")
+
+    tl_p = subparsers.add_parser("trace-timeline", help="Concurrent tasks/CPU/RSS over time from trace timestamps.")
+    tl_p.add_argument("--file", required=True, help="Path to trace.txt.")
+    tl_p.add_argument("--out", default=None, help="Write the timeline series to .csv or .json.")
+    tl_p.add_argument("--bucket-s", type=float, default=0, help="Downsample the series to N-second buckets (per-bucket max).")
+
+    cp_p = subparsers.add_parser("trace-critical-path", help="Find the task chain that bounded a run's wall time.")
+    cp_p.add_argument("--file", required=True, help="Path to trace.txt.")
+    cp_p.add_argument("--top", type=int, default=10, help="Number of processes to rank (default: 10).")
+
+    qw_p = subparsers.add_parser("trace-queue-wait", help="Analyse scheduler queue wait and suggest executor settings.")
+    qw_p.add_argument("--file", required=True, help="Path to trace.txt.")
+    qw_p.add_argument("--bucket-s", type=float, default=600, help="Time-series bucket width in seconds (default: 600).")
+    qw_p.add_argument("--config-out", default=None, help="Write the suggested executor block to this config file.")
+
+    io_p = subparsers.add_parser("trace-io", help="Per-process I/O throughput and I/O-bound detection.")
+    io_p.add_argument("--file", required=True, help="Path to trace.txt.")
+    io_p.add_argument("--config-out", default=None, help="Write `scratch true` overrides for I/O-bound processes.")
+
+    rs_p = subparsers.add_parser("trace-rightsize", help="Generate a tuned cpus/memory/time config from a trace.")
+    rs_p.add_argument("--file", required=True, help="Path to trace.txt.")
+    rs_p.add_argument("--percentile", type=float, default=95.0, help="Usage percentile to size from (default: 95).")
+    rs_p.add_argument("--margin", type=float, default=0.2, help="Safety margin added on top, as a fraction (default: 0.2).")
+    rs_p.add_argument("--min-tasks", type=int, default=1, help="Skip processes with fewer observed tasks.")
+    rs_p.add_argument("--out", default=None, help="Write config to this path instead of stdout.")
+
+    rl_p = subparsers.add_parser("trace-retry-ladder", help="Pick cost-optimal initial memory and OOM retry multiplier per process.")
+    rl_p.add_argument("--file", required=True, action="append", dest="files",
+                      help="Historical trace.txt with exit, peak_rss and memory columns (repeatable).")
+    rl_p.add_argument("--max-retries", type=int, default=2, help="Retries allowed after an OOM (default: 2).")
+    rl_p.add_argument("--max-memory-gb", type=float, default=None, help="Largest memory any attempt may request.")
+    rl_p.add_argument("--fail-fraction", type=float, default=None,
+                      help="Share of runtime a failed attempt costs (default: estimated from the traces).")
+    rl_p.add_argument("--provider", default="aws", choices=["aws", "gcp", "azure"])
+    rl_p.add_argument("--instance-family", default="general",
+                      choices=["general", "compute", "memory", "spot"])
+    rl_p.add_argument("--set-error-strategy", action="store_true",
+                      help="Also set an OOM-only errorStrategy, replacing the pipeline's own.")
+    rl_p.add_argument("--out", default=None, help="Write config to this path instead of stdout.")
+
+    ws_p = subparsers.add_parser("trace-waste", help="Rank processes by cost of requested-but-unused CPU and memory.")
+    ws_p.add_argument("--file", required=True, action="append", dest="files",
+                      help="Path to trace.txt with cpus/memory/time columns (repeatable).")
+    ws_p.add_argument("--provider", default="aws", choices=["aws", "gcp", "azure"],
+                      help="Cloud provider for pricing (default: aws).")
+    ws_p.add_argument("--instance-family", default="general",
+                      choices=["general", "compute", "memory", "spot"])
+    ws_p.add_argument("--top", type=int, default=20, help="Number of processes to list (default: 20).")
+
+    td_p = subparsers.add_parser("trace-diff", help="Detect per-process performance regressions between two traces.")
+    td_p.add_argument("--old", required=True, help="Baseline trace.txt.")
+    td_p.add_argument("--new", required=True, help="Candidate trace.txt.")
+    td_p.add_argument("--metric", action="append", dest="metrics", choices=list(SKETCH_METRICS),
+                      help="Metric to compare (repeatable; default: realtime_s and peak_rss_mb).")
+    td_p.add_argument("--alpha", type=float, default=0.01, help="Significance level (default: 0.01).")
+    td_p.add_argument("--min-change", type=float, default=0.10,
+                      help="Minimum relative median change to report, as a fraction (default: 0.10).")
+
+    st_p = subparsers.add_parser("trace-stragglers", help="Find tasks far slower or larger than their sibling tasks.")
+    st_p.add_argument("--file", required=True, help="Path to trace.txt.")
+    st_p.add_argument("--metric", default="realtime_s", choices=list(STRAGGLER_METRICS),
+                      help="Metric to check (default: realtime_s).")
+    st_p.add_argument("--threshold", type=float, default=3.5, help="Robust z-score cut-off (default: 3.5).")
+    st_p.add_argument("--min-ratio", type=float, default=1.5,
+                      help="Also require value >= this multiple of the process median (default: 1.5).")
+
+    sm_p = subparsers.add_parser("trace-samples", help="Attribute runtime and cost to samples via task tags.")
+    sm_p.add_argument("--file", required=True, action="append", dest="files",
+                      help="Path to trace.txt (repeatable).")
+    sm_p.add_argument("--provider", default="aws", choices=["aws", "gcp", "azure"],
+                      help="Cloud provider for pricing (default: aws).")
+    sm_p.add_argument("--instance-family", default="general",
+                      choices=["general", "compute", "memory", "spot"])
+    sm_p.add_argument("--outlier-factor", type=float, default=10.0,
+                      help="Flag samples costing at least this multiple of the median (default: 10).")
+    sm_p.add_argument("--top", type=int, default=50, help="Number of samples to list (default: 50).")
+
+    ct_p = subparsers.add_parser("trace-contention", help="Detect CPU oversubscription and idle allocations per process.")
+    ct_p.add_argument("--file", required=True, help="Path to trace.txt with a cpus column.")
+
+    cs_p = subparsers.add_parser("cluster-simulate", help="Simulate a workload on candidate node pools to compare makespan and cost.")
+    cs_src = cs_p.add_mutually_exclusive_group(required=True)
+    cs_src.add_argument("--trace", help="Replay tasks from a trace.txt.")
+    cs_src.add_argument("--tool", help="Estimate tasks for this tool (with --assay, --samples, --task-hours).")
+    cs_p.add_argument("--assay", default="")
+    cs_p.add_argument("--samples", type=int, default=1)
+    cs_p.add_argument("--task-hours", type=float, default=1.0, help="Runtime per estimated task (default: 1).")
+    cs_p.add_argument("--shape", required=True, action="append", dest="shapes",
+                      help="Node pool as NODESxCPUS:MEMORY_GB, e.g. 20x16:64 (repeatable).")
+    cs_p.add_argument("--discipline", action="append", dest="disciplines", choices=list(DISCIPLINES),
+                      help="Queue discipline (repeatable; default: fifo).")
+    cs_p.add_argument("--release", default="submit", choices=["submit", "none"],
+                      help="Hold trace tasks until their original submit offset (default) or release all at once.")
+    cs_p.add_argument("--provider", default="aws", choices=["aws", "gcp", "azure"])
+    cs_p.add_argument("--instance-family", default="general",
+                      choices=["general", "compute", "memory", "spot"])
+    cs_p.add_argument("--workers", type=int, default=1,
+                      help="Worker processes for sweeping shapes (default: 1; 0 = one per CPU).")
 
     # ── cost-estimate ─────────────────────────────────────────────────────────
     cost_p = subparsers.add_parser("cost-estimate", help="Estimate cloud cost for a pipeline run.")
@@ -652,7 +802,17 @@ def cmd_diagnose(process: str, exit_code: int, memory_gb: int | None) -> int:
     return 0 if exit_code == 0 else 2
 
 
-def cmd_cache_report(total: int, cached: int, invalidated: list[str]) -> int:
+def cmd_cache_report(total: int | None, cached: int | None, invalidated: list[str],
+                     trace: str | None = None, previous_trace: str | None = None) -> int:
+    if trace:
+        derived = summarize_cache_from_traces(trace, previous_trace)
+        payload = asdict(derived.report)
+        payload.update(asdict(derived))
+        del payload["report"]
+        print(json.dumps(payload, indent=2))
+        return 0 if derived.total_tasks else 2
+    if total is None or cached is None:
+        raise ValueError("cache-report needs --trace, or both --total and --cached")
     report = summarize_cache(total, cached, invalidated)
     print(json.dumps(asdict(report), indent=2))
     return 0
@@ -740,12 +900,16 @@ def cmd_audit_verify() -> int:
     return 0 if ok else 2
 
 
-def authorize(role: str, action: str | None) -> int:
+def authorize(role: str, action: str | None, writes_files: bool = False) -> int:
     if not action:
         return 0
-    decision = check_access(role, action)
+    decision = check_access(role, action, writes_files)
     if decision.allowed:
         return 0
+    if writes_files and check_access(role, action).allowed:
+        print(f"helixsh error: role '{decision.role}' may run '{decision.action}' but not with options that write files",
+              file=sys.stderr)
+        return 2
     print(f"helixsh error: role '{decision.role}' is not allowed to run '{decision.action}'", file=sys.stderr)
     return 2
 
@@ -776,7 +940,18 @@ def cmd_posix_wrap(args: list[str], execute: bool) -> int:
     return 0
 
 
-def cmd_preflight(schema: str | None, params: str | None, workflow: str | None, cache_root: str | None, samplesheet: str | None, config: str | None, image: str | None) -> int:
+def cmd_preflight(
+    schema: str | None,
+    params: str | None,
+    workflow: str | None,
+    cache_root: str | None,
+    samplesheet: str | None,
+    config: str | None,
+    image: str | None,
+    input_files: list[str] | None = None,
+    fingerprints: str | None = None,
+    fingerprint_blocks: int = DEFAULT_FINGERPRINT_BLOCKS,
+) -> int:
     checks: dict[str, dict] = {}
 
     if schema and params:
@@ -804,6 +979,11 @@ def cmd_preflight(schema: str | None, params: str | None, workflow: str | None,
         img = check_image_policy(image)
         checks["image"] = {"ok": img.allowed, **asdict(img)}
 
+    if input_files:
+        # Sampled fingerprints: a cheap change signal, not provenance.
+        fp = compare_fingerprints(input_files, fingerprints, blocks=fingerprint_blocks)
+        checks["inputs"] = {"ok": not fp.missing, **asdict(fp)}
+
     overall_ok = all(item.get("ok", True) for item in checks.values()) if checks else False
     payload = {"ok": overall_ok, "checks": checks}
     print(json.dumps(payload, indent=2))
@@ -818,6 +998,9 @@ def cmd_execution_start(
     image: str | None,
     agent: str | None,
     model: str | None,
+    verify_hashes: bool = False,
+    hash_algorithm: str = DEFAULT_HASH_ALGORITHM,
+    hash_workers: int | None = None,
 ) -> int:
     init_db(db)
     ctx = create_execution_context(
@@ -825,49 +1008,55 @@ def cmd_execution_start(
         input_files=input_files,
         agent=agent,
         container_digest=image,
+        verify_hashes=verify_hashes,
+        hash_algorithm=hash_algorithm,
+        hash_workers=hash_workers,
     )
-    create_execution(
-        db,
-        execution_id=ctx.execution_id,
-        command=command,
-        workflow=workflow,
-        agent=agent,
-        model=model,
-        status="running",
-        start_time=ctx.timestamp,
-        container_digest=ctx.container_digest,
-        input_hash=ctx.input_hash,
-    )
+    # Reuse the digests the context was built from; stat before opening the
+    # session so the write transaction stays short.
+    inputs: list[tuple[str, str, int]] = []
     for path in input_files:
         try:
-            h = sha256_file(path)
-            sz = file_size_bytes(path)
+            inputs.append((path, ctx.input_digests[path], file_size_bytes(path)))
         except OSError:
-            h, sz = "", 0
-        insert_input(db, execution_id=ctx.execution_id, file_path=path, sha256=h, size_bytes=sz)
-    if image:
-        insert_container(
-            db,
+            inputs.append((path, ctx.input_digests[path], 0))
+    with ProvenanceSession(db) as session:
+        session.create_execution(
             execution_id=ctx.execution_id,
-            image_name=image.split("@")[0],
-            image_digest=image.split("@sha256:")[-1] if "@sha256:" in image else None,
-            runtime="docker",
+            command=command,
+            workflow=workflow,
+            agent=agent,
+            model=model,
+            status="running",
+            start_time=ctx.timestamp,
+            container_digest=ctx.container_digest,
+            input_hash=ctx.input_hash,
         )
-    add_audit_event(db, execution_id=ctx.execution_id, event_type="start", message=command)
-    print(json.dumps({"execution_context": asdict(ctx)}, indent=2))
+        session.insert_inputs(ctx.execution_id, inputs)
+        if image:
+            session.insert_container(
+                execution_id=ctx.execution_id,
+                image_name=image.split("@")[0],
+                image_digest=image.split("@sha256:")[-1] if "@sha256:" in image else None,
+                runtime="docker",
+            )
+        session.add_audit_event(execution_id=ctx.execution_id, event_type="start", message=command)
+    payload = asdict(ctx)
+    del payload["input_digests"]   # recorded per input in the provenance DB
+    print(json.dumps({"execution_context": payload}, indent=2))
     return 0
 
 
 def cmd_execution_finish(execution_id: str, db: str, status: str, exit_code: int | None, output_hash: str | None) -> int:
-    finish_execution(
-        db,
-        execution_id=execution_id,
-        status=status,
-        end_time=datetime.now(UTC).isoformat(),
-        output_hash=output_hash,
-        exit_code=exit_code,
-    )
-    add_audit_event(db, execution_id=execution_id, event_type="finish", message=status)
+    with ProvenanceSession(db) as session:
+        session.finish_execution(
+            execution_id=execution_id,
+            status=status,
+            end_time=datetime.now(UTC).isoformat(),
+            output_hash=output_hash,
+            exit_code=exit_code,
+        )
+        session.add_audit_event(execution_id=execution_id, event_type="finish", message=status)
     print(json.dumps({"execution_id": execution_id, "status": status}, indent=2))
     return 0
 
@@ -1047,9 +1236,8 @@ def cmd_ref_download(genome: str, cache_root: str, execute: bool) -> int:
 
 # ── trace-summary ─────────────────────────────────────────────────────────────
 
-def cmd_trace_summary(file: str) -> int:
-    summary = parse_trace(file)
-    payload = {
+def _trace_summary_payload(summary: TraceSummary) -> dict:
+    return {
         "trace_file": summary.trace_file,
         "total_tasks": summary.total_tasks,
         "failed_tasks": summary.failed_tasks,
@@ -1066,17 +1254,296 @@ def cmd_trace_summary(file: str) -> int:
                 "avg_cpu_pct": p.avg_cpu_pct,
                 "max_peak_rss_mb": p.max_peak_rss_mb,
                 "avg_peak_rss_mb": p.avg_peak_rss_mb,
+                "percentiles": p.percentiles,
                 "recommendation": p.recommendation,
             }
             for p in summary.processes
         ],
     }
-    print(json.dumps(payload, indent=2))
+
+
+def cmd_trace_summary(file: str, use_cache: bool = False, cache_dir: str | None = None) -> int:
+    summary = parse_trace(file, use_cache=use_cache, cache_dir=cache_dir)
+    print(json.dumps(_trace_summary_payload(summary), indent=2))
     if summary.warnings and summary.total_tasks == 0:
         return 2  # file missing or empty
     return 0 if summary.failed_tasks == 0 else 2
 
 
+def cmd_trace_summary_dir(root: str, pattern: str, workers: int | None) -> int:
+    paths = find_trace_files(root, pattern)
+    result = summarize_traces(paths, workers=workers, label=root)
+    payload = {
+        "trace_dir": root,
+        "glob": pattern,
+        "run_count": len(result.runs),
+        "combined": _trace_summary_payload(result.combined),
+        "runs": [
+            {
+                "trace_file": r.trace_file,
+                "total_tasks": r.total_tasks,
+                "failed_tasks": r.failed_tasks,
+                "total_walltime_s": r.total_walltime_s,
+                "total_cpu_hours": r.total_cpu_hours,
+                "warnings": r.warnings,
+            }
+            for r in result.runs
+        ],
+    }
+    print(json.dumps(payload, indent=2))
+    if not paths:
+        return 2
+    return 0 if result.combined.failed_tasks == 0 else 2
+
+
+def cmd_trace_summary_workdir(work_dir: str, workers: int | None, out: str | None) -> int:
+    scan = rebuild_trace(work_dir, workers=workers or DEFAULT_SCAN_WORKERS, out=out)
+    if scan.summary is None:
+        print(json.dumps({"work_dir": work_dir, "warnings": scan.warnings}, indent=2))
+        return 2
+    payload = _trace_summary_payload(scan.summary)
+    payload["warnings"] = scan.warnings + payload["warnings"]
+    payload["task_dirs"] = scan.task_dirs
+    payload["not_started"] = scan.not_started
+    payload["unfinished"] = scan.unfinished
+    if out:
+        payload["rebuilt_trace"] = out
+    print(json.dumps(payload, indent=2))
+    if scan.rows == 0:
+        return 2
+    return 0 if scan.summary.failed_tasks == 0 else 2
+
+
+def cmd_trace_follow(file: str, interval: float, max_polls: int | None) -> int:
+    follower = TraceFollower(file)
+    polls = 0
+    try:
+        while max_polls is None or polls < max_polls:
+            if polls:
+                time.sleep(interval)
+            polls += 1
+            added = follower.poll()
+            if added or polls == 1:
+                payload = _trace_summary_payload(follower.summary())
+                payload["poll"] = polls
+                payload["new_rows"] = added
+                payload["rotations"] = follower.rotations
+                print(json.dumps(payload), flush=True)
+    except KeyboardInterrupt:
+        pass
+    return 0 if follower.acc.failed_tasks == 0 else 2
+
+
+# ── trace-groupby ─────────────────────────────────────────────────────────────
+
+DEFAULT_GROUP_AGGREGATORS = ["count", "sum:cpu_hours", "max:peak_rss_mb", "sketch:realtime_s"]
+
+
+def cmd_trace_groupby(file: str, group_bys: list[str], aggregators: list[str] | None) -> int:
+    multi = group_trace(
+        file,
+        [[k.strip() for k in spec.split(",") if k.strip()] for spec in group_bys],
+        aggregators or DEFAULT_GROUP_AGGREGATORS,
+    )
+    print(json.dumps({
+        "trace_file": file,
+        "total_tasks": multi.total_tasks,
+        "views": multi.results(),
+        "warnings": multi.warnings,
+    }, indent=2))
+    return 0 if multi.total_tasks else 2
+
+
+# ── trace-timeline ────────────────────────────────────────────────────────────
+
+def cmd_trace_timeline(file: str, out: str | None, bucket_s: float) -> int:
+    timeline = build_timeline(file, bucket_s=bucket_s)
+    payload = asdict(timeline)
+    payload.pop("points")
+    payload["point_count"] = len(timeline.points)
+    if out:
+        write_timeline(timeline, out)
+        payload["out"] = out
+    print(json.dumps(payload, indent=2))
+    return 0 if timeline.tasks else 2
+
+
+# ── trace-critical-path ───────────────────────────────────────────────────────
+
+def cmd_trace_critical_path(file: str, top: int) -> int:
+    report = analyze_critical_path(file)
+    payload = asdict(report)
+    payload["processes"] = payload["processes"][:top]
+    print(json.dumps(payload, indent=2))
+    return 0 if report.tasks else 2
+
+
+# ── trace-queue-wait ──────────────────────────────────────────────────────────
+
+def cmd_trace_queue_wait(file: str, bucket_s: float, config_out: str | None) -> int:
+    report = analyze_queue_wait(file, bucket_s=bucket_s)
+    payload = asdict(report)
+    if report.recommendation is not None:
+        config = report.recommendation.to_nextflow_config()
+        payload["nextflow_config"] = config
+        if config_out:
+            out = Path(config_out)
+            out.parent.mkdir(parents=True, exist_ok=True)
+            out.write_text(config, encoding="utf-8")
+            payload["config_out"] = config_out
+    print(json.dumps(payload, indent=2))
+    return 0 if report.tasks else 2
+
+
+# ── trace-io ──────────────────────────────────────────────────────────────────
+
+def cmd_trace_io(file: str, config_out: str | None) -> int:
+    report = profile_io(file)
+    payload = asdict(report)
+    if config_out and report.io_bound_processes:
+        out = Path(config_out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(report.to_nextflow_config(), encoding="utf-8")
+        payload["config_out"] = config_out
+    print(json.dumps(payload, indent=2))
+    return 0 if report.tasks else 2
+
+
+# ── trace-rightsize ───────────────────────────────────────────────────────────
+
+def cmd_trace_rightsize(file: str, percentile: float, margin: float, min_tasks: int, out: str | None) -> int:
+    config = rightsize_trace(file, percentile=percentile, margin=margin, min_tasks=min_tasks)
+    if out:
+        write_rightsize_config(config, out)
+        print(json.dumps({
+            "out": out,
+            "processes": len(config.entries),
+            "entries": [asdict(e) for e in config.entries],
+            "warnings": config.warnings,
+        }, indent=2))
+    else:
+        print(config.to_nextflow_config(), end="")
+        for w in config.warnings:
+            print(f"// WARNING: {w}")
+    return 0 if config.entries else 2
+
+
+# ── trace-retry-ladder ────────────────────────────────────────────────────────
+
+def cmd_trace_retry_ladder(
+    files: list[str],
+    max_retries: int,
+    max_memory_gb: float | None,
+    fail_fraction: float | None,
+    provider: str,
+    instance_family: str,
+    set_error_strategy: bool,
+    out: str | None,
+) -> int:
+    report = optimise_retry_ladders(
+        files,
+        max_retries=max_retries,
+        max_memory_gb=max_memory_gb,
+        provider=provider,
+        instance_family=instance_family,
+        fail_fraction=fail_fraction,
+    )
+    if out:
+        write_retry_config(report, out, set_error_strategy)
+        payload = asdict(report)
+        payload["out"] = out
+        print(json.dumps(payload, indent=2))
+    else:
+        print(report.to_nextflow_config(set_error_strategy), end="")
+        for w in report.warnings:
+            print(f"// WARNING: {w}")
+    return 0 if report.plans else 2
+
+
+# ── trace-waste ───────────────────────────────────────────────────────────────
+
+def cmd_trace_waste(files: list[str], provider: str, instance_family: str, top: int) -> int:
+    report = analyze_waste(files, provider=provider, instance_family=instance_family)
+    payload = asdict(report)
+    payload["processes"] = payload["processes"][:top]
+    print(json.dumps(payload, indent=2))
+    return 0 if any(r.tasks for r in report.runs) else 2
+
+
+# ── trace-diff ────────────────────────────────────────────────────────────────
+
+def cmd_trace_diff(old: str, new: str, metrics: list[str] | None, alpha: float, min_change: float) -> int:
+    report = diff_traces(old, new, metrics=tuple(metrics or DEFAULT_DIFF_METRICS),
+                         alpha=alpha, min_change=min_change)
+    print(json.dumps(asdict(report), indent=2))
+    return 0 if report.regressions == 0 else 2
+
+
+# ── trace-stragglers ──────────────────────────────────────────────────────────
+
+def cmd_trace_stragglers(file: str, metric: str, threshold: float, min_ratio: float) -> int:
+    report = find_stragglers(file, metric=metric, threshold=threshold, min_ratio=min_ratio)
+    print(json.dumps(asdict(report), indent=2))
+    if report.warnings and not report.processes and not Path(file).exists():
+        return 2
+    return 0
+
+
+# ── trace-samples ─────────────────────────────────────────────────────────────
+
+def cmd_trace_samples(files: list[str], provider: str, instance_family: str,
+                      outlier_factor: float, top: int) -> int:
+    report = attribute_samples(files, provider=provider, instance_family=instance_family,
+                               outlier_factor=outlier_factor)
+    payload = asdict(report)
+    payload["samples"] = payload["samples"][:top]
+    print(json.dumps(payload, indent=2))
+    return 0 if report.samples_count or report.untagged_tasks else 2
+
+
+# ── trace-contention ──────────────────────────────────────────────────────────
+
+def cmd_trace_contention(file: str) -> int:
+    report = detect_contention(file)
+    print(json.dumps(asdict(report), indent=2))
+    return 0 if report.tasks else 2
+
+
+# ── cluster-simulate ──────────────────────────────────────────────────────────
+
+def cmd_cluster_simulate(
+    trace: str | None,
+    tool: str | None,
+    assay: str,
+    samples: int,
+    task_hours: float,
+    shapes: list[str],
+    disciplines: list[str] | None,
+    release: str,
+    provider: str,
+    instance_family: str,
+    workers: int,
+) -> int:
+    warnings: list[str] = []
+    if trace:
+        tasks = tasks_from_trace(trace, warnings)
+    else:
+        estimate = estimate_resources(tool=tool, assay=assay, samples=samples)
+        tasks = tasks_from_estimate(estimate, task_hours)
+    report = sweep_shapes(
+        tasks,
+        [parse_shape(s) for s in shapes],
+        disciplines=tuple(disciplines or ["fifo"]),
+        release=release,
+        provider=provider,
+        instance_family=instance_family,
+        workers=workers or None,
+    )
+    report.warnings[:0] = warnings
+    print(json.dumps(asdict(report), indent=2))
+    return 0 if tasks else 2
+
+
 # ── cost-estimate ─────────────────────────────────────────────────────────────
 
 def cmd_cost_estimate(cpu: int, memory_gb: int, hours: float,
@@ -1196,8 +1663,14 @@ def main(argv: list[str] | None = None) -> int:
     parser = make_parser()
     args = parser.parse_args(argv)
     strict = bool(getattr(args, "strict", False))
-
-    auth_rc = authorize(getattr(args, "role", "analyst"), args.command)
+    if args.command == "trace-summary" and args.follow:
+        if not args.file:
+            parser.error("trace-summary: --follow requires --file")
+        if args.cache or args.cache_dir:
+            parser.error("trace-summary: --follow cannot be combined with --cache/--cache-dir")
+
+    writes_files = any(getattr(args, dest, None) for dest in WRITE_OPTIONS.get(args.command, ()))
+    auth_rc = authorize(getattr(args, "role", "analyst"), args.command, writes_files)
     if auth_rc != 0:
         return auth_rc
 
@@ -1241,7 +1714,7 @@ def main(argv: list[str] | None = None) -> int:
         if args.command == "diagnose":
             return cmd_diagnose(args.process, args.exit_code, args.memory_gb)
         if args.command == "cache-report":
-            return cmd_cache_report(args.total, args.cached, args.invalidated)
+            return cmd_cache_report(args.total, args.cached, args.invalidated, args.trace, args.previous_trace)
         if args.command == "rbac-check":
             return cmd_rbac_check(args.role, args.action)
         if args.command == "report":
@@ -1261,7 +1734,10 @@ def main(argv: list[str] | None = None) -> int:
         if args.command == "offline-check":
             return cmd_offline_check(args.cache_root)
         if args.command == "preflight":
-            return cmd_preflight(args.schema, args.params, args.workflow, args.cache_root, args.samplesheet, args.config, args.image)
+            return cmd_preflight(
+                args.schema, args.params, args.workflow, args.cache_root, args.samplesheet, args.config, args.image,
+                input_files=args.input_files, fingerprints=args.fingerprints, fingerprint_blocks=args.fingerprint_blocks,
+            )
         if args.command == "posix-wrap":
             return cmd_posix_wrap(args.args, args.execute)
         if args.command == "execution-start":
@@ -1273,6 +1749,9 @@ def main(argv: list[str] | None = None) -> int:
                 image=args.image,
                 agent=args.agent,
                 model=args.model,
+                verify_hashes=args.verify_hashes,
+                hash_algorithm=args.hash_algorithm,
+                hash_workers=args.hash_workers,
             )
         if args.command == "execution-finish":
             return cmd_execution_finish(
@@ -1314,7 +1793,61 @@ def main(argv: list[str] | None = None) -> int:
         if args.command == "ref-download":
             return cmd_ref_download(args.genome, args.cache_root, args.execute)
         if args.command == "trace-summary":
-            return cmd_trace_summary(args.file)
+            if args.dir:
+                return cmd_trace_summary_dir(args.dir, args.glob, args.workers)
+            if args.work_dir:
+                return cmd_trace_summary_workdir(args.work_dir, args.workers, args.rebuild_out)
+            if args.follow:
+                return cmd_trace_follow(args.file, args.interval, args.max_polls)
+            return cmd_trace_summary(args.file, args.cache or bool(args.cache_dir), args.cache_dir)
+        if args.command == "trace-groupby":
+            return cmd_trace_groupby(args.file, args.group_bys, args.aggregators)
+        if args.command == "trace-timeline":
+            return cmd_trace_timeline(args.file, args.out, args.bucket_s)
+        if args.command == "trace-critical-path":
+            return cmd_trace_critical_path(args.file, args.top)
+        if args.command == "trace-queue-wait":
+            return cmd_trace_queue_wait(args.file, args.bucket_s, args.config_out)
+        if args.command == "trace-io":
+            return cmd_trace_io(args.file, args.config_out)
+        if args.command == "trace-rightsize":
+            return cmd_trace_rightsize(args.file, args.percentile, args.margin, args.min_tasks, args.out)
+        if args.command == "trace-retry-ladder":
+            return cmd_trace_retry_ladder(
+                files=args.files,
+                max_retries=args.max_retries,
+                max_memory_gb=args.max_memory_gb,
+                fail_fraction=args.fail_fraction,
+                provider=args.provider,
+                instance_family=args.instance_family,
+                set_error_strategy=args.set_error_strategy,
+                out=args.out,
+            )
+        if args.command == "trace-waste":
+            return cmd_trace_waste(args.files, args.provider, args.instance_family, args.top)
+        if args.command == "trace-diff":
+            return cmd_trace_diff(args.old, args.new, args.metrics, args.alpha, args.min_change)
+        if args.command == "trace-stragglers":
+            return cmd_trace_stragglers(args.file, args.metric, args.threshold, args.min_ratio)
+        if args.command == "trace-samples":
+            return cmd_trace_samples(args.files, args.provider, args.instance_family,
+                                     args.outlier_factor, args.top)
+        if args.command == "trace-contention":
+            return cmd_trace_contention(args.file)
+        if args.command == "cluster-simulate":
+            return cmd_cluster_simulate(
+                trace=args.trace,
+                tool=args.tool,
+                assay=args.assay,
+                samples=args.samples,
+                task_hours=args.task_hours,
+                shapes=args.shapes,
+                disciplines=args.disciplines,
+                release=args.release,
+                provider=args.provider,
+                instance_family=args.instance_family,
+                workers=args.workers,
+            )
         if args.command == "cost-estimate":
             return cmd_cost_estimate(args.cpu, args.memory_gb, args.hours,
                                      args.provider, args.instance_family, args.compare_all)
@@ -57,6 +57,18 @@ class CostEstimate:
     notes: list[str] = field(default_factory=list)
 
 
+def unit_prices(provider: str = "aws", instance_family: str = "general") -> dict[str, float]:
+    """Return {"cpu": $/vCPU-h, "mem": $/GB-h} for a provider and instance family."""
+    prov = provider.strip().lower()
+    fam  = instance_family.strip().lower()
+
+    if prov not in _PRICE_TABLE:
+        raise ValueError(f"Unknown provider '{provider}'. Supported: {', '.join(SUPPORTED_PROVIDERS)}")
+    if fam not in _PRICE_TABLE[prov]:
+        raise ValueError(f"Unknown instance family '{instance_family}'. Supported: {SUPPORTED_INSTANCE_FAMILIES}")
+    return dict(_PRICE_TABLE[prov][fam])
+
+
 def estimate_cost(
     *,
     total_cpu: int,
@@ -70,13 +82,7 @@ def estimate_cost(
     """Estimate cloud cost for a given resource footprint."""
     prov = provider.strip().lower()
     fam  = instance_family.strip().lower()
-
-    if prov not in _PRICE_TABLE:
-        raise ValueError(f"Unknown provider '{provider}'. Supported: {', '.join(SUPPORTED_PROVIDERS)}")
-    if fam not in _PRICE_TABLE[prov]:
-        raise ValueError(f"Unknown instance family '{instance_family}'. Supported: {SUPPORTED_INSTANCE_FAMILIES}")
-
-    prices = _PRICE_TABLE[prov][fam]
+    prices = unit_prices(prov, fam)
     cpu_rate = price_per_cpu_hour if price_per_cpu_hour is not None else prices["cpu"]
     mem_rate = price_per_gb_hour  if price_per_gb_hour  is not None else prices["mem"]
 
@@ -0,0 +1,209 @@
+"""CPU oversubscription and under-use detection from Nextflow traces.
+
+`%cpu` is average CPU use over a task's realtime, so ``%cpu / 100`` is the
+number of cores the task actually kept busy.  Comparing that with the
+requested `cpus` shows two problems the per-process summary hides:
+
+  - oversubscribed: the tool runs more threads than it was allocated
+    (e.g. `bwa mem` with a hard-coded `-t 16` under `cpus 4`), stealing
+    cores from co-located tasks on a shared node;
+  - under-used: the allocation sits idle, usually because the tool was
+    never told how many threads it may use.
+
+When the trace includes `vol_ctxt`/`inv_ctxt`, the share of involuntary
+context switches corroborates oversubscription: threads fighting for too
+few cores get preempted, while I/O-bound tasks switch voluntarily.
+
+Processes are keyed by their fully qualified path (`trace.task_path`), so
+each nf-core tool is judged on its own tasks.  Recommendations name the
+usual thread flag for that tool so the fix is a one-line change to the
+module's `args`.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+
+from helixsh.rightsize import CPU_SLACK_CORES
+from helixsh.sketch import QuantileSketch
+from helixsh.trace import TaskRecord, iter_trace_tasks, leaf_process_name, task_path
+
+# Used cores above requested × this factor count as oversubscribed.
+OVERSUBSCRIBED_FACTOR = 1.1
+# Used cores below requested × this factor (and cpus > 1) count as under-used.
+UNDERUSED_FACTOR = 0.5
+# Involuntary share of context switches above which threads are being preempted.
+HIGH_INVOLUNTARY_SHARE = 0.5
+
+# Thread flag by tool token (matched against `_`-separated words of the leaf
+# process name, e.g. SAMTOOLS_SORT → samtools).
+THREAD_FLAGS = {
+    "bwa": "-t ${task.cpus}",
+    "bwamem2": "-t ${task.cpus}",
+    "minimap2": "-t ${task.cpus}",
+    "samtools": "-@ ${task.cpus - 1}",
+    "bcftools": "--threads ${task.cpus}",
+    "sambamba": "-t ${task.cpus}",
+    "star": "--runThreadN ${task.cpus}",
+    "salmon": "-p ${task.cpus}",
+    "bowtie2": "-p ${task.cpus}",
+    "hisat2": "-p ${task.cpus}",
+    "fastp": "-w ${task.cpus}",
+    "trimgalore": "--cores ${task.cpus}",
+    "featurecounts": "-T ${task.cpus}",
+    "kraken2": "--threads ${task.cpus}",
+    "pigz": "-p ${task.cpus}",
+    "gatk4": "--native-pair-hmm-threads ${task.cpus}",
+}
+
+
+@dataclass
+class ProcessContention:
+    process: str
+    tasks: int
+    requested_cpus: float      # mean requested cpus
+    p50_used_cores: float
+    p95_used_cores: float
+    oversubscribed_tasks: int
+    underused_tasks: int
+    excess_core_hours: float   # core-hours used beyond the allocation
+    idle_core_hours: float     # allocated core-hours left unused
+    involuntary_ctxt_share: float | None
+    verdict: str               # oversubscribed | underused | ok
+    suggested_cpus: int
+    thread_flag: str = ""
+    recommendation: str = ""
+
+
+@dataclass
+class ContentionReport:
+    trace_file: str
+    tasks: int
+    oversubscribed_processes: list[str] = field(default_factory=list)
+    underused_processes: list[str] = field(default_factory=list)
+    excess_core_hours: float = 0.0
+    idle_core_hours: float = 0.0
+    processes: list[ProcessContention] = field(default_factory=list)
+    warnings: list[str] = field(default_factory=list)
+
+
+def thread_flag_for(process: str) -> str:
+    """Return the usual thread flag for a tool-named process, or ''."""
+    for token in leaf_process_name(process).lower().split("_"):
+        if token in THREAD_FLAGS:
+            return THREAD_FLAGS[token]
+    return ""
+
+
+@dataclass
+class ContentionAccumulator:
+    process: str
+    leaf: str
+    tasks: int = 0
+    sum_cpus: int = 0
+    oversubscribed: int = 0
+    underused: int = 0
+    excess_core_h: float = 0.0
+    idle_core_h: float = 0.0
+    vol_ctxt: int = 0
+    inv_ctxt: int = 0
+    used: QuantileSketch = field(default_factory=QuantileSketch)
+
+    def add(self, task: TaskRecord) -> None:
+        used = task.cpu_pct / 100
+        hours = task.realtime_ms / 3_600_000
+        self.tasks += 1
+        self.sum_cpus += task.cpus
+        self.used.add(used)
+        if used > task.cpus * OVERSUBSCRIBED_FACTOR:
+            self.oversubscribed += 1
+        elif task.cpus > 1 and used < task.cpus * UNDERUSED_FACTOR:
+            self.underused += 1
+        self.excess_core_h += max(used - task.cpus, 0) * hours
+        self.idle_core_h += max(task.cpus - used, 0) * hours
+        self.vol_ctxt += task.vol_ctxt
+        self.inv_ctxt += task.inv_ctxt
+
+    def to_process(self) -> ProcessContention:
+        requested = self.sum_cpus / self.tasks
+        p50, p95 = self.used.quantile(0.5), self.used.quantile(0.95)
+        switches = self.vol_ctxt + self.inv_ctxt
+        inv_share = self.inv_ctxt / switches if switches else None
+        flag = thread_flag_for(self.leaf)
+        suggested = max(1, math.ceil(p95 - CPU_SLACK_CORES))
+
+        verdict, rec = "ok", ""
+        if p50 > requested * OVERSUBSCRIBED_FACTOR:
+            verdict = "oversubscribed"
+            rec = f"Uses ~{p50:.1f} cores on {requested:g} requested"
+            if inv_share is not None and inv_share >= HIGH_INVOLUNTARY_SHARE:
+                rec += f" ({inv_share:.0%} of context switches are preemptions)"
+            rec += (
+                f" — cap tool threads with `{flag}`" if flag else " — cap the tool's thread count to task.cpus"
+            )
+            rec += f", or raise cpus to {suggested}"
+        elif requested > 1 and p50 < requested * UNDERUSED_FACTOR:
+            verdict = "underused"
+            rec = f"Uses ~{p50:.1f} of {requested:g} requested cores"
+            rec += (
+                f" — check the tool receives `{flag}`" if flag else " — check the tool is told to use task.cpus threads"
+            )
+            rec += f", or lower cpus to {suggested}"
+
+        return ProcessContention(
+            process=self.process,
+            tasks=self.tasks,
+            requested_cpus=round(requested, 2),
+            p50_used_cores=round(p50, 2),
+            p95_used_cores=round(p95, 2),
+            oversubscribed_tasks=self.oversubscribed,
+            underused_tasks=self.underused,
+            excess_core_hours=round(self.excess_core_h, 4),
+            idle_core_hours=round(self.idle_core_h, 4),
+            involuntary_ctxt_share=round(inv_share, 3) if inv_share is not None else None,
+            verdict=verdict,
+            suggested_cpus=suggested if verdict != "ok" else math.ceil(requested),
+            thread_flag=flag,
+            recommendation=rec,
+        )
+
+
+def detect_contention(path: str) -> ContentionReport:
+    """Compare used cores with requested cpus per process in one streaming pass."""
+    warnings: list[str] = []
+    accs: dict[str, ContentionAccumulator] = {}
+    tasks = missing = 0
+    saw_ctxt = False
+    try:
+        for t in iter_trace_tasks(path, warnings):
+            if not t.cpus:
+                missing += 1
+                continue
+            tasks += 1
+            saw_ctxt = saw_ctxt or bool(t.vol_ctxt or t.inv_ctxt)
+            process = task_path(t.name)
+            acc = accs.get(process)
+            if acc is None:
+                acc = accs[process] = ContentionAccumulator(process=process, leaf=leaf_process_name(process))
+            acc.add(t)
+    except (FileNotFoundError, ValueError) as exc:
+        warnings.append(str(exc))
+
+    if missing:
+        warnings.append(f"{missing} task(s) lack a `cpus` column value and were skipped — add it to trace.fields")
+    if tasks and not saw_ctxt:
+        warnings.append("Trace has no vol_ctxt/inv_ctxt values — preemption evidence unavailable")
+
+    processes = [acc.to_process() for acc in accs.values()]
+    processes.sort(key=lambda p: (p.verdict == "ok", -(p.excess_core_hours + p.idle_core_hours)))
+    return ContentionReport(
+        trace_file=path,
+        tasks=tasks,
+        oversubscribed_processes=[p.process for p in processes if p.verdict == "oversubscribed"],
+        underused_processes=[p.process for p in processes if p.verdict == "underused"],
+        excess_core_hours=round(sum(p.excess_core_hours for p in processes), 4),
+        idle_core_hours=round(sum(p.idle_core_hours for p in processes), 4),
+        processes=processes,
+        warnings=warnings or ([] if tasks else ["No tasks found in trace file"]),
+    )
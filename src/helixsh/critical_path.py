@@ -0,0 +1,136 @@
+"""Critical-path and makespan analysis for a completed Nextflow run.
+
+Nextflow traces do not record the DAG, so dependencies are inferred from
+timing: a task is assumed to have been waiting on whichever task finished
+last at or before the moment it was submitted.  Walking that chain back
+from the last task to complete gives the sequence of tasks that bounded
+the run's wall time.  Each step costs one binary search over tasks sorted
+by completion time, so the whole analysis is O(n log n).
+
+The inference is a heuristic — an unrelated task that happened to finish
+just before a submission can be picked up — but for pipeline-shaped
+workloads the processes it surfaces are the ones worth speeding up.
+
+Path steps are attributed to their fully qualified process (`trace.task_path`)
+so the ranking names the nf-core tool to speed up, not the pipeline.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass, field
+
+from helixsh.trace import iter_trace_tasks, task_path
+
+
+@dataclass
+class PathTask:
+    name: str
+    process: str
+    submit_ms: int
+    start_ms: int
+    complete_ms: int
+    run_s: float          # start → complete
+    wait_s: float         # predecessor complete (or submit) → start
+
+
+@dataclass
+class PathProcess:
+    process: str
+    tasks_on_path: int
+    run_s: float
+    wait_s: float
+    share_of_makespan: float
+    # Makespan saved if this process ran 2x faster on the path (upper bound:
+    # a different chain may become critical once it shrinks).
+    saving_if_2x_s: float
+
+
+@dataclass
+class CriticalPathReport:
+    trace_file: str
+    tasks: int
+    makespan_s: float
+    sum_task_walltime_s: float
+    path_run_s: float
+    path_wait_s: float
+    path: list[PathTask] = field(default_factory=list)
+    processes: list[PathProcess] = field(default_factory=list)
+    warnings: list[str] = field(default_factory=list)
+
+
+def analyze_critical_path(path: str) -> CriticalPathReport:
+    """Infer the makespan-bounding task chain from trace timestamps."""
+    warnings: list[str] = []
+    # (complete, submit, start, name, process) — sortable by completion time
+    timed: list[tuple[int, int, int, str, str]] = []
+    sum_duration_ms = 0
+    skipped = 0
+    try:
+        for t in iter_trace_tasks(path, warnings):
+            if not t.start_ms or t.complete_ms < t.start_ms:
+                skipped += 1
+                continue
+            timed.append((t.complete_ms, t.submit_ms or t.start_ms, t.start_ms, t.name, task_path(t.name)))
+            sum_duration_ms += t.duration_ms
+    except (FileNotFoundError, ValueError) as exc:
+        warnings.append(str(exc))
+    if skipped:
+        warnings.append(f"{skipped} task(s) lack submit/start/complete timestamps and were skipped")
+    if not timed:
+        return CriticalPathReport(
+            trace_file=path, tasks=0, makespan_s=0, sum_task_walltime_s=0,
+            path_run_s=0, path_wait_s=0,
+            warnings=warnings or ["No timed tasks found in trace file"],
+        )
+
+    timed.sort()
+    completes = [t[0] for t in timed]
+    first_submit = min(t[1] for t in timed)
+
+    chain: list[PathTask] = []
+    i = len(timed) - 1
+    while i >= 0:
+        complete, submit, start, name, process = timed[i]
+        j = min(bisect_right(completes, submit), i) - 1
+        ready = completes[j] if j >= 0 else first_submit
+        chain.append(PathTask(
+            name=name,
+            process=process,
+            submit_ms=submit,
+            start_ms=start,
+            complete_ms=complete,
+            run_s=round((complete - start) / 1000, 2),
+            wait_s=round(max(start - ready, 0) / 1000, 2),
+        ))
+        i = j
+    chain.reverse()
+
+    makespan_ms = completes[-1] - first_submit
+    by_process: dict[str, list[PathTask]] = {}
+    for step in chain:
+        by_process.setdefault(step.process, []).append(step)
+    processes = [
+        PathProcess(
+            process=name,
+            tasks_on_path=len(steps),
+            run_s=round(sum(s.run_s for s in steps), 2),
+            wait_s=round(sum(s.wait_s for s in steps), 2),
+            share_of_makespan=round(sum(s.run_s for s in steps) * 1000 / makespan_ms, 4) if makespan_ms else 0.0,
+            saving_if_2x_s=round(sum(s.run_s for s in steps) / 2, 2),
+        )
+        for name, steps in by_process.items()
+    ]
+    processes.sort(key=lambda p: p.run_s, reverse=True)
+
+    return CriticalPathReport(
+        trace_file=path,
+        tasks=len(timed),
+        makespan_s=round(makespan_ms / 1000, 2),
+        sum_task_walltime_s=round(sum_duration_ms / 1000, 2),
+        path_run_s=round(sum(s.run_s for s in chain), 2),
+        path_wait_s=round(sum(s.wait_s for s in chain), 2),
+        path=chain,
+        processes=processes,
+        warnings=warnings,
+    )
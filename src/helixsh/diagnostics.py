@@ -5,6 +5,19 @@ from __future__ import annotations
 from dataclasses import dataclass
 
 
+# Exit statuses meaning the task was killed for exceeding its memory limit:
+# 137 = 128 + SIGKILL from the kernel/cgroup OOM killer or the scheduler.
+OOM_EXIT_CODES = frozenset({137})
+
+
+def is_out_of_memory(exit_code: int | str) -> bool:
+    """True when a task exit status (int, or a trace `exit` string) indicates OOM."""
+    try:
+        return int(str(exit_code).strip()) in OOM_EXIT_CODES
+    except ValueError:
+        return False
+
+
 @dataclass(frozen=True)
 class FailureDiagnosis:
     likely_cause: str
@@ -16,7 +29,7 @@ def diagnose_failure(process_name: str, exit_code: int, memory_limit_gb: int | N
     if exit_code == 0:
         return FailureDiagnosis("No failure", "Exit code indicates success", tuple())
 
-    if exit_code == 137:
+    if exit_code in OOM_EXIT_CODES:
         context = "Likely out-of-memory condition (SIGKILL)"
         if memory_limit_gb is not None:
             context += f" (node limit {memory_limit_gb} GB)"
@@ -0,0 +1,254 @@
+"""File hashing with a persistent on-disk digest cache.
+
+Recording provenance means hashing every input, and for a WGS cohort that
+is terabytes of FASTQ/BAM re-read on every `execution-start`.  The cache
+stores each digest against the file's stat signature
+``(st_dev, st_ino, st_size, st_mtime_ns)``; while the signature is
+unchanged the stored digest is returned without reading the file.  Pass
+``verify=True`` to re-hash regardless (the fresh digest replaces the
+cached one).
+
+The cache is a small SQLite file shared by every helixsh process of a
+user, at ``$HELIXSH_HASH_CACHE`` or ``$XDG_CACHE_HOME/helixsh/file_hashes.sqlite``
+(``~/.cache`` by default).  Set ``HELIXSH_HASH_CACHE=off`` to disable it.
+Any cache error falls back to plain hashing — the cache can make hashing
+faster, never wrong or unavailable.
+
+Two guards keep stale digests out:
+  - the file is stat'ed before and after hashing and only cached if the
+    signature did not change while it was read;
+  - files modified within `RACY_WINDOW_NS` of the hash are not cached,
+    since a write landing in the same mtime tick would go unnoticed.
+
+Cache misses are hashed concurrently by `HashCache.digest_many` on a
+thread pool: hashlib releases the GIL while digesting, so threads scale
+with cores and disks without pickling file contents between processes.
+Large files are memory-mapped (with sequential read-ahead advice) and fed
+to the hash in `READ_SIZE` slices; other files use a reused read buffer.
+
+SHA-256 is the default and the only choice for regulated work.  BLAKE2b
+is offered for non-regulatory workloads where it is faster on 64-bit
+CPUs; its digests are labelled ``blake2b:<hex>`` wherever they are
+recorded (see `label_digest`) so they are never mistaken for SHA-256.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import sqlite3
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+HASH_CACHE_ENV = "HELIXSH_HASH_CACHE"
+ALGORITHMS = ("sha256", "blake2b")
+DEFAULT_ALGORITHM = "sha256"
+READ_SIZE = 8 * 1024 * 1024
+# Files at least this large are memory-mapped instead of read into a buffer.
+MMAP_MIN_SIZE = 64 * 1024 * 1024
+# Files modified this recently are hashed but not cached (coarse-mtime filesystems).
+RACY_WINDOW_NS = 2_000_000_000
+_DISABLED = {"", "0", "off", "none", "false"}
+
+_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS file_hashes (
+  dev INTEGER NOT NULL,
+  ino INTEGER NOT NULL,
+  algorithm TEXT NOT NULL,
+  size INTEGER NOT NULL,
+  mtime_ns INTEGER NOT NULL,
+  digest TEXT NOT NULL,
+  PRIMARY KEY (dev, ino, algorithm)
+) WITHOUT ROWID
+"""
+
+
+def default_cache_path() -> Path | None:
+    """Where the hash cache lives, or None when disabled via the environment."""
+    value = os.environ.get(HASH_CACHE_ENV)
+    if value is not None:
+        return None if value.strip().lower() in _DISABLED else Path(value).expanduser()
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "helixsh" / "file_hashes.sqlite"
+
+
+def check_algorithm(algorithm: str) -> str:
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unsupported hash algorithm '{algorithm}' (choose from {', '.join(ALGORITHMS)})")
+    return algorithm
+
+
+def label_digest(digest: str, algorithm: str) -> str:
+    """Digest as recorded in provenance: bare hex for SHA-256, else ``<algorithm>:<hex>``."""
+    return digest if algorithm == DEFAULT_ALGORITHM else f"{algorithm}:{digest}"
+
+
+def hash_file(path: str | Path, algorithm: str = DEFAULT_ALGORITHM) -> str:
+    """Hash a file's contents without consulting the cache."""
+    digest = hashlib.new(check_algorithm(algorithm))
+    with open(path, "rb") as handle:
+        size = os.fstat(handle.fileno()).st_size
+        if size >= MMAP_MIN_SIZE:
+            try:
+                with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    if hasattr(mmap, "MADV_SEQUENTIAL"):
+                        mapped.madvise(mmap.MADV_SEQUENTIAL)
+                    view = memoryview(mapped)
+                    try:
+                        for offset in range(0, len(view), READ_SIZE):
+                            digest.update(view[offset:offset + READ_SIZE])
+                    finally:
+                        view.release()
+                return digest.hexdigest()
+            except (OSError, ValueError):
+                # Not mappable (special file, some network filesystems): stream instead.
+                handle.seek(0)
+                digest = hashlib.new(algorithm)
+        buffer = bytearray(READ_SIZE)
+        view = memoryview(buffer)
+        while n := handle.readinto(buffer):
+            digest.update(view[:n])
+    return digest.hexdigest()
+
+
+def _int64(n: int) -> int:
+    # Some filesystems report 64-bit unsigned inode/device numbers; SQLite
+    # integers are signed.
+    return n - (1 << 64) if n >= 1 << 63 else n
+
+
+def _signature(st: os.stat_result) -> tuple[int, int, int, int]:
+    return _int64(st.st_dev), _int64(st.st_ino), st.st_size, st.st_mtime_ns
+
+
+class HashCache:
+    """Digest cache keyed on stat signature; use as a context manager.
+
+    New digests are buffered and written in one transaction on `flush` or
+    exit, so a long hashing run never holds the cache's write lock.
+    """
+
+    def __init__(self, path: str | Path | None = None) -> None:
+        self.path = Path(path) if path is not None else default_cache_path()
+        self._pending: list[tuple[int, int, str, int, int, str]] = []
+        self._conn: sqlite3.Connection | None = None
+        if self.path is None:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=5)
+            self._conn.execute(_CACHE_SCHEMA)
+            self._conn.commit()
+        except (OSError, sqlite3.Error):
+            self.close()
+
+    def __enter__(self) -> HashCache:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def lookup(self, st: os.stat_result, algorithm: str) -> str | None:
+        if self._conn is None:
+            return None
+        dev, ino, size, mtime_ns = _signature(st)
+        try:
+            row = self._conn.execute(
+                "SELECT digest FROM file_hashes WHERE dev = ? AND ino = ? AND algorithm = ? AND size = ? AND mtime_ns = ?",
+                (dev, ino, algorithm, size, mtime_ns),
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        return row[0] if row else None
+
+    def store(self, st: os.stat_result, algorithm: str, digest: str) -> None:
+        if self._conn is not None:
+            dev, ino, size, mtime_ns = _signature(st)
+            self._pending.append((dev, ino, algorithm, size, mtime_ns, digest))
+
+    def flush(self) -> None:
+        if self._conn is None or not self._pending:
+            return
+        try:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO file_hashes (dev, ino, algorithm, size, mtime_ns, digest)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    self._pending,
+                )
+        except sqlite3.Error:
+            pass
+        self._pending.clear()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self.flush()
+            self._conn.close()
+            self._conn = None
+
+    def digest(self, path: str | Path, algorithm: str = DEFAULT_ALGORITHM, *, verify: bool = False) -> str:
+        """Return the file's digest, from the cache when its stat signature is unchanged."""
+        return self.digest_many([path], algorithm, verify=verify, workers=1)[str(path)]
+
+    def digest_many(
+        self,
+        paths: Iterable[str | Path],
+        algorithm: str = DEFAULT_ALGORITHM,
+        *,
+        verify: bool = False,
+        workers: int | None = None,
+    ) -> dict[str, str]:
+        """Digest many files, hashing cache misses concurrently; keys are ``str(path)``.
+
+        ``workers`` bounds the hashing threads (None: the executor default,
+        1: hash in the calling thread).  Cache reads and writes stay on the
+        calling thread.
+        """
+        check_algorithm(algorithm)
+        digests: dict[str, str] = {}
+        misses: dict[str, os.stat_result] = {}
+        for path in paths:
+            key = str(path)
+            if key in digests or key in misses:
+                continue
+            st = os.stat(key)
+            cached = None if verify else self.lookup(st, algorithm)
+            if cached is None:
+                misses[key] = st
+            else:
+                digests[key] = cached
+        if not misses:
+            return digests
+
+        started_ns = time.time_ns()
+        if workers == 1 or len(misses) == 1:
+            fresh = {key: hash_file(key, algorithm) for key in misses}
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                fresh = dict(zip(misses, pool.map(lambda key: hash_file(key, algorithm), misses)))
+        for key, st in misses.items():
+            digests[key] = fresh[key]
+            if _signature(os.stat(key)) == _signature(st) and st.st_mtime_ns < started_ns - RACY_WINDOW_NS:
+                self.store(st, algorithm, fresh[key])
+        return digests
+
+
+def file_digest(path: str | Path, algorithm: str = DEFAULT_ALGORITHM, *, verify: bool = False) -> str:
+    """Digest one file through the default cache."""
+    with HashCache() as cache:
+        return cache.digest(path, algorithm, verify=verify)
+
+
+def hash_files(
+    paths: Iterable[str | Path],
+    algorithm: str = DEFAULT_ALGORITHM,
+    *,
+    verify: bool = False,
+    workers: int | None = None,
+) -> dict[str, str]:
+    """Digest many files in parallel through the default cache."""
+    with HashCache() as cache:
+        return cache.digest_many(paths, algorithm, verify=verify, workers=workers)
@@ -0,0 +1,187 @@
+"""Per-process I/O throughput profiling from Nextflow trace I/O columns.
+
+Nextflow records, per task, `rchar`/`wchar` (bytes passed through read/write
+syscalls, including page-cache hits), `read_bytes`/`write_bytes` (bytes that
+actually reached storage) and `syscr`/`syscw` (syscall counts).  Dividing by
+task realtime gives MB/s per process.
+
+A process is flagged I/O-bound when it moves data quickly but keeps its
+requested cores mostly idle — the classic signature of tasks stalled on a
+shared filesystem.  For those, node-local scratch (`scratch true`) or
+copying inputs to local disk (`stageInMode 'copy'`) usually helps more than
+extra CPUs.
+
+Processes are keyed by their fully qualified path (`trace.task_path`), so
+each tool in an nf-core pipeline is profiled on its own and the emitted
+`withName` selectors match exactly that process.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from helixsh.trace import TaskRecord, iter_trace_tasks, task_path
+
+# Sustained read+write rate (MB/s of task realtime) considered I/O-heavy.
+IO_HEAVY_MB_S = 50.0
+# Average bytes moved per task (MB) considered I/O-heavy regardless of rate.
+IO_HEAVY_MB_PER_TASK = 10 * 1024
+# Fraction of requested cores in use below which a process is CPU-idle.
+LOW_CPU_EFFICIENCY = 0.5
+
+
+@dataclass
+class ProcessIO:
+    process: str
+    tasks: int
+    read_mb: float
+    written_mb: float
+    storage_read_mb: float
+    storage_written_mb: float
+    read_mb_s: float
+    write_mb_s: float
+    syscr: int
+    syscw: int
+    avg_kb_per_read_syscall: float
+    cpu_efficiency: float    # mean %cpu / (100 * requested cpus)
+    io_bound: bool
+    recommendation: str = ""
+
+
+@dataclass
+class IoReport:
+    trace_file: str
+    tasks: int
+    total_read_gb: float
+    total_written_gb: float
+    io_bound_processes: list[str] = field(default_factory=list)
+    processes: list[ProcessIO] = field(default_factory=list)
+    warnings: list[str] = field(default_factory=list)
+
+    def to_nextflow_config(self) -> str:
+        """Render `scratch true` overrides for the I/O-bound processes."""
+        lines = [
+            "// Auto-generated by helixsh trace-io",
+            "// Pass to Nextflow with: -c io.config",
+            "process {",
+        ]
+        for name in self.io_bound_processes:
+            lines.append(f"    withName: '{name}' {{")
+            lines.append("        scratch = true")
+            lines.append("    }")
+        lines.append("}")
+        return "\n".join(lines) + "\n"
+
+
+@dataclass
+class IoAccumulator:
+    process: str
+    tasks: int = 0
+    realtime_ms: int = 0
+    rchar_mb: float = 0.0
+    wchar_mb: float = 0.0
+    read_bytes_mb: float = 0.0
+    write_bytes_mb: float = 0.0
+    syscr: int = 0
+    syscw: int = 0
+    sum_cpu_pct: float = 0.0
+    sum_cpus: int = 0
+
+    def add(self, task: TaskRecord) -> None:
+        self.tasks += 1
+        self.realtime_ms += task.realtime_ms
+        self.rchar_mb += task.rchar_mb
+        self.wchar_mb += task.wchar_mb
+        self.read_bytes_mb += task.read_bytes_mb
+        self.write_bytes_mb += task.write_bytes_mb
+        self.syscr += task.syscr
+        self.syscw += task.syscw
+        self.sum_cpu_pct += task.cpu_pct
+        self.sum_cpus += task.cpus or 1
+
+    def merge(self, other: IoAccumulator) -> None:
+        self.tasks += other.tasks
+        self.realtime_ms += other.realtime_ms
+        self.rchar_mb += other.rchar_mb
+        self.wchar_mb += other.wchar_mb
+        self.read_bytes_mb += other.read_bytes_mb
+        self.write_bytes_mb += other.write_bytes_mb
+        self.syscr += other.syscr
+        self.syscw += other.syscw
+        self.sum_cpu_pct += other.sum_cpu_pct
+        self.sum_cpus += other.sum_cpus
+
+    def to_process_io(self) -> ProcessIO:
+        secs = self.realtime_ms / 1000
+        read_rate = self.rchar_mb / secs if secs else 0.0
+        write_rate = self.wchar_mb / secs if secs else 0.0
+        mb_per_task = (self.rchar_mb + self.wchar_mb) / self.tasks if self.tasks else 0.0
+        efficiency = self.sum_cpu_pct / (100 * self.sum_cpus) if self.sum_cpus else 0.0
+        heavy = (read_rate + write_rate) >= IO_HEAVY_MB_S or mb_per_task >= IO_HEAVY_MB_PER_TASK
+        io_bound = heavy and efficiency < LOW_CPU_EFFICIENCY
+
+        rec = ""
+        if io_bound:
+            rec = (
+                f"I/O-bound ({read_rate + write_rate:.0f} MB/s, {efficiency:.0%} of requested CPU used) — "
+                "set `scratch true` or `stageInMode 'copy'` to work on node-local disk"
+            )
+        elif self.syscr and self.rchar_mb * 1024 / self.syscr < 4:
+            rec = "Many small reads (<4 KB/syscall) — check tool buffer sizes or input compression"
+
+        return ProcessIO(
+            process=self.process,
+            tasks=self.tasks,
+            read_mb=round(self.rchar_mb, 1),
+            written_mb=round(self.wchar_mb, 1),
+            storage_read_mb=round(self.read_bytes_mb, 1),
+            storage_written_mb=round(self.write_bytes_mb, 1),
+            read_mb_s=round(read_rate, 2),
+            write_mb_s=round(write_rate, 2),
+            syscr=self.syscr,
+            syscw=self.syscw,
+            avg_kb_per_read_syscall=round(self.rchar_mb * 1024 / self.syscr, 2) if self.syscr else 0.0,
+            cpu_efficiency=round(efficiency, 3),
+            io_bound=io_bound,
+            recommendation=rec,
+        )
+
+
+def profile_io(path: str) -> IoReport:
+    """Aggregate trace I/O columns per process in a single streaming pass."""
+    warnings: list[str] = []
+    accs: dict[str, IoAccumulator] = {}
+    tasks = 0
+    saw_cpus = saw_io = False
+    try:
+        for t in iter_trace_tasks(path, warnings):
+            tasks += 1
+            saw_cpus = saw_cpus or t.cpus > 0
+            saw_io = saw_io or bool(t.rchar_mb or t.wchar_mb)
+            process = task_path(t.name)
+            acc = accs.get(process)
+            if acc is None:
+                acc = accs[process] = IoAccumulator(process=process)
+            acc.add(t)
+    except (FileNotFoundError, ValueError) as exc:
+        warnings.append(str(exc))
+
+    if tasks and not saw_io:
+        warnings.append("Trace has no rchar/wchar values — add them to trace.fields")
+    if tasks and not saw_cpus:
+        warnings.append("Trace has no `cpus` column — CPU efficiency assumes 1 requested CPU per task")
+
+    processes = sorted(
+        (acc.to_process_io() for acc in accs.values()),
+        key=lambda p: p.read_mb + p.written_mb,
+        reverse=True,
+    )
+    return IoReport(
+        trace_file=path,
+        tasks=tasks,
+        total_read_gb=round(sum(a.rchar_mb for a in accs.values()) / 1024, 3),
+        total_written_gb=round(sum(a.wchar_mb for a in accs.values()) / 1024, 3),
+        io_bound_processes=[p.process for p in processes if p.io_bound],
+        processes=processes,
+        warnings=warnings or ([] if tasks else ["No tasks found in trace file"]),
+    )
@@ -1,13 +1,31 @@
-"""Execution lifecycle context helpers."""
+"""Execution lifecycle context helpers.
+
+Two kinds of input digest live here:
+
+  - `sha256_file` / `hash_inputs`: full-content SHA-256, the provenance
+    record written by `execution-start`;
+  - `fingerprint_file` / `compare_fingerprints`: a sampled fingerprint
+    (size plus hashes of the head, the tail and N evenly spaced blocks) for
+    preflight change detection.  It reads a few MB however large the file
+    is, but it is NOT cryptographic provenance — an edit that misses every
+    sampled block, or a deliberate forgery, keeps the same fingerprint.
+    Fingerprints carry a ``sampled-v1:b<blocks>x<block size>:`` prefix so
+    they cannot be confused with SHA-256 digests, and so fingerprints taken
+    with different sampling are never compared with each other.
+"""
 
 from __future__ import annotations
 
 import hashlib
+import json
+import os
 import uuid
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from pathlib import Path
 
+from helixsh.hashing import DEFAULT_ALGORITHM, check_algorithm, file_digest, hash_files, label_digest
+
 
 @dataclass(frozen=True)
 class ExecutionContext:
@@ -17,23 +35,38 @@ class ExecutionContext:
     input_hash: str
     agent: str | None
     timestamp: str
+    # Per-input labelled digests that `input_hash` was folded from, keyed by path.
+    input_digests: dict[str, str] = field(default_factory=dict)
 
 
-def sha256_file(path: str) -> str:
-    digest = hashlib.sha256()
-    with Path(path).open("rb") as handle:
-        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
-            digest.update(chunk)
-    return digest.hexdigest()
+def sha256_file(path: str, *, verify: bool = False) -> str:
+    """SHA-256 of a file, served from the hash cache while its stat signature is unchanged."""
+    return file_digest(path, "sha256", verify=verify)
+
+
+def hash_inputs(
+    paths: list[str],
+    *,
+    verify: bool = False,
+    algorithm: str = DEFAULT_ALGORITHM,
+    workers: int | None = None,
+) -> str:
+    """Combined digest over sorted (resolved path, file digest) pairs.
 
+    Files are hashed concurrently (see `helixsh.hashing`), but the pairs are
+    folded in sorted path order so the result is deterministic.  ``verify=True``
+    re-hashes every file instead of trusting the cache; non-SHA-256 results
+    carry an ``<algorithm>:`` prefix.
+    """
+    return _fold_input_digests(paths, hash_files(paths, algorithm, verify=verify, workers=workers), algorithm)
 
-def hash_inputs(paths: list[str]) -> str:
-    digest = hashlib.sha256()
+
+def _fold_input_digests(paths: list[str], file_digests: dict[str, str], algorithm: str) -> str:
+    digest = hashlib.new(algorithm)
     for file_path in sorted(paths):
-        p = Path(file_path)
-        digest.update(str(p.resolve()).encode("utf-8"))
-        digest.update(sha256_file(str(p)).encode("utf-8"))
-    return digest.hexdigest()
+        digest.update(str(Path(file_path).resolve()).encode("utf-8"))
+        digest.update(file_digests[file_path].encode("utf-8"))
+    return label_digest(digest.hexdigest(), algorithm)
 
 
 def create_execution_context(
@@ -42,16 +75,133 @@ def create_execution_context(
     input_files: list[str],
     agent: str | None = None,
     container_digest: str | None = None,
+    verify_hashes: bool = False,
+    hash_algorithm: str = DEFAULT_ALGORITHM,
+    hash_workers: int | None = None,
 ) -> ExecutionContext:
+    file_digests = hash_files(input_files, hash_algorithm, verify=verify_hashes, workers=hash_workers)
     return ExecutionContext(
         execution_id=str(uuid.uuid4()),
         working_dir=working_dir,
         container_digest=container_digest,
-        input_hash=hash_inputs(input_files) if input_files else hashlib.sha256(b"").hexdigest(),
+        input_hash=(
+            _fold_input_digests(input_files, file_digests, hash_algorithm)
+            if input_files
+            else label_digest(hashlib.new(check_algorithm(hash_algorithm)).hexdigest(), hash_algorithm)
+        ),
         agent=agent,
         timestamp=datetime.now(UTC).isoformat(),
+        input_digests={path: label_digest(d, hash_algorithm) for path, d in file_digests.items()},
     )
 
 
 def file_size_bytes(path: str) -> int:
     return Path(path).stat().st_size
+
+
+FINGERPRINT_SCHEME = "sampled-v1"
+DEFAULT_FINGERPRINT_BLOCKS = 16
+FINGERPRINT_BLOCK_SIZE = 64 * 1024
+
+
+def fingerprint_file(
+    path: str, *, blocks: int = DEFAULT_FINGERPRINT_BLOCKS, block_size: int = FINGERPRINT_BLOCK_SIZE,
+) -> str:
+    """Sampled, non-cryptographic fingerprint: ``sampled-v1:b<blocks>x<block_size>:<size>:<hex>``.
+
+    Hashes the file size, the first and last ``block_size`` bytes and
+    ``blocks`` evenly spaced blocks in between; files small enough to be
+    covered by the samples are hashed whole.  A cheap "probably unchanged"
+    signal for preflight — record `sha256_file` for provenance.
+    """
+    if blocks < 0 or block_size <= 0:
+        raise ValueError("blocks must be >= 0 and block_size > 0")
+    digest = hashlib.blake2b(digest_size=16)
+    with Path(path).open("rb") as handle:
+        size = os.fstat(handle.fileno()).st_size
+        digest.update(f"{size}:{blocks}:{block_size}".encode("utf-8"))
+        if size <= (blocks + 2) * block_size:
+            for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+                digest.update(chunk)
+        else:
+            last = size - block_size
+            offsets = [0, *(last * i // (blocks + 1) for i in range(1, blocks + 1)), last]
+            for offset in offsets:
+                handle.seek(offset)
+                digest.update(handle.read(block_size))
+    return f"{_fingerprint_params(blocks, block_size)}:{size}:{digest.hexdigest()}"
+
+
+def _fingerprint_params(blocks: int, block_size: int) -> str:
+    return f"{FINGERPRINT_SCHEME}:b{blocks}x{block_size}"
+
+
+@dataclass
+class FingerprintReport:
+    scheme: str
+    cryptographic: bool
+    fingerprints: dict[str, str] = field(default_factory=dict)
+    unchanged: list[str] = field(default_factory=list)
+    changed: list[str] = field(default_factory=list)
+    new: list[str] = field(default_factory=list)
+    missing: list[str] = field(default_factory=list)
+    # Previously fingerprinted with other sampling parameters; the current
+    # fingerprint replaces the old one, but no change can be inferred.
+    not_comparable: list[str] = field(default_factory=list)
+
+
+def _load_fingerprint_manifest(manifest: str) -> dict[str, str]:
+    """Recorded fingerprints from ``manifest``; ValueError naming the file if malformed."""
+    try:
+        data = json.loads(Path(manifest).read_text(encoding="utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise ValueError(f"Fingerprint manifest {manifest} is not valid JSON: {exc}") from exc
+    fingerprints = data.get("fingerprints", {}) if isinstance(data, dict) else None
+    if not isinstance(fingerprints, dict) or not all(
+        isinstance(k, str) and isinstance(v, str) for k, v in fingerprints.items()
+    ):
+        raise ValueError(f"Fingerprint manifest {manifest} must map 'fingerprints' to path → fingerprint strings")
+    return fingerprints
+
+
+def compare_fingerprints(
+    paths: list[str], manifest: str | None = None, *, blocks: int = DEFAULT_FINGERPRINT_BLOCKS,
+) -> FingerprintReport:
+    """Fingerprint inputs and classify them against a previous manifest.
+
+    With ``manifest``, fingerprints recorded there (keyed by resolved path)
+    are compared and the file is rewritten with the current ones, so the
+    next preflight compares against this run.  A recorded fingerprint taken
+    with different sampling parameters (or an older format) is reported as
+    `not_comparable` rather than `changed`.
+    """
+    params = _fingerprint_params(blocks, FINGERPRINT_BLOCK_SIZE)
+    previous: dict[str, str] = {}
+    if manifest and Path(manifest).exists():
+        previous = _load_fingerprint_manifest(manifest)
+
+    report = FingerprintReport(scheme=FINGERPRINT_SCHEME, cryptographic=False)
+    for file_path in paths:
+        key = str(Path(file_path).resolve())
+        try:
+            fp = fingerprint_file(file_path, blocks=blocks)
+        except OSError:
+            report.missing.append(file_path)
+            continue
+        report.fingerprints[key] = fp
+        if key not in previous:
+            report.new.append(file_path)
+        elif previous[key].rsplit(":", 2)[0] != params:
+            report.not_comparable.append(file_path)
+        elif previous[key] == fp:
+            report.unchanged.append(file_path)
+        else:
+            report.changed.append(file_path)
+
+    if manifest:
+        p = Path(manifest)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        merged = {**previous, **report.fingerprints}
+        payload = {"scheme": FINGERPRINT_SCHEME, "cryptographic": False, "fingerprints": merged}
+        p.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    return report
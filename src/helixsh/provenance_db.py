@@ -1,8 +1,20 @@
-"""SQLite-backed provenance store for helixsh executions."""
+"""SQLite-backed provenance store for helixsh executions.
+
+The database runs in WAL mode with a busy timeout, so concurrent helixsh
+processes (parallel `execution-start` calls on a shared login node) wait
+for the writer lock instead of failing with "database is locked", and
+readers never block writers.
+
+Schema changes are versioned with ``PRAGMA user_version``: `SCHEMA_SQL` is
+the version-1 baseline and each entry of `MIGRATIONS` moves the database
+one version forward.  `init_db` applies whatever is pending, so existing
+databases upgrade in place.
+"""
 
 from __future__ import annotations
 
 import sqlite3
+from collections.abc import Iterable
 from pathlib import Path
 from typing import Any
 
@@ -83,17 +95,232 @@ CREATE TABLE IF NOT EXISTS audit_events (
 """
 
 
+# Each entry upgrades the schema from version N to N + 1, starting at the
+# version-1 baseline in SCHEMA_SQL.  Append only; never edit a shipped entry.
+MIGRATIONS: tuple[tuple[str, ...], ...] = (
+    # 1 → 2: index the per-execution lookups in get_execution_bundle, hash
+    # lookups ("which runs used this file?") and time-range queries.
+    (
+        "CREATE INDEX IF NOT EXISTS idx_inputs_execution_id ON inputs(execution_id)",
+        "CREATE INDEX IF NOT EXISTS idx_containers_execution_id ON containers(execution_id)",
+        "CREATE INDEX IF NOT EXISTS idx_agents_execution_id ON agents(execution_id)",
+        "CREATE INDEX IF NOT EXISTS idx_acmg_evidence_execution_id ON acmg_evidence(execution_id)",
+        "CREATE INDEX IF NOT EXISTS idx_artifacts_execution_id ON artifacts(execution_id)",
+        "CREATE INDEX IF NOT EXISTS idx_audit_events_execution_id ON audit_events(execution_id)",
+        "CREATE INDEX IF NOT EXISTS idx_inputs_sha256 ON inputs(sha256)",
+        "CREATE INDEX IF NOT EXISTS idx_artifacts_sha256 ON artifacts(sha256)",
+        "CREATE INDEX IF NOT EXISTS idx_executions_created_at ON executions(created_at)",
+    ),
+)
+SCHEMA_VERSION = 1 + len(MIGRATIONS)
+BUSY_TIMEOUT_MS = 30_000
+
+
 def _connect(db_path: str) -> sqlite3.Connection:
     path = Path(db_path)
     path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(path)
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000)
     conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
     return conn
 
 
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Bring the schema up to `SCHEMA_VERSION`; return the resulting version.
+
+    Each step runs in its own ``BEGIN IMMEDIATE`` transaction together with
+    its ``user_version`` bump, and the version is re-read under the lock, so
+    concurrent callers apply every migration exactly once.
+    """
+    # The baseline is idempotent; databases created before versioning
+    # report user_version 0 but already hold these tables.
+    conn.executescript(SCHEMA_SQL)
+    isolation = conn.isolation_level
+    conn.isolation_level = None
+    try:
+        while schema_version(conn) < SCHEMA_VERSION:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                version = max(schema_version(conn), 1)
+                if version < SCHEMA_VERSION:
+                    for statement in MIGRATIONS[version - 1]:
+                        conn.execute(statement)
+                    conn.execute(f"PRAGMA user_version = {version + 1}")
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+    finally:
+        conn.isolation_level = isolation
+    return schema_version(conn)
+
+
 def init_db(db_path: str) -> None:
-    with _connect(db_path) as conn:
-        conn.executescript(SCHEMA_SQL)
+    conn = _connect(db_path)
+    try:
+        # WAL is persistent, so setting it once here covers later connections.
+        conn.execute("PRAGMA journal_mode = WAL")
+        migrate(conn)
+    finally:
+        conn.close()
+
+
+class ProvenanceSession:
+    """Write many provenance rows over one connection in one transaction.
+
+    Each module-level ``insert_*`` helper opens its own connection and
+    commits a single row, which costs an fsync per row.  A session batches
+    everything written inside its ``with`` block and commits once on exit
+    (or rolls back if the block raises)::
+
+        with ProvenanceSession(db) as s:
+            s.create_execution(execution_id=eid, ...)
+            s.insert_inputs(eid, [(path, sha256, size), ...])
+            s.add_audit_event(execution_id=eid, event_type="start", message=cmd)
+
+    The bulk ``insert_*s`` methods take row tuples in column order and use
+    ``executemany``.
+    """
+
+    def __init__(self, db_path: str) -> None:
+        self.db_path = db_path
+        self.conn = _connect(db_path)
+
+    def __enter__(self) -> ProvenanceSession:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            if exc_type is None:
+                self.conn.commit()
+            else:
+                self.conn.rollback()
+        finally:
+            self.conn.close()
+
+    def create_execution(
+        self,
+        *,
+        execution_id: str,
+        command: str,
+        workflow: str | None,
+        agent: str | None,
+        model: str | None,
+        status: str,
+        start_time: str,
+        container_digest: str | None,
+        input_hash: str,
+    ) -> None:
+        self.conn.execute(
+            """
+            INSERT INTO executions
+            (id, command, workflow, agent, model, status, start_time, container_digest, input_hash)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (execution_id, command, workflow, agent, model, status, start_time, container_digest, input_hash),
+        )
+
+    def finish_execution(
+        self,
+        *,
+        execution_id: str,
+        status: str,
+        end_time: str,
+        output_hash: str | None,
+        exit_code: int | None,
+    ) -> None:
+        updated = self.conn.execute(
+            """
+            UPDATE executions
+            SET status = ?, end_time = ?, output_hash = ?, exit_code = ?
+            WHERE id = ?
+            """,
+            (status, end_time, output_hash, exit_code, execution_id),
+        )
+        if updated.rowcount == 0:
+            raise ValueError(f"Execution id not found: {execution_id}")
+
+    def insert_inputs(self, execution_id: str, rows: Iterable[tuple[str, str, int]]) -> None:
+        """Insert ``(file_path, sha256, size_bytes)`` rows."""
+        self.conn.executemany(
+            "INSERT INTO inputs (execution_id, file_path, sha256, size_bytes) VALUES (?, ?, ?, ?)",
+            ((execution_id, *row) for row in rows),
+        )
+
+    def insert_input(self, *, execution_id: str, file_path: str, sha256: str, size_bytes: int) -> None:
+        self.insert_inputs(execution_id, [(file_path, sha256, size_bytes)])
+
+    def insert_containers(self, execution_id: str, rows: Iterable[tuple[str, str | None, str, str | None]]) -> None:
+        """Insert ``(image_name, image_digest, runtime, version)`` rows."""
+        self.conn.executemany(
+            "INSERT INTO containers (execution_id, image_name, image_digest, runtime, version) VALUES (?, ?, ?, ?, ?)",
+            ((execution_id, *row) for row in rows),
+        )
+
+    def insert_container(
+        self, *, execution_id: str, image_name: str, image_digest: str | None, runtime: str, version: str | None = None,
+    ) -> None:
+        self.insert_containers(execution_id, [(image_name, image_digest, runtime, version)])
+
+    def insert_agent(
+        self,
+        *,
+        execution_id: str,
+        agent_name: str,
+        model: str,
+        reasoning: str,
+        confidence: float,
+        execution_time_ms: int,
+        raw_output: str,
+    ) -> None:
+        self.conn.execute(
+            """
+            INSERT INTO agents (execution_id, agent_name, model, reasoning, confidence, execution_time_ms, raw_output)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (execution_id, agent_name, model, reasoning, confidence, execution_time_ms, raw_output),
+        )
+
+    def insert_acmg_evidence(
+        self,
+        *,
+        execution_id: str,
+        rule_code: str,
+        triggered: bool,
+        strength: str,
+        explanation: str,
+    ) -> None:
+        self.conn.execute(
+            """
+            INSERT INTO acmg_evidence (execution_id, rule_code, triggered, strength, explanation)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (execution_id, rule_code, int(triggered), strength, explanation),
+        )
+
+    def insert_artifacts(self, execution_id: str, rows: Iterable[tuple[str, str, str]]) -> None:
+        """Insert ``(artifact_type, path, sha256)`` rows."""
+        self.conn.executemany(
+            "INSERT INTO artifacts (execution_id, artifact_type, path, sha256) VALUES (?, ?, ?, ?)",
+            ((execution_id, *row) for row in rows),
+        )
+
+    def insert_artifact(self, *, execution_id: str, artifact_type: str, path: str, sha256: str) -> None:
+        self.insert_artifacts(execution_id, [(artifact_type, path, sha256)])
+
+    def add_audit_events(self, execution_id: str, rows: Iterable[tuple[str, str]]) -> None:
+        """Insert ``(event_type, message)`` rows."""
+        self.conn.executemany(
+            "INSERT INTO audit_events (execution_id, event_type, message) VALUES (?, ?, ?)",
+            ((execution_id, *row) for row in rows),
+        )
+
+    def add_audit_event(self, *, execution_id: str, event_type: str, message: str) -> None:
+        self.add_audit_events(execution_id, [(event_type, message)])
 
 
 def create_execution(
@@ -109,14 +336,17 @@ def create_execution(
     container_digest: str | None,
     input_hash: str,
 ) -> None:
-    with _connect(db_path) as conn:
-        conn.execute(
-            """
-            INSERT INTO executions
-            (id, command, workflow, agent, model, status, start_time, container_digest, input_hash)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (execution_id, command, workflow, agent, model, status, start_time, container_digest, input_hash),
+    with ProvenanceSession(db_path) as session:
+        session.create_execution(
+            execution_id=execution_id,
+            command=command,
+            workflow=workflow,
+            agent=agent,
+            model=model,
+            status=status,
+            start_time=start_time,
+            container_digest=container_digest,
+            input_hash=input_hash,
         )
 
 
@@ -129,32 +359,21 @@ def finish_execution(
     output_hash: str | None,
     exit_code: int | None,
 ) -> None:
-    with _connect(db_path) as conn:
-        updated = conn.execute(
-            """
-            UPDATE executions
-            SET status = ?, end_time = ?, output_hash = ?, exit_code = ?
-            WHERE id = ?
-            """,
-            (status, end_time, output_hash, exit_code, execution_id),
+    with ProvenanceSession(db_path) as session:
+        session.finish_execution(
+            execution_id=execution_id, status=status, end_time=end_time, output_hash=output_hash, exit_code=exit_code,
         )
-        if updated.rowcount == 0:
-            raise ValueError(f"Execution id not found: {execution_id}")
 
 
 def insert_input(db_path: str, *, execution_id: str, file_path: str, sha256: str, size_bytes: int) -> None:
-    with _connect(db_path) as conn:
-        conn.execute(
-            "INSERT INTO inputs (execution_id, file_path, sha256, size_bytes) VALUES (?, ?, ?, ?)",
-            (execution_id, file_path, sha256, size_bytes),
-        )
+    with ProvenanceSession(db_path) as session:
+        session.insert_input(execution_id=execution_id, file_path=file_path, sha256=sha256, size_bytes=size_bytes)
 
 
 def insert_container(db_path: str, *, execution_id: str, image_name: str, image_digest: str | None, runtime: str, version: str | None = None) -> None:
-    with _connect(db_path) as conn:
-        conn.execute(
-            "INSERT INTO containers (execution_id, image_name, image_digest, runtime, version) VALUES (?, ?, ?, ?, ?)",
-            (execution_id, image_name, image_digest, runtime, version),
+    with ProvenanceSession(db_path) as session:
+        session.insert_container(
+            execution_id=execution_id, image_name=image_name, image_digest=image_digest, runtime=runtime, version=version,
         )
 
 
@@ -169,13 +388,15 @@ def insert_agent(
     execution_time_ms: int,
     raw_output: str,
 ) -> None:
-    with _connect(db_path) as conn:
-        conn.execute(
-            """
-            INSERT INTO agents (execution_id, agent_name, model, reasoning, confidence, execution_time_ms, raw_output)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            """,
-            (execution_id, agent_name, model, reasoning, confidence, execution_time_ms, raw_output),
+    with ProvenanceSession(db_path) as session:
+        session.insert_agent(
+            execution_id=execution_id,
+            agent_name=agent_name,
+            model=model,
+            reasoning=reasoning,
+            confidence=confidence,
+            execution_time_ms=execution_time_ms,
+            raw_output=raw_output,
         )
 
 
@@ -188,30 +409,21 @@ def insert_acmg_evidence(
     strength: str,
     explanation: str,
 ) -> None:
-    with _connect(db_path) as conn:
-        conn.execute(
-            """
-            INSERT INTO acmg_evidence (execution_id, rule_code, triggered, strength, explanation)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (execution_id, rule_code, int(triggered), strength, explanation),
+    with ProvenanceSession(db_path) as session:
+        session.insert_acmg_evidence(
+            execution_id=execution_id, rule_code=rule_code, triggered=triggered,
+            strength=strength, explanation=explanation,
         )
 
 
 def insert_artifact(db_path: str, *, execution_id: str, artifact_type: str, path: str, sha256: str) -> None:
-    with _connect(db_path) as conn:
-        conn.execute(
-            "INSERT INTO artifacts (execution_id, artifact_type, path, sha256) VALUES (?, ?, ?, ?)",
-            (execution_id, artifact_type, path, sha256),
-        )
+    with ProvenanceSession(db_path) as session:
+        session.insert_artifact(execution_id=execution_id, artifact_type=artifact_type, path=path, sha256=sha256)
 
 
 def add_audit_event(db_path: str, *, execution_id: str, event_type: str, message: str) -> None:
-    with _connect(db_path) as conn:
-        conn.execute(
-            "INSERT INTO audit_events (execution_id, event_type, message) VALUES (?, ?, ?)",
-            (execution_id, event_type, message),
-        )
+    with ProvenanceSession(db_path) as session:
+        session.add_audit_event(execution_id=execution_id, event_type=event_type, message=message)
 
 
 def get_execution_bundle(db_path: str, execution_id: str) -> dict[str, Any]:
@@ -0,0 +1,297 @@
+"""Scheduler queue-wait analysis and Nextflow executor tuning hints.
+
+On batch schedulers (SLURM, PBS, LSF, SGE) much of a run's wall time can be
+spent between a task's `submit` and `start` timestamps.  This module derives,
+from the trace alone:
+
+  - per-process queue-wait distributions (p50/p95/p99 via QuantileSketch);
+  - a time series of submissions and waits in fixed buckets;
+  - submission bursts (peak submissions in any 1 s / 60 s sliding window);
+  - peak tasks in flight (submitted, not yet complete), which is what
+    Nextflow's `executor.queueSize` caps.
+
+It then suggests `executor.queueSize`, `executor.submitRateLimit` and
+`executor.pollInterval` values, plus a job-array `array` directive for
+processes whose many short tasks spend longer queued than running.  The
+thresholds are rules of thumb, not scheduler-specific limits — confirm
+against your site's policies.
+
+Processes are keyed by their fully qualified path (`trace.task_path`), so
+each nf-core tool has its own wait distribution and `withName` selector.
+"""
+
+from __future__ import annotations
+
+import math
+from array import array
+from dataclasses import dataclass, field
+
+from helixsh.sketch import QuantileSketch
+from helixsh.trace import iter_trace_tasks, task_path
+
+# Nextflow's default executor.queueSize for grid executors.
+NEXTFLOW_DEFAULT_QUEUE_SIZE = 100
+# Submissions per second above which many SLURM/PBS controllers start to throttle.
+BURST_SUBMITS_PER_SEC = 20
+# Median wait above which queueing, not task runtime, is worth tuning.
+HIGH_MEDIAN_WAIT_S = 60.0
+# pollInterval bounds (seconds) when scaling with typical task runtime.
+_POLL_MIN_S, _POLL_MAX_S = 5, 300
+# Processes with at least this many tasks may be batched into job arrays.
+ARRAY_MIN_TASKS = 20
+MAX_ARRAY_SIZE = 100
+
+
+@dataclass
+class ProcessQueueWait:
+    process: str
+    tasks: int
+    mean_wait_s: float
+    max_wait_s: float
+    p50_wait_s: float
+    p95_wait_s: float
+    p99_wait_s: float
+    mean_runtime_s: float
+
+
+@dataclass
+class QueueBucket:
+    start_ms: int
+    offset_s: float
+    submitted: int
+    mean_wait_s: float
+    max_wait_s: float
+
+
+@dataclass
+class ExecutorRecommendation:
+    queue_size: int
+    submit_rate_limit: str
+    poll_interval: str
+    reasons: list[str] = field(default_factory=list)
+    # fully qualified process → suggested `array` size
+    job_arrays: dict[str, int] = field(default_factory=dict)
+
+    def to_nextflow_config(self) -> str:
+        lines = [
+            "// Auto-generated by helixsh trace-queue-wait",
+            "executor {",
+            f"    queueSize = {self.queue_size}",
+            f"    submitRateLimit = '{self.submit_rate_limit}'",
+            f"    pollInterval = '{self.poll_interval}'",
+            "}",
+        ]
+        if self.job_arrays:
+            lines.append("// Job arrays need Nextflow 24.04+ and a grid executor")
+            lines.append("process {")
+            for process, size in self.job_arrays.items():
+                lines.append(f"    withName: '{process}' {{")
+                lines.append(f"        array = {size}")
+                lines.append("    }")
+            lines.append("}")
+        return "\n".join(lines) + "\n"
+
+
+@dataclass
+class QueueWaitReport:
+    trace_file: str
+    tasks: int
+    total_wait_hours: float
+    mean_wait_s: float
+    p50_wait_s: float
+    p95_wait_s: float
+    peak_in_flight: int
+    peak_queued: int
+    peak_submits_per_sec: int
+    peak_submits_per_min: int
+    processes: list[ProcessQueueWait] = field(default_factory=list)
+    buckets: list[QueueBucket] = field(default_factory=list)
+    recommendation: ExecutorRecommendation | None = None
+    warnings: list[str] = field(default_factory=list)
+
+
+def _peak_window(times: array, window_ms: int) -> int:
+    """Max number of sorted timestamps falling in any half-open window."""
+    best = lo = 0
+    for hi, t in enumerate(times):
+        while t - times[lo] >= window_ms:
+            lo += 1
+        best = max(best, hi - lo + 1)
+    return best
+
+
+def _peak_overlap(intervals: list[tuple[int, int]]) -> int:
+    """Max number of [begin, end) intervals open at the same instant."""
+    events = sorted([(b, 1) for b, _ in intervals] + [(e, -1) for _, e in intervals])
+    level = best = 0
+    for _, delta in events:
+        level += delta
+        best = max(best, level)
+    return best
+
+
+def _format_interval(seconds: float) -> str:
+    if seconds >= 60 and seconds % 60 == 0:
+        return f"{int(seconds // 60)} min"
+    return f"{int(seconds)} sec"
+
+
+def recommend_executor(
+    peak_in_flight: int,
+    peak_submits_per_sec: int,
+    peak_submits_per_min: int,
+    p50_wait_s: float,
+    p50_runtime_s: float,
+) -> ExecutorRecommendation:
+    reasons: list[str] = []
+
+    if p50_wait_s > HIGH_MEDIAN_WAIT_S:
+        # The scheduler is already the bottleneck; a bigger queue only adds pending jobs.
+        queue_size = max(10, peak_in_flight)
+        reasons.append(
+            f"Median queue wait {p50_wait_s:.0f}s — tasks wait on the scheduler, not Nextflow; "
+            f"keep queueSize near the observed peak ({peak_in_flight})"
+        )
+    elif peak_in_flight >= NEXTFLOW_DEFAULT_QUEUE_SIZE * 0.95:
+        queue_size = int(math.ceil(peak_in_flight * 1.5 / 10) * 10)
+        reasons.append(
+            f"Peak in-flight tasks ({peak_in_flight}) reached the queueSize cap with short waits — raise it"
+        )
+    else:
+        queue_size = max(10, int(math.ceil(peak_in_flight * 1.25 / 10) * 10))
+        reasons.append(f"queueSize sized to 125% of peak in-flight tasks ({peak_in_flight})")
+
+    if peak_submits_per_sec > BURST_SUBMITS_PER_SEC:
+        per_min = min(peak_submits_per_min, BURST_SUBMITS_PER_SEC * 30)
+        rate = f"{max(1, per_min)}/1min"
+        reasons.append(
+            f"Submission burst of {peak_submits_per_sec}/s exceeds {BURST_SUBMITS_PER_SEC}/s — "
+            "rate-limit to smooth scheduler load"
+        )
+    else:
+        rate = f"{BURST_SUBMITS_PER_SEC}/1sec"
+        reasons.append(f"Peak {peak_submits_per_sec} submits/s is within scheduler-friendly limits")
+
+    poll_s = min(max(p50_runtime_s / 20, _POLL_MIN_S), _POLL_MAX_S)
+    poll_s = 60 * round(poll_s / 60) if poll_s >= 60 else 5 * round(poll_s / 5)
+    reasons.append(f"pollInterval scaled to ~5% of median task runtime ({p50_runtime_s:.0f}s)")
+
+    return ExecutorRecommendation(
+        queue_size=queue_size,
+        submit_rate_limit=rate,
+        poll_interval=_format_interval(poll_s),
+        reasons=reasons,
+    )
+
+
+def recommend_job_arrays(processes: list[ProcessQueueWait]) -> dict[str, int]:
+    """Array sizes for processes whose many tasks typically queue longer than they run."""
+    return {
+        p.process: min(p.tasks, MAX_ARRAY_SIZE)
+        for p in processes
+        if p.tasks >= ARRAY_MIN_TASKS and p.p50_wait_s > HIGH_MEDIAN_WAIT_S and p.p50_wait_s > p.mean_runtime_s
+    }
+
+
+def analyze_queue_wait(path: str, bucket_s: float = 600) -> QueueWaitReport:
+    """Compute queue-wait distributions and executor settings from a trace."""
+    warnings: list[str] = []
+    overall = QuantileSketch()
+    runtime = QuantileSketch()
+    per_process: dict[str, tuple[QuantileSketch, list[float]]] = {}
+    submits = array("q")
+    in_flight: list[tuple[int, int]] = []
+    queued: list[tuple[int, int]] = []
+    raw_buckets: dict[int, list[float]] = {}
+    bucket_ms = max(1, int(bucket_s * 1000))
+    skipped = 0
+
+    try:
+        for t in iter_trace_tasks(path, warnings):
+            if not t.submit_ms or not t.start_ms:
+                skipped += 1
+                continue
+            wait_s = max(t.start_ms - t.submit_ms, 0) / 1000
+            run_s = max(t.complete_ms - t.start_ms, 0) / 1000
+            overall.add(wait_s)
+            runtime.add(run_s)
+            sketch, stats = per_process.setdefault(task_path(t.name), (QuantileSketch(), [0, 0.0, 0.0, 0.0]))
+            sketch.add(wait_s)
+            stats[0] += 1
+            stats[1] += wait_s
+            stats[2] = max(stats[2], wait_s)
+            stats[3] += run_s
+            submits.append(t.submit_ms)
+            in_flight.append((t.submit_ms, max(t.complete_ms, t.start_ms)))
+            queued.append((t.submit_ms, t.start_ms))
+            b = raw_buckets.setdefault(t.submit_ms // bucket_ms * bucket_ms, [0, 0.0, 0.0])
+            b[0] += 1
+            b[1] += wait_s
+            b[2] = max(b[2], wait_s)
+    except (FileNotFoundError, ValueError) as exc:
+        warnings.append(str(exc))
+
+    if skipped:
+        warnings.append(f"{skipped} task(s) lack submit/start timestamps and were skipped")
+    if not submits:
+        return QueueWaitReport(
+            trace_file=path, tasks=0, total_wait_hours=0, mean_wait_s=0,
+            p50_wait_s=0, p95_wait_s=0, peak_in_flight=0, peak_queued=0,
+            peak_submits_per_sec=0, peak_submits_per_min=0,
+            warnings=warnings or ["No timed tasks found in trace file"],
+        )
+
+    submits = array("q", sorted(submits))
+    per_sec = _peak_window(submits, 1000)
+    per_min = _peak_window(submits, 60_000)
+    peak_in_flight = _peak_overlap(in_flight)
+    peak_queued = _peak_overlap(queued)
+    total_wait_s = sum(stats[1] for _, stats in per_process.values())
+    origin = submits[0] // bucket_ms * bucket_ms
+
+    processes = [
+        ProcessQueueWait(
+            process=name,
+            tasks=int(stats[0]),
+            mean_wait_s=round(stats[1] / stats[0], 2),
+            max_wait_s=round(stats[2], 2),
+            p50_wait_s=round(sketch.quantile(0.5), 2),
+            p95_wait_s=round(sketch.quantile(0.95), 2),
+            p99_wait_s=round(sketch.quantile(0.99), 2),
+            mean_runtime_s=round(stats[3] / stats[0], 2),
+        )
+        for name, (sketch, stats) in per_process.items()
+    ]
+    processes.sort(key=lambda p: p.mean_wait_s * p.tasks, reverse=True)
+    recommendation = recommend_executor(
+        peak_in_flight, per_sec, per_min, overall.quantile(0.5), runtime.quantile(0.5),
+    )
+    recommendation.job_arrays = recommend_job_arrays(processes)
+    for process, size in recommendation.job_arrays.items():
+        recommendation.reasons.append(f"{process}: tasks queue longer than they run — submit as job arrays of {size}")
+
+    return QueueWaitReport(
+        trace_file=path,
+        tasks=len(submits),
+        total_wait_hours=round(total_wait_s / 3600, 4),
+        mean_wait_s=round(total_wait_s / len(submits), 2),
+        p50_wait_s=round(overall.quantile(0.5), 2),
+        p95_wait_s=round(overall.quantile(0.95), 2),
+        peak_in_flight=peak_in_flight,
+        peak_queued=peak_queued,
+        peak_submits_per_sec=per_sec,
+        peak_submits_per_min=per_min,
+        processes=processes,
+        buckets=[
+            QueueBucket(
+                start_ms=start,
+                offset_s=(start - origin) / 1000,
+                submitted=int(b[0]),
+                mean_wait_s=round(b[1] / b[0], 2),
+                max_wait_s=round(b[2], 2),
+            )
+            for start, b in sorted(raw_buckets.items())
+        ],
+        recommendation=recommendation,
+        warnings=warnings,
+    )
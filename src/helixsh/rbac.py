@@ -18,10 +18,26 @@ _READ_ONLY = {
     "ref-list", "pipeline-list",
     "envmodules-list",
     "tower-auth", "tower-status", "tower-envs",
-    "trace-summary",
+    "trace-summary", "trace-timeline", "trace-critical-path", "trace-queue-wait",
+    "trace-io", "trace-waste", "trace-diff", "trace-stragglers", "trace-samples",
+    "trace-contention", "cluster-simulate", "trace-groupby",
+    "trace-rightsize", "trace-retry-ladder",
     "cost-estimate",
 }
 
+# Options (argparse dests) of read-only commands that write files.  Any role
+# may run the analysis; writing its output needs one of `_FILE_WRITERS`.
+WRITE_OPTIONS: dict[str, tuple[str, ...]] = {
+    "preflight": ("fingerprints",),
+    "trace-summary": ("rebuild_out", "cache", "cache_dir"),
+    "trace-timeline": ("out",),
+    "trace-queue-wait": ("config_out",),
+    "trace-io": ("config_out",),
+    "trace-rightsize": ("out",),
+    "trace-retry-ladder": ("out",),
+}
+_FILE_WRITERS = {"admin", "analyst"}
+
 # Permissions available to analysts (pipeline operators)
 _ANALYST_EXTRA = {
     "run", "intent", "validate-schema",
@@ -61,8 +77,10 @@ class AccessDecision:
     allowed: bool
 
 
-def check_access(role: str, action: str) -> AccessDecision:
+def check_access(role: str, action: str, writes_files: bool = False) -> AccessDecision:
     role_norm = role.strip().lower()
     action_norm = action.strip()
     allowed = action_norm in ROLE_PERMISSIONS.get(role_norm, set())
+    if writes_files and role_norm not in _FILE_WRITERS:
+        allowed = False
     return AccessDecision(role=role_norm, action=action_norm, allowed=allowed)
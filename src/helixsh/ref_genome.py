@@ -18,11 +18,12 @@ Cache layout:
 
 from __future__ import annotations
 
-import hashlib
 import urllib.request
 from dataclasses import dataclass, field
 from pathlib import Path
 
+from helixsh.hashing import file_digest
+
 # Catalogue entry: genome_id -> {fasta_url, fasta_sha256, gtf_url, gtf_sha256, source}
 # URLs point to AWS iGenomes (public S3) or Ensembl FTP.
 # SHA-256 values are placeholders — real deployments should pin these from a
@@ -105,12 +106,9 @@ class DownloadResult:
     errors: list[str] = field(default_factory=list)
 
 
-def sha256_file(path: Path) -> str:
-    digest = hashlib.sha256()
-    with path.open("rb") as fh:
-        for chunk in iter(lambda: fh.read(1024 * 1024), b""):
-            digest.update(chunk)
-    return digest.hexdigest()
+def sha256_file(path: Path, *, verify: bool = False) -> str:
+    """SHA-256 via the shared hash cache (see `helixsh.hashing`)."""
+    return file_digest(path, "sha256", verify=verify)
 
 
 def verify_checksum(path: Path, expected: str) -> bool:
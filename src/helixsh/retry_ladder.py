@@ -0,0 +1,289 @@
+"""Cost-optimal OOM retry ladders from historical Nextflow traces.
+
+A task killed for exceeding its memory (see `diagnostics.is_out_of_memory`)
+is re-run at the next memory step, so every failed attempt is paid for.
+Requesting the maximum up front avoids retries but over-reserves for most
+tasks; requesting the median is cheap for most tasks but wastes a partial
+run on every large one.  This module picks, per process, the initial memory
+``M0`` and the escalation multiplier ``k`` (attempt ``n`` requests
+``M0 * k ** (n - 1)``) that minimise expected reserved cost:
+
+  - each task's memory need is its successful attempt's peak RSS; tasks
+    that only ever failed with OOM are treated as needing just over their
+    last request (a lower bound, reported as a warning);
+  - a failed attempt costs ``fail_fraction`` of the successful runtime at
+    its requested size.  The fraction is estimated from tasks that have
+    both an OOM attempt and a success in the traces, else 0.5;
+  - a ladder that cannot reach a task's need within ``max_retries`` is
+    rejected when any ladder can cover all observed tasks.
+
+Candidates for ``M0`` are the process's need quantiles; for each, every
+multiplier in `MULTIPLIERS` is scored against the empirical need
+distribution with one binary search per task.  The result is emitted as
+`withName` blocks with a dynamic `memory` closure and `maxRetries`, in the
+same style as `trace-rightsize`.
+
+The pipeline's own `errorStrategy` is left in place by default (nf-core's
+base config already retries exit 137); pass ``error_strategy=True`` to
+`RetryLadderReport.to_nextflow_config` to replace it with an OOM-only one.
+
+Processes are keyed by their fully qualified path (`trace.task_path`), so
+each nf-core tool gets its own ladder and a selector that matches it.
+"""
+
+from __future__ import annotations
+
+import math
+import statistics
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from itertools import accumulate
+from pathlib import Path
+
+from helixsh.cloud_cost import unit_prices
+from helixsh.diagnostics import OOM_EXIT_CODES, is_out_of_memory
+from helixsh.trace import iter_trace_tasks, task_path
+
+MULTIPLIERS = (1.25, 1.5, 2.0, 3.0)
+NEED_QUANTILES = (0.5, 0.75, 0.9, 0.95, 0.99, 1.0)
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_FAIL_FRACTION = 0.5
+# Headroom on top of observed peak RSS when choosing M0 candidates.
+NEED_MARGIN = 0.05
+MIN_TASKS = 5
+
+
+@dataclass
+class RetryPlan:
+    process: str
+    tasks: int
+    oom_attempts: int                 # observed in the traces
+    p95_need_gb: float
+    max_need_gb: float
+    initial_memory_gb: int
+    multiplier: float
+    max_retries: int
+    expected_retries_per_task: float
+    uncovered_tasks: int              # observed needs the ladder cannot reach
+    expected_cost_usd: float          # for the observed task count
+    observed_cost_usd: float          # what the traced attempts actually reserved
+    fixed_max_cost_usd: float         # cost of requesting max need up front, no retries
+
+    @property
+    def memory_closure(self) -> str:
+        if self.max_retries == 0:
+            return f"{{ {self.initial_memory_gb}.GB }}"
+        return f"{{ {self.initial_memory_gb}.GB * ({self.multiplier:g} ** (task.attempt - 1)) }}"
+
+
+@dataclass
+class RetryLadderReport:
+    provider: str
+    instance_family: str
+    fail_fraction: float
+    expected_cost_usd: float
+    observed_cost_usd: float
+    plans: list[RetryPlan] = field(default_factory=list)
+    warnings: list[str] = field(default_factory=list)
+
+    def to_nextflow_config(self, error_strategy: bool = False) -> str:
+        """Render a Nextflow config with per-process memory ladders.
+
+        Unless ``error_strategy`` is set, each process keeps the pipeline's
+        `errorStrategy`, which must retry out-of-memory exits for the ladder
+        to climb.
+        """
+        codes = ", ".join(str(c) for c in sorted(OOM_EXIT_CODES))
+        lines = [
+            "// Auto-generated by helixsh trace-retry-ladder",
+            "// memory = M0 * k ** (attempt - 1)",
+            "// Retries only on out-of-memory exits" if error_strategy else
+            f"// The pipeline's errorStrategy must retry exit status {codes} for the ladder to apply",
+            "// Pass to Nextflow with: -c retry.config",
+            "process {",
+        ]
+        for plan in self.plans:
+            lines.append(f"    withName: '{plan.process}' {{")
+            lines.append(f"        memory = {plan.memory_closure}")
+            if error_strategy:
+                lines.append(f"        errorStrategy = {{ task.exitStatus in [{codes}] ? 'retry' : 'terminate' }}")
+            lines.append(f"        maxRetries = {plan.max_retries}")
+            lines.append("    }")
+        lines.append("}")
+        return "\n".join(lines) + "\n"
+
+
+@dataclass
+class _TaskHistory:
+    cpus: int = 0
+    need_mb: float = 0.0          # peak RSS of the successful attempt
+    runtime_h: float = 0.0        # realtime of the successful attempt
+    succeeded: bool = False
+    oom_attempts: int = 0
+    oom_runtime_h: float = 0.0
+    max_oom_request_mb: float = 0.0
+
+
+def _ladder_cost(
+    tasks: list[tuple[float, float, int]],
+    m0_mb: float,
+    k: float,
+    retries: int,
+    prices: dict[str, float],
+    fail_fraction: float,
+) -> tuple[float, int, int, int]:
+    """Return (cost, failed attempts, uncovered tasks, highest attempt index used)."""
+    rungs = [m0_mb * k ** i for i in range(retries + 1)]
+    rung_sums = [0.0, *accumulate(rungs)]
+    cpu_price, gb_price = prices["cpu"], prices["mem"] / 1024
+    cost = 0.0
+    failed = uncovered = top = 0
+    for need_mb, runtime_h, cpus in tasks:
+        j = bisect_left(rungs, need_mb)
+        if j > retries:
+            # Every attempt fails; the task is not recovered by this ladder.
+            uncovered += 1
+            failed += retries + 1
+            cost += runtime_h * fail_fraction * (cpus * cpu_price * (retries + 1) + gb_price * rung_sums[-1])
+            continue
+        top = max(top, j)
+        failed += j
+        cost += runtime_h * (
+            cpus * cpu_price * (fail_fraction * j + 1)
+            + gb_price * (fail_fraction * rung_sums[j] + rungs[j])
+        )
+    return cost, failed, uncovered, top
+
+
+def optimise_retry_ladders(
+    paths: list[str],
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    max_memory_gb: float | None = None,
+    provider: str = "aws",
+    instance_family: str = "general",
+    fail_fraction: float | None = None,
+    min_tasks: int = MIN_TASKS,
+) -> RetryLadderReport:
+    """Choose per-process initial memory and retry multiplier from trace history."""
+    if max_retries < 0:
+        raise ValueError("max_retries must be >= 0")
+    if fail_fraction is not None and not 0 < fail_fraction <= 1:
+        raise ValueError("fail_fraction must be in (0, 1]")
+    prices = unit_prices(provider, instance_family)
+    warnings: list[str] = []
+    # process → (run, task name) → history; attempts of one task share its name.
+    history: dict[str, dict[tuple[int, str], _TaskHistory]] = {}
+    observed: dict[str, float] = {}
+
+    for run, path in enumerate(paths):
+        try:
+            for t in iter_trace_tasks(path, warnings):
+                process = task_path(t.name)
+                hours = t.realtime_ms / 3_600_000
+                request_mb = t.memory_req_mb or t.peak_rss_mb
+                observed[process] = observed.get(process, 0.0) + hours * (
+                    (t.cpus or 1) * prices["cpu"] + request_mb / 1024 * prices["mem"]
+                )
+                h = history.setdefault(process, {}).setdefault((run, t.name), _TaskHistory())
+                h.cpus = max(h.cpus, t.cpus or 1)
+                if is_out_of_memory(t.exit_code):
+                    h.oom_attempts += 1
+                    h.oom_runtime_h += hours
+                    h.max_oom_request_mb = max(h.max_oom_request_mb, t.memory_req_mb)
+                elif t.status.upper() in {"COMPLETED", "CACHED"} and t.peak_rss_mb > 0:
+                    h.succeeded = True
+                    h.need_mb = max(h.need_mb, t.peak_rss_mb)
+                    h.runtime_h = max(h.runtime_h, hours)
+        except (FileNotFoundError, ValueError) as exc:
+            warnings.append(f"{path}: {exc}")
+
+    if fail_fraction is None:
+        ratios = [
+            (h.oom_runtime_h / h.oom_attempts) / h.runtime_h
+            for tasks in history.values() for h in tasks.values()
+            if h.succeeded and h.oom_attempts and h.runtime_h > 0
+        ]
+        fail_fraction = min(max(statistics.median(ratios), 0.05), 1.0) if ratios else DEFAULT_FAIL_FRACTION
+        if not ratios:
+            warnings.append(
+                f"No task has both an OOM attempt and a success — assuming failed attempts run "
+                f"{DEFAULT_FAIL_FRACTION:.0%} of the successful runtime"
+            )
+
+    cap_mb = max_memory_gb * 1024 if max_memory_gb else math.inf
+    plans: list[RetryPlan] = []
+    for process, by_name in sorted(history.items()):
+        tasks: list[tuple[float, float, int]] = []
+        censored = 0
+        for h in by_name.values():
+            if h.succeeded:
+                tasks.append((h.need_mb, h.runtime_h, h.cpus))
+            elif h.oom_attempts and h.max_oom_request_mb:
+                censored += 1
+                runtime_h = h.oom_runtime_h / h.oom_attempts / fail_fraction
+                tasks.append((h.max_oom_request_mb * 1.01, runtime_h, h.cpus))
+        if len(tasks) < min_tasks:
+            if tasks:
+                warnings.append(f"{process}: only {len(tasks)} task(s) with memory data — skipped (min {min_tasks})")
+            continue
+        if censored:
+            warnings.append(
+                f"{process}: {censored} task(s) never succeeded after OOM — need taken as just above the last request"
+            )
+
+        needs = sorted(need for need, _, _ in tasks)
+        candidates = sorted({
+            max(1, math.ceil(min(needs[min(len(needs) - 1, int(q * len(needs)))] * (1 + NEED_MARGIN), cap_mb) / 1024))
+            for q in NEED_QUANTILES
+        })
+        best = None
+        for m0_gb in candidates:
+            for k in MULTIPLIERS:
+                # Drop rungs that would exceed the node memory cap.
+                retries = 0
+                while retries < max_retries and m0_gb * 1024 * k ** (retries + 1) <= cap_mb:
+                    retries += 1
+                cost, failed, uncovered, top = _ladder_cost(tasks, m0_gb * 1024, k, retries, prices, fail_fraction)
+                # Prefer covering every task, then lower cost, then smaller ladders.
+                key = (uncovered, round(cost, 6), top, k)
+                if best is None or key < best[0]:
+                    best = (key, m0_gb, k, retries, cost, failed, uncovered, top)
+        _, m0_gb, k, retries, cost, failed, uncovered, top = best
+        if uncovered:
+            warnings.append(f"{process}: {uncovered} task(s) exceed the largest reachable memory step")
+
+        max_need = needs[-1]
+        fixed_gb = math.ceil(min(max_need * (1 + NEED_MARGIN), cap_mb) / 1024)
+        fixed_cost, *_ = _ladder_cost(tasks, fixed_gb * 1024, 1.0, 0, prices, fail_fraction)
+        plans.append(RetryPlan(
+            process=process,
+            tasks=len(tasks),
+            oom_attempts=sum(h.oom_attempts for h in by_name.values()),
+            p95_need_gb=round(needs[min(len(needs) - 1, int(0.95 * len(needs)))] / 1024, 2),
+            max_need_gb=round(max_need / 1024, 2),
+            initial_memory_gb=m0_gb,
+            multiplier=k,
+            # Keep at least one retry as a safety net unless the user disabled retries.
+            max_retries=max(top, min(1, retries)),
+            expected_retries_per_task=round(failed / len(tasks), 3),
+            uncovered_tasks=uncovered,
+            expected_cost_usd=round(cost, 4),
+            observed_cost_usd=round(observed.get(process, 0.0), 4),
+            fixed_max_cost_usd=round(fixed_cost, 4),
+        ))
+
+    return RetryLadderReport(
+        provider=provider.strip().lower(),
+        instance_family=instance_family.strip().lower(),
+        fail_fraction=round(fail_fraction, 3),
+        expected_cost_usd=round(sum(p.expected_cost_usd for p in plans), 4),
+        observed_cost_usd=round(sum(p.observed_cost_usd for p in plans), 4),
+        plans=plans,
+        warnings=warnings,
+    )
+
+
+def write_retry_config(report: RetryLadderReport, out_path: str, error_strategy: bool = False) -> None:
+    p = Path(out_path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_text(report.to_nextflow_config(error_strategy), encoding="utf-8")
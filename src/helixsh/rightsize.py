@@ -0,0 +1,139 @@
+"""Trace-driven right-sizing of Nextflow process resources.
+
+Turns observed per-process peak RSS, realtime and %cpu from a trace into
+`withName` blocks setting `cpus`, `memory` and `time`.  Each value comes
+from a high percentile of the process's quantile sketch plus a safety
+margin, so a single outlier task does not inflate every request the way
+sizing from the maximum would.
+
+Processes are keyed by their fully qualified path (`trace.task_path`), so
+nf-core tools nested in subworkflows are sized separately and each
+selector matches exactly one process.
+
+Output format mirrors `EnvModulesConfig.to_nextflow_config` — a config
+ready to pass via `-c resources.config`.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from helixsh.trace import ProcessAccumulator, iter_trace_tasks, task_path
+
+DEFAULT_PERCENTILE = 95.0
+DEFAULT_MARGIN = 0.2
+# Floors so tiny tasks still get schedulable requests.
+MIN_MEMORY_MB = 1024
+MIN_TIME_MIN = 10
+# Observed cores within this much of a whole core do not round up to another CPU.
+CPU_SLACK_CORES = 0.1
+
+
+@dataclass
+class RightsizeEntry:
+    process_selector: str
+    tasks: int
+    cpus: int
+    memory_gb: int
+    time_min: int
+    observed_rss_mb: float       # percentile peak RSS before margin
+    observed_realtime_s: float   # percentile realtime before margin
+    observed_cpu_pct: float      # percentile %cpu
+
+    @property
+    def memory(self) -> str:
+        return f"{self.memory_gb}.GB"
+
+    @property
+    def time(self) -> str:
+        if self.time_min % 60 == 0:
+            return f"{self.time_min // 60}.h"
+        return f"{self.time_min}.m"
+
+
+@dataclass
+class RightsizeConfig:
+    percentile: float
+    margin: float
+    entries: list[RightsizeEntry] = field(default_factory=list)
+    warnings: list[str] = field(default_factory=list)
+
+    def to_nextflow_config(self) -> str:
+        """Render a Nextflow resources.config string."""
+        lines = [
+            "// Auto-generated by helixsh trace-rightsize",
+            f"// p{self.percentile:g} of observed usage + {self.margin:.0%} margin",
+            "// Pass to Nextflow with: -c resources.config",
+            "process {",
+        ]
+        for entry in self.entries:
+            lines.append(f"    withName: '{entry.process_selector}' {{")
+            lines.append(f"        cpus = {entry.cpus}")
+            lines.append(f"        memory = {entry.memory}")
+            lines.append(f"        time = {entry.time}")
+            lines.append("    }")
+        lines.append("}")
+        return "\n".join(lines) + "\n"
+
+
+def rightsize_trace(
+    path: str,
+    percentile: float = DEFAULT_PERCENTILE,
+    margin: float = DEFAULT_MARGIN,
+    min_tasks: int = 1,
+) -> RightsizeConfig:
+    """Derive per-process cpus/memory/time requests from a trace."""
+    if not 0 < percentile <= 100:
+        raise ValueError("percentile must be in (0, 100]")
+    if margin < 0:
+        raise ValueError("margin must be >= 0")
+
+    warnings: list[str] = []
+    processes: dict[str, ProcessAccumulator] = {}
+    try:
+        for t in iter_trace_tasks(path, warnings):
+            name = task_path(t.name)
+            proc = processes.get(name)
+            if proc is None:
+                proc = processes[name] = ProcessAccumulator(process=name)
+            proc.add(t)
+    except (FileNotFoundError, ValueError) as exc:
+        warnings.append(str(exc))
+
+    config = RightsizeConfig(percentile=percentile, margin=margin, warnings=warnings)
+    q = percentile / 100
+    for name, proc in sorted(processes.items()):
+        if proc.task_count < min_tasks:
+            config.warnings.append(f"{name}: only {proc.task_count} task(s) — skipped (min {min_tasks})")
+            continue
+        sk = proc.sketches
+        rss_mb = sk["peak_rss_mb"].quantile(q)
+        realtime_s = sk["realtime_s"].quantile(q)
+        cpu_pct = sk["cpu_pct"].quantile(q)
+        if rss_mb <= 0 and realtime_s <= 0:
+            config.warnings.append(f"{name}: no peak_rss/realtime data — skipped")
+            continue
+
+        memory_mb = max(rss_mb * (1 + margin), MIN_MEMORY_MB)
+        time_min = max(math.ceil(realtime_s * (1 + margin) / 60), MIN_TIME_MIN)
+        if time_min > 60:
+            time_min = math.ceil(time_min / 60) * 60
+        config.entries.append(RightsizeEntry(
+            process_selector=name,
+            tasks=proc.task_count,
+            cpus=max(1, math.ceil(cpu_pct / 100 - CPU_SLACK_CORES)),
+            memory_gb=math.ceil(memory_mb / 1024),
+            time_min=time_min,
+            observed_rss_mb=round(rss_mb, 1),
+            observed_realtime_s=round(realtime_s, 1),
+            observed_cpu_pct=round(cpu_pct, 1),
+        ))
+    return config
+
+
+def write_rightsize_config(config: RightsizeConfig, out_path: str) -> None:
+    p = Path(out_path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_text(config.to_nextflow_config(), encoding="utf-8")
@@ -0,0 +1,117 @@
+"""Per-sample cost and runtime attribution from Nextflow task tags.
+
+nf-core modules tag each task with its sample (`STAR_ALIGN (sample1)`), so
+summing task usage by tag gives a per-sample bill: CPU-hours, wall time,
+peak memory and estimated dollars.  The rollups are collected by
+`TraceAccumulator` in the same streaming pass as the per-process summary.
+
+Dollars are priced with the `helixsh.cloud_cost` unit prices over billed
+CPU-hours and GB-hours — the requested `cpus`/`memory` when the trace has
+them, observed usage otherwise.  Samples costing ``outlier_factor`` times the
+median sample (10x by default) are flagged as pathological.
+"""
+
+from __future__ import annotations
+
+import statistics
+from dataclasses import dataclass, field
+
+from helixsh.cloud_cost import unit_prices
+from helixsh.trace import SampleAccumulator, aggregate_traces
+
+DEFAULT_OUTLIER_FACTOR = 10.0
+
+
+@dataclass
+class SampleCost:
+    sample: str
+    tasks: int
+    failed_tasks: int
+    cpu_hours: float
+    wall_hours: float          # summed task realtime
+    max_peak_rss_mb: float
+    billed_cpu_hours: float
+    billed_gb_hours: float
+    cost_usd: float
+    share_of_cost: float
+    cost_vs_median: float
+    outlier: bool
+
+
+@dataclass
+class SampleCostReport:
+    provider: str
+    instance_family: str
+    samples_count: int
+    untagged_tasks: int
+    total_cost_usd: float
+    median_cost_usd: float
+    outlier_factor: float
+    outliers: list[str] = field(default_factory=list)
+    samples: list[SampleCost] = field(default_factory=list)
+    warnings: list[str] = field(default_factory=list)
+
+
+def attribute_samples(
+    paths: list[str],
+    provider: str = "aws",
+    instance_family: str = "general",
+    outlier_factor: float = DEFAULT_OUTLIER_FACTOR,
+    workers: int | None = None,
+) -> SampleCostReport:
+    """Roll trace usage up by sample tag and flag unusually expensive samples."""
+    if outlier_factor <= 1:
+        raise ValueError("outlier_factor must be > 1")
+    prices = unit_prices(provider, instance_family)
+    combined = None
+    for acc in aggregate_traces(paths, workers=workers, track_samples=True):
+        if combined is None:
+            combined = acc
+        else:
+            combined.merge(acc)
+    warnings = list(combined.warnings) if combined else ["No trace files given"]
+    by_tag: dict[str, SampleAccumulator] = dict(combined.samples) if combined else {}
+
+    untagged = by_tag.pop("", None)
+    untagged_tasks = untagged.task_count if untagged else 0
+    if untagged_tasks:
+        warnings.append(f"{untagged_tasks} task(s) have no tag and are not attributed to a sample")
+
+    def cost(acc: SampleAccumulator) -> float:
+        return acc.billed_cpu_hours * prices["cpu"] + acc.billed_gb_hours * prices["mem"]
+
+    costs = {tag: cost(acc) for tag, acc in by_tag.items()}
+    median = statistics.median(costs.values()) if costs else 0.0
+    total = sum(costs.values())
+
+    samples = [
+        SampleCost(
+            sample=tag,
+            tasks=acc.task_count,
+            failed_tasks=acc.failed_count,
+            cpu_hours=round(acc.cpu_hours, 4),
+            wall_hours=round(acc.sum_realtime_ms / 3_600_000, 4),
+            max_peak_rss_mb=round(acc.max_peak_rss_mb, 1),
+            billed_cpu_hours=round(acc.billed_cpu_hours, 4),
+            billed_gb_hours=round(acc.billed_gb_hours, 4),
+            cost_usd=round(costs[tag], 4),
+            share_of_cost=round(costs[tag] / total, 4) if total else 0.0,
+            cost_vs_median=round(costs[tag] / median, 2) if median else 0.0,
+            outlier=median > 0 and costs[tag] >= outlier_factor * median,
+        )
+        for tag, acc in by_tag.items()
+    ]
+    samples.sort(key=lambda s: s.cost_usd, reverse=True)
+
+    return SampleCostReport(
+        provider=provider.strip().lower(),
+        instance_family=instance_family.strip().lower(),
+        samples_count=len(samples),
+        untagged_tasks=untagged_tasks,
+        total_cost_usd=round(total, 4),
+        median_cost_usd=round(median, 4),
+        outlier_factor=outlier_factor,
+        outliers=[s.sample for s in samples if s.outlier],
+        samples=samples,
+        warnings=warnings,
+    )
@@ -0,0 +1,320 @@
+"""Discrete-event simulation of a task list on a fixed pool of identical nodes.
+
+Answers "what would this run cost on 20 x 16-core nodes versus 5 x 64-core
+nodes?" before anything is provisioned.  Tasks come from a trace (runtime =
+realtime, size = requested cpus/memory, falling back to observed usage) or
+from `helixsh.resources` estimates.
+
+The scheduler is greedy backfill: whenever capacity frees up, pending tasks
+are considered in queue-discipline order and each is placed on the first node
+with enough free CPUs and memory; a task that does not fit does not block
+smaller ones behind it.  Disciplines:
+
+  - ``fifo``: release order (trace submit time);
+  - ``sjf``:  shortest runtime first;
+  - ``ljf``:  longest runtime first (usually best for makespan).
+
+With ``release="submit"`` a task cannot start before its offset from the
+first submission in the trace, which approximates the pipeline's dependency
+order (traces do not record the DAG); ``release="none"`` treats the run as
+an unordered bag of tasks.
+
+Pending tasks are grouped by (cpus, memory) shape, and only nodes freed
+since the last round are searched, so a dispatch round costs O(shapes)
+rather than O(pending tasks x nodes).  A few-thousand-task trace simulates
+in tens of milliseconds; `sweep_shapes` can spread configurations over a
+process pool.  Cost is node-hours for the whole makespan at the
+`helixsh.cloud_cost` unit prices — idle nodes are paid for too.
+"""
+
+from __future__ import annotations
+
+import heapq
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from functools import partial
+
+from helixsh.cloud_cost import unit_prices
+from helixsh.resources import ResourceEstimate
+from helixsh.trace import iter_trace_tasks
+
+DISCIPLINES = ("fifo", "sjf", "ljf")
+_SHAPE_RE = re.compile(r"^\s*(\d+)\s*[xX]\s*(\d+)\s*:\s*(\d+(?:\.\d+)?)\s*$")
+
+
+@dataclass(frozen=True)
+class SimTask:
+    name: str
+    cpus: int
+    memory_gb: float
+    runtime_s: float
+    release_s: float = 0.0
+
+
+@dataclass(frozen=True)
+class ClusterShape:
+    nodes: int
+    cpus_per_node: int
+    memory_gb_per_node: float
+
+    @property
+    def label(self) -> str:
+        return f"{self.nodes}x{self.cpus_per_node}:{self.memory_gb_per_node:g}"
+
+
+@dataclass
+class SimulationResult:
+    shape: str
+    nodes: int
+    cpus_per_node: int
+    memory_gb_per_node: float
+    discipline: str
+    tasks: int
+    unschedulable_tasks: int
+    makespan_hours: float
+    cpu_utilisation: float
+    memory_utilisation: float
+    mean_wait_s: float
+    max_wait_s: float
+    peak_running: int
+    node_hours: float
+    cost_usd: float
+
+
+@dataclass
+class SweepReport:
+    provider: str
+    instance_family: str
+    tasks: int
+    results: list[SimulationResult] = field(default_factory=list)
+    warnings: list[str] = field(default_factory=list)
+
+
+def parse_shape(spec: str) -> ClusterShape:
+    """Parse 'NODESxCPUS:MEMORY_GB', e.g. '20x16:64'."""
+    m = _SHAPE_RE.match(spec)
+    if not m:
+        raise ValueError(f"Invalid cluster shape '{spec}' — expected NODESxCPUS:MEMORY_GB, e.g. 20x16:64")
+    shape = ClusterShape(int(m.group(1)), int(m.group(2)), float(m.group(3)))
+    if shape.nodes < 1 or shape.cpus_per_node < 1 or shape.memory_gb_per_node <= 0:
+        raise ValueError(f"Invalid cluster shape '{spec}' — all values must be positive")
+    return shape
+
+
+def tasks_from_trace(path: str, warnings: list[str] | None = None) -> list[SimTask]:
+    """Build simulation tasks from a trace; release offsets come from `submit`."""
+    raw = []
+    for t in iter_trace_tasks(path, warnings):
+        cpus = t.cpus or max(1, round(t.cpu_pct / 100))
+        memory_gb = (t.memory_req_mb or t.peak_rss_mb) / 1024
+        raw.append((t.name, cpus, memory_gb, t.realtime_ms / 1000, t.submit_ms))
+    origin = min((r[4] for r in raw if r[4]), default=0)
+    return [
+        SimTask(name=name, cpus=cpus, memory_gb=mem, runtime_s=runtime,
+                release_s=(submit - origin) / 1000 if submit else 0.0)
+        for name, cpus, mem, runtime, submit in raw
+    ]
+
+
+def tasks_from_estimate(estimate: ResourceEstimate, runtime_hours: float) -> list[SimTask]:
+    """One task per sample sized from a `helixsh.resources` estimate."""
+    if runtime_hours <= 0:
+        raise ValueError("runtime_hours must be > 0")
+    return [
+        SimTask(
+            name=f"{estimate.tool} (sample{i + 1})",
+            cpus=estimate.cpu_per_sample,
+            memory_gb=float(estimate.memory_gb_per_sample),
+            runtime_s=runtime_hours * 3600,
+        )
+        for i in range(estimate.samples)
+    ]
+
+
+def simulate(
+    tasks: list[SimTask],
+    shape: ClusterShape,
+    discipline: str = "fifo",
+    release: str = "submit",
+    prices: dict[str, float] | None = None,
+) -> SimulationResult:
+    """Simulate packing ``tasks`` onto ``shape`` and return makespan, utilisation and cost."""
+    if discipline not in DISCIPLINES:
+        raise ValueError(f"Unknown discipline '{discipline}'. Supported: {', '.join(DISCIPLINES)}")
+    if release not in {"submit", "none"}:
+        raise ValueError("release must be 'submit' or 'none'")
+    prices = prices or unit_prices()
+
+    fits = [
+        t for t in tasks
+        if t.cpus <= shape.cpus_per_node and t.memory_gb <= shape.memory_gb_per_node
+    ]
+    releases = sorted(
+        (t.release_s if release == "submit" else 0.0, i) for i, t in enumerate(fits)
+    )
+
+    def priority(i: int, rel: float) -> tuple[float, float, int]:
+        t = fits[i]
+        if discipline == "sjf":
+            return (t.runtime_s, rel, i)
+        if discipline == "ljf":
+            return (-t.runtime_s, rel, i)
+        return (rel, 0.0, i)
+
+    free_cpu = [float(shape.cpus_per_node)] * shape.nodes
+    free_mem = [shape.memory_gb_per_node] * shape.nodes
+    # (cpus, memory) shape → heap of (priority, release, task index)
+    pending: dict[tuple[int, float], list[tuple[tuple[float, float, int], float, int]]] = {}
+    running: list[tuple[float, int, int, float]] = []   # (end, node, cpus, memory)
+
+    now = 0.0
+    nxt = 0
+    end_time = 0.0
+    sum_wait = max_wait = 0.0
+    peak_running = 0
+    all_nodes = range(shape.nodes)
+    # Nodes that gained capacity since the last dispatch round.  After a
+    # round no pending shape fits anywhere, so a shape that was already
+    # pending can only fit on one of these.
+    freed: set[int] = set()
+    n_pending = 0
+
+    while nxt < len(releases) or running or n_pending:
+        fresh: set[tuple[int, float]] = set()
+        while nxt < len(releases) and releases[nxt][0] <= now:
+            rel, i = releases[nxt]
+            key = (fits[i].cpus, fits[i].memory_gb)
+            heapq.heappush(pending.setdefault(key, []), (priority(i, rel), rel, i))
+            fresh.add(key)
+            n_pending += 1
+            nxt += 1
+
+        # Dispatch round: best head across shape groups first, skipping shapes
+        # larger than any candidate node's free capacity.  All tasks of a
+        # shape are the same size, so once a shape's head does not fit, the
+        # rest of that shape waits for the next round.
+        heads = []
+        if fresh or freed:
+            f_cpu = max((free_cpu[n] for n in freed), default=-1.0)
+            f_mem = max((free_mem[n] for n in freed), default=-1.0)
+            g_cpu, g_mem = (max(free_cpu), max(free_mem)) if fresh else (-1.0, -1.0)
+            heads = [
+                (q[0][0], key) for key, q in pending.items()
+                if q and ((key[0] <= f_cpu and key[1] <= f_mem)
+                          or (key in fresh and key[0] <= g_cpu and key[1] <= g_mem))
+            ]
+            heapq.heapify(heads)
+        freed_nodes = sorted(freed)
+        while heads:
+            _, key = heapq.heappop(heads)
+            cpus, mem = key
+            node = next(
+                (n for n in (all_nodes if key in fresh else freed_nodes)
+                 if free_cpu[n] >= cpus and free_mem[n] >= mem),
+                None,
+            )
+            if node is None:
+                continue
+            queue = pending[key]
+            _, rel, i = heapq.heappop(queue)
+            n_pending -= 1
+            free_cpu[node] -= cpus
+            free_mem[node] -= mem
+            heapq.heappush(running, (now + fits[i].runtime_s, node, cpus, mem))
+            wait = now - rel
+            sum_wait += wait
+            max_wait = max(max_wait, wait)
+            if queue:
+                heapq.heappush(heads, (queue[0][0], key))
+        peak_running = max(peak_running, len(running))
+
+        next_release = releases[nxt][0] if nxt < len(releases) else float("inf")
+        next_finish = running[0][0] if running else float("inf")
+        now = min(next_release, next_finish)
+        if now == float("inf"):
+            break
+        freed.clear()
+        while running and running[0][0] <= now:
+            end, node, cpus, mem = heapq.heappop(running)
+            free_cpu[node] += cpus
+            free_mem[node] += mem
+            freed.add(node)
+            end_time = max(end_time, end)
+
+    makespan_h = end_time / 3600
+    node_hours = shape.nodes * makespan_h
+    capacity_cpu_h = node_hours * shape.cpus_per_node
+    capacity_mem_h = node_hours * shape.memory_gb_per_node
+    used_cpu_h = sum(t.cpus * t.runtime_s for t in fits) / 3600
+    used_mem_h = sum(t.memory_gb * t.runtime_s for t in fits) / 3600
+    cost = capacity_cpu_h * prices["cpu"] + capacity_mem_h * prices["mem"]
+
+    return SimulationResult(
+        shape=shape.label,
+        nodes=shape.nodes,
+        cpus_per_node=shape.cpus_per_node,
+        memory_gb_per_node=shape.memory_gb_per_node,
+        discipline=discipline,
+        tasks=len(fits),
+        unschedulable_tasks=len(tasks) - len(fits),
+        makespan_hours=round(makespan_h, 4),
+        cpu_utilisation=round(used_cpu_h / capacity_cpu_h, 4) if capacity_cpu_h else 0.0,
+        memory_utilisation=round(used_mem_h / capacity_mem_h, 4) if capacity_mem_h else 0.0,
+        mean_wait_s=round(sum_wait / len(fits), 2) if fits else 0.0,
+        max_wait_s=round(max_wait, 2),
+        peak_running=peak_running,
+        node_hours=round(node_hours, 4),
+        cost_usd=round(cost, 4),
+    )
+
+
+def _simulate_config(
+    tasks: list[SimTask], config: tuple[ClusterShape, str], release: str, prices: dict[str, float],
+) -> SimulationResult:
+    shape, discipline = config
+    return simulate(tasks, shape, discipline=discipline, release=release, prices=prices)
+
+
+def sweep_shapes(
+    tasks: list[SimTask],
+    shapes: list[ClusterShape],
+    disciplines: tuple[str, ...] = ("fifo",),
+    release: str = "submit",
+    provider: str = "aws",
+    instance_family: str = "general",
+    workers: int | None = 1,
+) -> SweepReport:
+    """Simulate every shape × discipline and rank by cost, then makespan.
+
+    With ``workers`` other than 1, configurations are spread over a process
+    pool; falls back to a serial loop if a pool cannot be started.
+    """
+    prices = unit_prices(provider, instance_family)
+    report = SweepReport(
+        provider=provider.strip().lower(),
+        instance_family=instance_family.strip().lower(),
+        tasks=len(tasks),
+    )
+    configs = [(shape, discipline) for shape in shapes for discipline in disciplines]
+    run = partial(_simulate_config, tasks, release=release, prices=prices)
+    if workers == 1 or len(configs) <= 1:
+        results = [run(c) for c in configs]
+    else:
+        chunksize = max(1, len(configs) // ((workers or os.cpu_count() or 1) * 4))
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(run, configs, chunksize=chunksize))
+        except (OSError, NotImplementedError, BrokenProcessPool):
+            results = [run(c) for c in configs]
+
+    for result in results:
+        if result.unschedulable_tasks:
+            report.warnings.append(
+                f"{result.shape}: {result.unschedulable_tasks} task(s) exceed the node size and were dropped"
+            )
+        report.results.append(result)
+    report.results.sort(key=lambda r: (r.unschedulable_tasks > 0, r.cost_usd, r.makespan_hours))
+    return report
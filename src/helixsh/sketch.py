@@ -0,0 +1,82 @@
+"""Mergeable streaming quantile sketch for trace metrics.
+
+A fixed-accuracy logarithmic histogram (the DDSketch bucketing scheme):
+each positive value lands in bucket ``ceil(log(v) / log(gamma))`` so any
+reported quantile is within ``relative_accuracy`` of a true sample value.
+Memory grows with the dynamic range of the data (a few hundred buckets for
+milliseconds-to-days), not with the number of samples, and two sketches
+with the same accuracy merge exactly by adding bucket counts.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+DEFAULT_QUANTILES = (0.5, 0.95, 0.99)
+
+# Values at or below this are counted in the zero bucket.
+_MIN_POSITIVE = 1e-9
+
+
+@dataclass
+class QuantileSketch:
+    relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY
+    count: int = 0
+    zero_count: int = 0
+    min: float = math.inf
+    max: float = -math.inf
+    bins: dict[int, int] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if not 0 < self.relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self._gamma = (1 + self.relative_accuracy) / (1 - self.relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if value <= _MIN_POSITIVE:
+            self.zero_count += 1
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self.bins[key] = self.bins.get(key, 0) + 1
+
+    def merge(self, other: QuantileSketch) -> None:
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        self.count += other.count
+        self.zero_count += other.zero_count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        for key, n in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + n
+
+    def quantile(self, q: float) -> float:
+        """Approximate value at quantile ``q`` (0..1); 0.0 for an empty sketch."""
+        if self.count == 0:
+            return 0.0
+        if not 0 <= q <= 1:
+            raise ValueError("quantile must be between 0 and 1")
+        if q == 0:
+            return self.min
+        if q == 1:
+            return self.max
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return max(self.min, 0.0)
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if rank < seen:
+                estimate = 2 * self._gamma ** key / (self._gamma + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    def quantiles(self, qs: tuple[float, ...] = DEFAULT_QUANTILES) -> dict[str, float]:
+        return {f"p{round(q * 100):g}": self.quantile(q) for q in qs}
@@ -0,0 +1,161 @@
+"""Straggler and outlier task detection within each process.
+
+Scatter-gather steps (GATK interval shards, per-sample STAR runs) should
+produce siblings with similar runtime and memory; a task far above its
+siblings usually means a skewed interval split or a bad input, and it
+stretches the makespan.
+
+Detection uses the robust z-score of Iglewicz & Hoaglin,
+``0.6745 * (x - median) / MAD``, which a handful of extreme tasks cannot
+mask the way they would a mean/standard-deviation rule.  The trace is
+streamed twice in bounded memory: the first pass sketches each process's
+median, the second sketches absolute deviations (for the MAD) while keeping
+only the ``max_per_process`` most extreme candidates per process.
+
+Siblings are tasks with the same fully qualified process path
+(`trace.task_path`); grouping by the top-level workflow would pool every
+tool of an nf-core pipeline into one baseline.
+"""
+
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass, field
+
+from helixsh.sketch import QuantileSketch
+from helixsh.trace import TaskRecord, extract_task_tag, iter_trace_tasks, task_path
+
+DEFAULT_THRESHOLD = 3.5
+DEFAULT_MIN_RATIO = 1.5
+MIN_SIBLINGS = 5
+_METRICS = {
+    "realtime_s": lambda t: t.realtime_ms / 1000,
+    "peak_rss_mb": lambda t: t.peak_rss_mb,
+}
+STRAGGLER_METRICS = tuple(_METRICS)
+
+
+@dataclass
+class Straggler:
+    name: str
+    hash: str
+    tag: str
+    value: float
+    robust_z: float
+    ratio_to_median: float
+
+
+@dataclass
+class ProcessOutliers:
+    process: str
+    metric: str
+    tasks: int
+    median: float
+    mad: float
+    stragglers: list[Straggler] = field(default_factory=list)
+
+
+@dataclass
+class StragglerReport:
+    trace_file: str
+    metric: str
+    threshold: float
+    min_ratio: float
+    straggler_count: int
+    processes: list[ProcessOutliers] = field(default_factory=list)
+    warnings: list[str] = field(default_factory=list)
+
+
+def find_stragglers(
+    path: str,
+    metric: str = "realtime_s",
+    threshold: float = DEFAULT_THRESHOLD,
+    min_ratio: float = DEFAULT_MIN_RATIO,
+    max_per_process: int = 50,
+) -> StragglerReport:
+    """Flag tasks whose ``metric`` is far above their process's siblings."""
+    if metric not in _METRICS:
+        raise ValueError(f"Unknown metric '{metric}'. Supported: {', '.join(STRAGGLER_METRICS)}")
+    value_of = _METRICS[metric]
+    warnings: list[str] = []
+
+    # Pass 1: per-process median.
+    values: dict[str, QuantileSketch] = {}
+    try:
+        for t in iter_trace_tasks(path, warnings):
+            values.setdefault(task_path(t.name), QuantileSketch()).add(value_of(t))
+    except (OSError, EOFError, ValueError) as exc:
+        return StragglerReport(trace_file=path, metric=metric, threshold=threshold,
+                               min_ratio=min_ratio, straggler_count=0, warnings=[str(exc)])
+    medians = {name: sk.quantile(0.5) for name, sk in values.items()}
+
+    # Pass 2: MAD sketch plus a bounded heap of the largest upward deviations.
+    # The file may have grown or been damaged since pass 1 (a running
+    # pipeline): processes pass 1 did not see are skipped, and a read error
+    # keeps what was gathered so far.
+    deviations: dict[str, QuantileSketch] = {}
+    candidates: dict[str, list[tuple[float, int, TaskRecord]]] = {}
+    try:
+        for seq, t in enumerate(iter_trace_tasks(path)):
+            process = task_path(t.name)
+            median = medians.get(process)
+            if median is None:
+                continue
+            v = value_of(t)
+            dev = v - median
+            deviations.setdefault(process, QuantileSketch()).add(abs(dev))
+            if dev <= 0:
+                continue
+            heap = candidates.setdefault(process, [])
+            item = (dev, seq, t)
+            if len(heap) < max_per_process:
+                heapq.heappush(heap, item)
+            elif dev > heap[0][0]:
+                heapq.heapreplace(heap, item)
+    except (OSError, EOFError, ValueError) as exc:
+        warnings.append(f"Second pass stopped early: {exc}")
+
+    processes: list[ProcessOutliers] = []
+    small = 0
+    for name in sorted(values):
+        n = values[name].count
+        if n < MIN_SIBLINGS:
+            small += 1
+            continue
+        if name not in deviations:
+            continue
+        median = medians[name]
+        mad = deviations[name].quantile(0.5)
+        found: list[Straggler] = []
+        for dev, _, t in sorted(candidates.get(name, []), reverse=True):
+            v = value_of(t)
+            z = 0.6745 * dev / mad if mad else float("inf")
+            ratio = v / median if median else float("inf")
+            if z < threshold or ratio < min_ratio:
+                continue
+            found.append(Straggler(
+                name=t.name,
+                hash=t.hash,
+                tag=extract_task_tag(t.name),
+                value=round(v, 2),
+                robust_z=round(z, 2) if mad else -1.0,   # -1: MAD was zero
+                ratio_to_median=round(ratio, 2) if median else -1.0,
+            ))
+        if found:
+            processes.append(ProcessOutliers(
+                process=name, metric=metric, tasks=n,
+                median=round(median, 2), mad=round(mad, 2), stragglers=found,
+            ))
+    if small:
+        warnings.append(f"{small} process(es) with fewer than {MIN_SIBLINGS} tasks were not checked")
+
+    processes.sort(key=lambda p: max(s.ratio_to_median for s in p.stragglers), reverse=True)
+    return StragglerReport(
+        trace_file=path,
+        metric=metric,
+        threshold=threshold,
+        min_ratio=min_ratio,
+        straggler_count=sum(len(p.stragglers) for p in processes),
+        processes=processes,
+        warnings=warnings,
+    )
@@ -4,16 +4,60 @@ Nextflow writes a tab-separated `trace.txt` (or custom name via `-with-trace`)
 with one row per task.  This module parses that file and produces per-process
 and overall resource summaries useful for cost estimation and optimisation.
 
+Parsing is streaming: rows are folded into per-process running accumulators
+as they are read, so multi-million-row traces (plain or gzip-compressed)
+summarise in memory proportional to the number of processes, not tasks.
+`TraceFollower` applies the same accumulators incrementally to a trace that
+is still being written, and `load_columnar_trace` keeps a memory-mappable
+sidecar of typed columns (fully qualified process path, status, timestamps
+and resource usage) so repeated summaries skip re-tokenising the TSV; only
+`trace-summary --cache` reads it today, other analyses stream the text.
+`MultiAggregator` fills several caller-declared group-by views (full path,
+leaf process, subworkflow, sample tag, status, hour) in the same single pass.
+
 Standard trace.txt columns (subset used here):
   task_id, hash, native_id, name, status, exit, submit, duration,
   realtime, %cpu, peak_rss, peak_vmem, rchar, wchar
+Optional columns used when present: start, complete, cpus, memory, time,
+  syscr, syscw, read_bytes, write_bytes, vol_ctxt, inv_ctxt
 """
 
 from __future__ import annotations
 
 import csv
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import zlib
+from array import array
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from functools import partial
 from pathlib import Path
+from typing import IO
+
+from helixsh.sketch import QuantileSketch
+
+DEFAULT_TRACE_GLOB = "**/*trace*.txt*"
+# Per-process metrics tracked with mergeable quantile sketches.
+SKETCH_METRICS = ("duration_s", "realtime_s", "cpu_pct", "peak_rss_mb")
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_FOLLOW_CHUNK_BYTES = 1 << 20
+# Leading bytes TraceFollower re-checks to spot a file rewritten in place.
+_FOLLOW_PREFIX_BYTES = 4096
+# 'ms' must come before 'm' in the alternation so regex doesn't greedily match 'm' in 'ms'
+_DURATION_RE = re.compile(r"([\d.]+)\s*(ms|[dhms])", re.IGNORECASE)
+# A bare number is a byte count (`trace.raw = true`).
+_MEMORY_RE = re.compile(r"([\d.]+)\s*(KB|MB|GB|TB|B)?$", re.IGNORECASE)
 
 
 @dataclass
@@ -28,6 +72,21 @@ class TaskRecord:
     cpu_pct: float        # peak %cpu (can exceed 100 for multi-threaded)
     peak_rss_mb: float    # peak resident set size in MB
     peak_vmem_mb: float   # peak virtual memory in MB
+    submit_ms: int = 0    # epoch ms; 0 when the trace has no timestamps
+    start_ms: int = 0     # from `start`, else derived as complete - realtime
+    complete_ms: int = 0  # from `complete`, else derived as submit + duration
+    cpus: int = 0         # requested cpus; 0 when the column is absent
+    memory_req_mb: float = 0.0  # requested memory; 0 when the column is absent
+    time_req_ms: int = 0        # requested time limit; 0 when the column is absent
+    hash: str = ""              # work-dir hash prefix, e.g. 'ab/123456'
+    rchar_mb: float = 0.0        # bytes read via read()-like syscalls (incl. page cache)
+    wchar_mb: float = 0.0        # bytes written via write()-like syscalls
+    read_bytes_mb: float = 0.0   # bytes actually fetched from storage
+    write_bytes_mb: float = 0.0  # bytes actually sent to storage
+    syscr: int = 0               # read syscall count
+    syscw: int = 0               # write syscall count
+    vol_ctxt: int = 0            # voluntary context switches (blocking waits)
+    inv_ctxt: int = 0            # involuntary context switches (preemptions)
 
 
 @dataclass
@@ -41,6 +100,8 @@ class ProcessSummary:
     max_peak_rss_mb: float
     avg_peak_rss_mb: float
     recommendation: str = ""
+    # metric -> {"p50": .., "p95": .., "p99": ..}; see SKETCH_METRICS
+    percentiles: dict[str, dict[str, float]] = field(default_factory=dict)
 
 
 @dataclass
@@ -59,11 +120,11 @@ def _parse_duration(s: str) -> int:
     s = s.strip()
     if not s or s == "-":
         return 0
+    if s.isdigit():
+        return int(s)  # raw milliseconds (`trace.raw = true`)
     total_ms = 0
     # Nextflow formats: '1d 2h 3m 4.5s', '500 ms', '1h', etc.
-    import re
-    # 'ms' must come before 'm' in the alternation so regex doesn't greedily match 'm' in 'ms'
-    for value, unit in re.findall(r"([\d.]+)\s*(ms|[dhms])", s, re.IGNORECASE):
+    for value, unit in _DURATION_RE.findall(s):
         v = float(value)
         unit = unit.lower()
         if unit == "d":
@@ -84,87 +145,225 @@ def _parse_memory(s: str) -> float:
     s = s.strip()
     if not s or s == "-":
         return 0.0
-    import re
-    m = re.match(r"([\d.]+)\s*(KB|MB|GB|TB|B)", s, re.IGNORECASE)
+    m = _MEMORY_RE.match(s)
     if not m:
         return 0.0
     value = float(m.group(1))
-    unit = m.group(2).upper()
+    unit = (m.group(2) or "B").upper()
     multipliers = {"B": 1 / 1024 / 1024, "KB": 1 / 1024, "MB": 1.0, "GB": 1024.0, "TB": 1024.0 * 1024}
     return value * multipliers.get(unit, 1.0)
 
 
+def _parse_timestamp(s: str) -> int:
+    """Convert a Nextflow trace timestamp to epoch ms (0 if absent).
+
+    Accepts both the default '2026-01-01 10:00:00.123' form and the raw
+    epoch-millisecond values written with `trace.raw = true`.
+    """
+    s = s.strip()
+    if not s or s == "-":
+        return 0
+    if s.isdigit():
+        return int(s)
+    dt = datetime.fromisoformat(s)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=UTC)
+    return int(dt.timestamp() * 1000)
+
+
+def extract_task_tag(name: str) -> str:
+    """Extract the task tag from a task name.  e.g. 'STAR_ALIGN (sample1)' → 'sample1'."""
+    open_at = name.find("(")
+    if open_at < 0:
+        return ""
+    close_at = name.rfind(")")
+    return name[open_at + 1:close_at if close_at > open_at else None].strip()
+
+
+def _parse_int(s: str) -> int:
+    s = s.strip()
+    if not s or s == "-":
+        return 0
+    return int(float(s))
+
+
 def _extract_process_name(name: str) -> str:
     """Extract base process name from task name.  e.g. 'STAR_ALIGN (sample1)' → 'STAR_ALIGN'."""
     return name.split("(")[0].strip().split(":")[0].strip()
 
 
-def parse_trace(path: str) -> TraceSummary:
-    """Parse a Nextflow trace.txt and return a TraceSummary."""
-    p = Path(path)
-    if not p.exists():
-        return TraceSummary(
-            trace_file=path, total_tasks=0, failed_tasks=0,
-            total_walltime_s=0, total_cpu_hours=0,
-            warnings=[f"Trace file not found: {path}"],
-        )
+def task_path(name: str) -> str:
+    """Fully qualified process path without the tag.
 
-    with p.open(encoding="utf-8") as fh:
-        reader = csv.DictReader(fh, delimiter="\t")
-        if reader.fieldnames is None:
-            return TraceSummary(
-                trace_file=path, total_tasks=0, failed_tasks=0,
-                total_walltime_s=0, total_cpu_hours=0,
-                warnings=["Trace file is empty or has no header"],
-            )
-        rows = list(reader)
+    e.g. 'NFCORE_RNASEQ:RNASEQ:ALIGN_STAR:STAR_ALIGN (s1)' → 'NFCORE_RNASEQ:RNASEQ:ALIGN_STAR:STAR_ALIGN'.
+    """
+    return name.split("(")[0].strip()
 
-    warnings: list[str] = []
-    tasks: list[TaskRecord] = []
-    for row in rows:
-        try:
-            cpu_raw = row.get("%cpu", "0").strip().rstrip("%") or "0"
-            tasks.append(TaskRecord(
-                task_id=row.get("task_id", "").strip(),
-                name=row.get("name", "").strip(),
-                process=_extract_process_name(row.get("name", "")),
-                status=row.get("status", "").strip(),
-                exit_code=str(row.get("exit", "")).strip(),
-                duration_ms=_parse_duration(row.get("duration", "")),
-                realtime_ms=_parse_duration(row.get("realtime", "")),
-                cpu_pct=float(cpu_raw) if cpu_raw not in {"", "-", "."} else 0.0,
-                peak_rss_mb=_parse_memory(row.get("peak_rss", "")),
-                peak_vmem_mb=_parse_memory(row.get("peak_vmem", "")),
-            ))
-        except (ValueError, KeyError):
-            warnings.append(f"Could not parse trace row: {row.get('name', '?')}")
 
-    if not tasks:
-        return TraceSummary(
-            trace_file=path, total_tasks=0, failed_tasks=0,
-            total_walltime_s=0, total_cpu_hours=0,
-            warnings=warnings or ["No tasks found in trace file"],
-        )
+def leaf_process_name(name: str) -> str:
+    """Innermost process name.  e.g. 'NFCORE_RNASEQ:RNASEQ:STAR_ALIGN (s1)' → 'STAR_ALIGN'."""
+    return task_path(name).rsplit(":", 1)[-1].strip()
+
+
+def subworkflow_path(name: str) -> str:
+    """Enclosing workflow path, '' for top-level processes.  e.g. 'A:B:STAR_ALIGN' → 'A:B'."""
+    path = task_path(name)
+    return path.rsplit(":", 1)[0] if ":" in path else ""
+
+
+def _open_trace(p: Path) -> IO[str]:
+    """Open a trace file for text reading, transparently handling gzip.
+
+    Undecodable bytes become U+FFFD, so a stray byte costs at most the row
+    it is in rather than the rest of the file.
+    """
+    with p.open("rb") as probe:
+        magic = probe.read(2)
+    if magic == _GZIP_MAGIC:
+        return gzip.open(p, "rt", encoding="utf-8", errors="replace", newline="")
+    return p.open(encoding="utf-8", errors="replace", newline="")
+
+
+class _TimestampTally:
+    """Bad-timestamp counts per column, reported as one warning per column.
 
-    failed = [t for t in tasks if t.status.upper() not in {"COMPLETED", "CACHED"}]
-    total_wall_s = sum(t.duration_ms for t in tasks) / 1000
-    total_cpu_h  = sum(t.realtime_ms * t.cpu_pct / 100 for t in tasks) / 3_600_000
-
-    # Per-process aggregation
-    from collections import defaultdict
-    by_process: dict[str, list[TaskRecord]] = defaultdict(list)
-    for t in tasks:
-        by_process[t.process].append(t)
-
-    process_summaries: list[ProcessSummary] = []
-    for pname, ptasks in sorted(by_process.items()):
-        durations = [t.duration_ms / 1000 for t in ptasks]
-        cpus      = [t.cpu_pct for t in ptasks]
-        rss_list  = [t.peak_rss_mb for t in ptasks]
-        failed_n  = sum(1 for t in ptasks if t.status.upper() not in {"COMPLETED", "CACHED"})
-        avg_dur   = sum(durations) / len(durations)
-        max_rss   = max(rss_list) if rss_list else 0.0
-        avg_rss   = sum(rss_list) / len(rss_list) if rss_list else 0.0
+    The warning is appended on the first bad value and rewritten in place
+    with the running count, so a broken column in a multi-million-row trace
+    adds one warning rather than one per row.
+    """
+
+    def __init__(self) -> None:
+        # column → (index of its warning, first example, count)
+        self._slots: dict[str, tuple[int, str, int]] = {}
+
+    def record(self, warnings: list[str], column: str, raw: str, task: str) -> None:
+        slot = self._slots.get(column)
+        prefix = f"Unparseable {column} timestamp"
+        if slot is None or slot[0] >= len(warnings) or not warnings[slot[0]].startswith(prefix):
+            slot = (len(warnings), f"{raw.strip()!r} for task {task}", 0)
+            warnings.append("")
+        index, example, count = slot[0], slot[1], slot[2] + 1
+        self._slots[column] = (index, example, count)
+        warnings[index] = f"{prefix} in {count} row(s), treated as missing (first: {example})"
+
+
+def _row_timestamp(
+    row: dict[str, str], column: str, warnings: list[str] | None, tally: _TimestampTally | None,
+) -> int:
+    """Parse a timestamp column, treating an unparseable value as missing (0)."""
+    raw = row.get(column) or ""
+    try:
+        return _parse_timestamp(raw)
+    except ValueError:
+        if warnings is not None:
+            (tally or _TimestampTally()).record(warnings, column, raw, row.get("name", "?"))
+        return 0
+
+
+def _task_from_row(
+    row: dict[str, str], warnings: list[str] | None = None, tally: _TimestampTally | None = None,
+) -> TaskRecord:
+    """Build a TaskRecord from one trace row (raises ValueError on bad data).
+
+    Bad timestamps do not reject the row: they count as missing and are
+    reported in ``warnings`` — once per column when the same ``tally`` is
+    passed for every row — so task totals stay intact.
+    """
+    cpu_raw = (row.get("%cpu") or "0").strip().rstrip("%") or "0"
+    name = (row.get("name") or "").strip()
+    duration_ms = _parse_duration(row.get("duration") or "")
+    realtime_ms = _parse_duration(row.get("realtime") or "")
+    submit_ms = _row_timestamp(row, "submit", warnings, tally)
+    complete_ms = _row_timestamp(row, "complete", warnings, tally)
+    if not complete_ms and submit_ms:
+        complete_ms = submit_ms + duration_ms
+    start_ms = _row_timestamp(row, "start", warnings, tally)
+    if not start_ms and complete_ms:
+        start_ms = max(complete_ms - realtime_ms, submit_ms)
+    return TaskRecord(
+        task_id=(row.get("task_id") or "").strip(),
+        name=name,
+        process=_extract_process_name(name),
+        status=(row.get("status") or "").strip(),
+        exit_code=str(row.get("exit") or "").strip(),
+        duration_ms=duration_ms,
+        realtime_ms=realtime_ms,
+        cpu_pct=float(cpu_raw) if cpu_raw not in {"", "-", "."} else 0.0,
+        peak_rss_mb=_parse_memory(row.get("peak_rss") or ""),
+        peak_vmem_mb=_parse_memory(row.get("peak_vmem") or ""),
+        submit_ms=submit_ms,
+        start_ms=start_ms,
+        complete_ms=complete_ms,
+        hash=(row.get("hash") or "").strip(),
+        cpus=_parse_int(row.get("cpus") or ""),
+        memory_req_mb=_parse_memory(row.get("memory") or ""),
+        time_req_ms=_parse_duration(row.get("time") or ""),
+        rchar_mb=_parse_memory(row.get("rchar") or ""),
+        wchar_mb=_parse_memory(row.get("wchar") or ""),
+        read_bytes_mb=_parse_memory(row.get("read_bytes") or ""),
+        write_bytes_mb=_parse_memory(row.get("write_bytes") or ""),
+        syscr=_parse_int(row.get("syscr") or ""),
+        syscw=_parse_int(row.get("syscw") or ""),
+        vol_ctxt=_parse_int(row.get("vol_ctxt") or ""),
+        inv_ctxt=_parse_int(row.get("inv_ctxt") or ""),
+    )
+
+
+def _is_failed(status: str) -> bool:
+    return status.upper() not in {"COMPLETED", "CACHED"}
+
+
+@dataclass
+class ProcessAccumulator:
+    """Running per-process totals and quantile sketches.
+
+    Memory is O(1) in the task count: sketches keep log-spaced bucket counts
+    rather than samples, and merge exactly across files.
+    """
+
+    process: str
+    task_count: int = 0
+    failed_count: int = 0
+    sum_duration_ms: int = 0
+    max_duration_ms: int = 0
+    sum_cpu_pct: float = 0.0
+    sum_peak_rss_mb: float = 0.0
+    max_peak_rss_mb: float = 0.0
+    sketches: dict[str, QuantileSketch] = field(
+        default_factory=lambda: {m: QuantileSketch() for m in SKETCH_METRICS}
+    )
+
+    def add(self, task: TaskRecord) -> None:
+        self.task_count += 1
+        if _is_failed(task.status):
+            self.failed_count += 1
+        self.sum_duration_ms += task.duration_ms
+        self.max_duration_ms = max(self.max_duration_ms, task.duration_ms)
+        self.sum_cpu_pct += task.cpu_pct
+        self.sum_peak_rss_mb += task.peak_rss_mb
+        self.max_peak_rss_mb = max(self.max_peak_rss_mb, task.peak_rss_mb)
+        sk = self.sketches
+        sk["duration_s"].add(task.duration_ms / 1000)
+        sk["realtime_s"].add(task.realtime_ms / 1000)
+        sk["cpu_pct"].add(task.cpu_pct)
+        sk["peak_rss_mb"].add(task.peak_rss_mb)
+
+    def merge(self, other: ProcessAccumulator) -> None:
+        self.task_count += other.task_count
+        self.failed_count += other.failed_count
+        self.sum_duration_ms += other.sum_duration_ms
+        self.max_duration_ms = max(self.max_duration_ms, other.max_duration_ms)
+        self.sum_cpu_pct += other.sum_cpu_pct
+        self.sum_peak_rss_mb += other.sum_peak_rss_mb
+        self.max_peak_rss_mb = max(self.max_peak_rss_mb, other.max_peak_rss_mb)
+        for metric, sketch in other.sketches.items():
+            self.sketches[metric].merge(sketch)
+
+    def to_summary(self) -> ProcessSummary:
+        n = self.task_count or 1
+        avg_dur = self.sum_duration_ms / n / 1000
+        max_rss = self.max_peak_rss_mb
+        avg_rss = self.sum_peak_rss_mb / n
 
         # Generate simple recommendation
         rec = ""
@@ -174,27 +373,788 @@ def parse_trace(path: str) -> TraceSummary:
                 rec = f"Memory usage highly variable (max {max_rss:.0f} MB vs avg {avg_rss:.0f} MB) — consider splitting batches"
             elif max_rss > 28_000:
                 rec = f"High peak RSS ({max_rss:.0f} MB) — ensure memory limit exceeds this"
-        if failed_n > 0 and not rec:
-            rec = f"{failed_n} task(s) failed — inspect work directories"
+        if self.failed_count > 0 and not rec:
+            rec = f"{self.failed_count} task(s) failed — inspect work directories"
 
-        process_summaries.append(ProcessSummary(
-            process=pname,
-            task_count=len(ptasks),
-            failed_count=failed_n,
+        return ProcessSummary(
+            process=self.process,
+            task_count=self.task_count,
+            failed_count=self.failed_count,
             avg_duration_s=round(avg_dur, 2),
-            max_duration_s=round(max(durations), 2),
-            avg_cpu_pct=round(sum(cpus) / len(cpus), 1) if cpus else 0.0,
+            max_duration_s=round(self.max_duration_ms / 1000, 2),
+            avg_cpu_pct=round(self.sum_cpu_pct / n, 1),
             max_peak_rss_mb=round(max_rss, 1),
             avg_peak_rss_mb=round(avg_rss, 1),
             recommendation=rec,
-        ))
-
-    return TraceSummary(
-        trace_file=path,
-        total_tasks=len(tasks),
-        failed_tasks=len(failed),
-        total_walltime_s=round(total_wall_s, 2),
-        total_cpu_hours=round(total_cpu_h, 4),
-        processes=process_summaries,
-        warnings=warnings,
+            percentiles={
+                metric: {k: round(v, 2) for k, v in sketch.quantiles().items()}
+                for metric, sketch in self.sketches.items()
+            },
+        )
+
+
+@dataclass
+class SampleAccumulator:
+    """Running per-sample totals, keyed on the task tag (see `extract_task_tag`).
+
+    Billed hours use the requested `cpus`/`memory` when the trace has them
+    (that is what a scheduler or cloud bills) and observed usage otherwise.
+    """
+
+    sample: str
+    task_count: int = 0
+    failed_count: int = 0
+    sum_realtime_ms: int = 0
+    cpu_hours: float = 0.0
+    billed_cpu_hours: float = 0.0
+    billed_gb_hours: float = 0.0
+    max_peak_rss_mb: float = 0.0
+
+    def add(self, task: TaskRecord) -> None:
+        hours = task.realtime_ms / 3_600_000
+        used_cpus = task.cpu_pct / 100
+        self.task_count += 1
+        if _is_failed(task.status):
+            self.failed_count += 1
+        self.sum_realtime_ms += task.realtime_ms
+        self.cpu_hours += used_cpus * hours
+        self.billed_cpu_hours += (task.cpus or used_cpus) * hours
+        self.billed_gb_hours += (task.memory_req_mb or task.peak_rss_mb) / 1024 * hours
+        self.max_peak_rss_mb = max(self.max_peak_rss_mb, task.peak_rss_mb)
+
+    def merge(self, other: SampleAccumulator) -> None:
+        self.task_count += other.task_count
+        self.failed_count += other.failed_count
+        self.sum_realtime_ms += other.sum_realtime_ms
+        self.cpu_hours += other.cpu_hours
+        self.billed_cpu_hours += other.billed_cpu_hours
+        self.billed_gb_hours += other.billed_gb_hours
+        self.max_peak_rss_mb = max(self.max_peak_rss_mb, other.max_peak_rss_mb)
+
+
+@dataclass
+class TraceAccumulator:
+    """Single-pass trace aggregation: run totals plus one accumulator per process.
+
+    Accumulators merge associatively, so partial results from separate files
+    (or separate chunks of one file) can be combined without re-reading rows.
+    """
+
+    total_tasks: int = 0
+    failed_tasks: int = 0
+    sum_duration_ms: int = 0
+    cpu_ms: float = 0.0
+    processes: dict[str, ProcessAccumulator] = field(default_factory=dict)
+    warnings: list[str] = field(default_factory=list)
+    # Per-sample rollups are opt-in: tags can be high-cardinality.
+    track_samples: bool = False
+    samples: dict[str, SampleAccumulator] = field(default_factory=dict)
+    # Accumulators per fully qualified process path (`task_path`), opt-in:
+    # `processes` keeps the top-level grouping that summaries report.
+    track_paths: bool = False
+    paths: dict[str, ProcessAccumulator] = field(default_factory=dict)
+    _timestamps: _TimestampTally = field(default_factory=_TimestampTally, repr=False, compare=False)
+
+    def add(self, task: TaskRecord) -> None:
+        self.total_tasks += 1
+        if _is_failed(task.status):
+            self.failed_tasks += 1
+        self.sum_duration_ms += task.duration_ms
+        self.cpu_ms += task.realtime_ms * task.cpu_pct / 100
+        acc = self.processes.get(task.process)
+        if acc is None:
+            acc = self.processes[task.process] = ProcessAccumulator(process=task.process)
+        acc.add(task)
+        if self.track_samples:
+            tag = extract_task_tag(task.name)
+            sample = self.samples.get(tag)
+            if sample is None:
+                sample = self.samples[tag] = SampleAccumulator(sample=tag)
+            sample.add(task)
+        if self.track_paths:
+            name = task_path(task.name)
+            path_acc = self.paths.get(name)
+            if path_acc is None:
+                path_acc = self.paths[name] = ProcessAccumulator(process=name)
+            path_acc.add(task)
+
+    def add_row(self, row: dict[str, str]) -> None:
+        try:
+            self.add(_task_from_row(row, self.warnings, self._timestamps))
+        except (ValueError, KeyError):
+            self.warnings.append(f"Could not parse trace row: {row.get('name', '?')}")
+
+    def merge(self, other: TraceAccumulator) -> None:
+        self.total_tasks += other.total_tasks
+        self.failed_tasks += other.failed_tasks
+        self.sum_duration_ms += other.sum_duration_ms
+        self.cpu_ms += other.cpu_ms
+        for name, acc in other.processes.items():
+            mine = self.processes.get(name)
+            if mine is None:
+                mine = self.processes[name] = ProcessAccumulator(process=name)
+            mine.merge(acc)
+        for tag, sample in other.samples.items():
+            mine_s = self.samples.get(tag)
+            if mine_s is None:
+                mine_s = self.samples[tag] = SampleAccumulator(sample=tag)
+            mine_s.merge(sample)
+        for name, acc in other.paths.items():
+            mine = self.paths.get(name)
+            if mine is None:
+                mine = self.paths[name] = ProcessAccumulator(process=name)
+            mine.merge(acc)
+        self.warnings.extend(other.warnings)
+
+    def to_summary(self, trace_file: str) -> TraceSummary:
+        if self.total_tasks == 0:
+            return TraceSummary(
+                trace_file=trace_file, total_tasks=0, failed_tasks=0,
+                total_walltime_s=0, total_cpu_hours=0,
+                warnings=self.warnings or ["No tasks found in trace file"],
+            )
+        return TraceSummary(
+            trace_file=trace_file,
+            total_tasks=self.total_tasks,
+            failed_tasks=self.failed_tasks,
+            total_walltime_s=round(self.sum_duration_ms / 1000, 2),
+            total_cpu_hours=round(self.cpu_ms / 3_600_000, 4),
+            processes=[acc.to_summary() for _, acc in sorted(self.processes.items())],
+            warnings=list(self.warnings),
+        )
+
+
+def iter_trace_rows(path: str) -> Iterator[dict[str, str]]:
+    """Yield trace rows one at a time; plain or gzip-compressed input.
+
+    Raises FileNotFoundError if the file is missing and ValueError if it has
+    no header row.
+    """
+    p = Path(path)
+    if not p.exists():
+        raise FileNotFoundError(f"Trace file not found: {path}")
+    with _open_trace(p) as fh:
+        reader = csv.DictReader(fh, delimiter="\t")
+        if reader.fieldnames is None:
+            raise ValueError("Trace file is empty or has no header")
+        yield from reader
+
+
+def iter_trace_tasks(path: str, warnings: list[str] | None = None) -> Iterator[TaskRecord]:
+    """Yield parsed TaskRecords one at a time.
+
+    Rows that fail to parse are skipped and reported in ``warnings`` when a
+    list is supplied.  Raises like :func:`iter_trace_rows`.
+    """
+    tally = _TimestampTally()
+    for row in iter_trace_rows(path):
+        try:
+            yield _task_from_row(row, warnings, tally)
+        except (ValueError, KeyError):
+            if warnings is not None:
+                warnings.append(f"Could not parse trace row: {row.get('name', '?')}")
+
+
+def aggregate_trace(
+    path: str, acc: TraceAccumulator | None = None, track_samples: bool = False, track_paths: bool = False,
+) -> TraceAccumulator:
+    """Stream a trace file into a TraceAccumulator without materialising rows."""
+    acc = acc if acc is not None else TraceAccumulator(track_samples=track_samples, track_paths=track_paths)
+    try:
+        for row in iter_trace_rows(path):
+            acc.add_row(row)
+    except (FileNotFoundError, ValueError) as exc:
+        acc.warnings.append(str(exc))
+    except (OSError, EOFError, zlib.error, csv.Error) as exc:
+        # Truncated or corrupt gzip: keep the rows read before the damage.
+        acc.warnings.append(f"{path}: {exc} — only rows before the error are counted")
+    return acc
+
+
+@dataclass
+class MultiTraceSummary:
+    runs: list[TraceSummary] = field(default_factory=list)
+    combined: TraceSummary | None = None
+
+
+def find_trace_files(root: str, pattern: str = DEFAULT_TRACE_GLOB) -> list[str]:
+    """Return sorted trace paths under ``root`` matching ``pattern`` (sidecars excluded)."""
+    return sorted(
+        str(p) for p in Path(root).glob(pattern)
+        if p.is_file() and not p.name.endswith((_COLUMNAR_SUFFIX, _COLUMNAR_SUFFIX + ".tmp"))
     )
+
+
+def _aggregate_run(path: str, track_samples: bool, track_paths: bool) -> TraceAccumulator:
+    """`aggregate_traces` worker: a run that cannot be read becomes a warning."""
+    try:
+        return aggregate_trace(path, track_samples=track_samples, track_paths=track_paths)
+    except Exception as exc:  # noqa: BLE001 — one bad file must not abort the batch
+        return TraceAccumulator(
+            track_samples=track_samples, track_paths=track_paths, warnings=[f"{path}: {exc} — run skipped"],
+        )
+
+
+def aggregate_traces(
+    paths: list[str], workers: int | None = None, track_samples: bool = False, track_paths: bool = False,
+) -> list[TraceAccumulator]:
+    """Aggregate many trace files, one file per worker process.
+
+    Results are returned in input order; a file that fails to read yields an
+    empty accumulator carrying the error as a warning.  Falls back to a
+    serial loop when only one worker is requested or a process pool cannot
+    be started.
+    """
+    run = partial(_aggregate_run, track_samples=track_samples, track_paths=track_paths)
+    if workers == 1 or len(paths) <= 1:
+        return [run(p) for p in paths]
+    chunksize = max(1, len(paths) // ((workers or os.cpu_count() or 1) * 4))
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(run, paths, chunksize=chunksize))
+    except (OSError, NotImplementedError, BrokenProcessPool):
+        return [run(p) for p in paths]
+
+
+def summarize_traces(paths: list[str], workers: int | None = None, label: str = "combined") -> MultiTraceSummary:
+    """Per-run summaries plus one combined per-process summary across all runs."""
+    partials = aggregate_traces(paths, workers)
+    combined = TraceAccumulator()
+    for acc in partials:
+        combined.merge(acc)
+    if not paths:
+        combined.warnings.append("No trace files matched")
+    return MultiTraceSummary(
+        runs=[acc.to_summary(p) for p, acc in zip(paths, partials)],
+        combined=combined.to_summary(label),
+    )
+
+
+# ── Multi-view group-by aggregation ───────────────────────────────────────────
+
+
+def _hour_bucket(task: TaskRecord) -> str:
+    ms = task.start_ms or task.submit_ms
+    if not ms:
+        return ""
+    return datetime.fromtimestamp(ms // 3_600_000 * 3600, tz=UTC).strftime("%Y-%m-%dT%H:00Z")
+
+
+# Group-by keys: name → TaskRecord → str.  Views hold key and metric names,
+# not functions, so they stay picklable for process pools.
+GROUP_KEYS = {
+    "process": lambda t: t.process,
+    "path": lambda t: task_path(t.name),
+    "leaf": lambda t: leaf_process_name(t.name),
+    "subworkflow": lambda t: subworkflow_path(t.name),
+    "sample": lambda t: extract_task_tag(t.name),
+    "status": lambda t: t.status,
+    "hour": _hour_bucket,
+}
+
+# Metrics aggregators can read: name → TaskRecord → float.
+GROUP_METRICS = {
+    "duration_s": lambda t: t.duration_ms / 1000,
+    "realtime_s": lambda t: t.realtime_ms / 1000,
+    "cpu_pct": lambda t: t.cpu_pct,
+    "cpu_hours": lambda t: t.realtime_ms * t.cpu_pct / 100 / 3_600_000,
+    "peak_rss_mb": lambda t: t.peak_rss_mb,
+    "peak_vmem_mb": lambda t: t.peak_vmem_mb,
+    "rchar_mb": lambda t: t.rchar_mb,
+    "wchar_mb": lambda t: t.wchar_mb,
+    "failed": lambda t: float(_is_failed(t.status)),
+}
+
+AGGREGATOR_KINDS = ("count", "sum", "max", "sketch")
+
+
+@dataclass(frozen=True)
+class Aggregator:
+    """One aggregate per group: ``count``, or ``sum``/``max``/``sketch`` of a metric."""
+
+    kind: str
+    metric: str = ""
+
+    def __post_init__(self) -> None:
+        if self.kind not in AGGREGATOR_KINDS:
+            raise ValueError(f"Unknown aggregator '{self.kind}'. Supported: {', '.join(AGGREGATOR_KINDS)}")
+        if self.kind == "count" and self.metric:
+            raise ValueError("count takes no metric")
+        if self.kind != "count" and self.metric not in GROUP_METRICS:
+            raise ValueError(f"Unknown metric '{self.metric}'. Supported: {', '.join(GROUP_METRICS)}")
+
+    @classmethod
+    def parse(cls, spec: str) -> Aggregator:
+        """Parse 'count', 'sum:cpu_hours', 'max:peak_rss_mb' or 'sketch:realtime_s'."""
+        kind, _, metric = spec.strip().partition(":")
+        return cls(kind.strip(), metric.strip())
+
+    @property
+    def label(self) -> str:
+        return self.kind if self.kind == "count" else f"{self.kind}_{self.metric}"
+
+
+@dataclass
+class GroupView:
+    """Aggregates for one group-by key tuple, updated one task at a time."""
+
+    keys: tuple[str, ...]
+    aggregators: tuple[Aggregator, ...]
+    groups: dict[tuple[str, ...], list] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        unknown = [k for k in self.keys if k not in GROUP_KEYS]
+        if unknown or not self.keys:
+            raise ValueError(f"Unknown group-by key(s) {unknown}. Supported: {', '.join(GROUP_KEYS)}")
+
+    def _new_state(self) -> list:
+        return [QuantileSketch() if a.kind == "sketch" else 0 for a in self.aggregators]
+
+    def add(self, key: tuple[str, ...], values: dict[str, float]) -> None:
+        state = self.groups.get(key)
+        if state is None:
+            state = self.groups[key] = self._new_state()
+        for i, agg in enumerate(self.aggregators):
+            if agg.kind == "count":
+                state[i] += 1
+            elif agg.kind == "sum":
+                state[i] += values[agg.metric]
+            elif agg.kind == "max":
+                state[i] = max(state[i], values[agg.metric])
+            else:
+                state[i].add(values[agg.metric])
+
+    def merge(self, other: GroupView) -> None:
+        for key, theirs in other.groups.items():
+            mine = self.groups.get(key)
+            if mine is None:
+                mine = self.groups[key] = self._new_state()
+            for i, agg in enumerate(self.aggregators):
+                if agg.kind in ("count", "sum"):
+                    mine[i] += theirs[i]
+                elif agg.kind == "max":
+                    mine[i] = max(mine[i], theirs[i])
+                else:
+                    mine[i].merge(theirs[i])
+
+    def rows(self) -> list[dict]:
+        out = []
+        for key, state in sorted(self.groups.items()):
+            row: dict = dict(zip(self.keys, key))
+            for agg, value in zip(self.aggregators, state):
+                if agg.kind == "sketch":
+                    row[agg.label] = {k: round(v, 2) for k, v in value.quantiles().items()}
+                else:
+                    row[agg.label] = round(value, 4) if isinstance(value, float) else value
+            out.append(row)
+        return out
+
+
+@dataclass
+class MultiAggregator:
+    """Several group-by views filled from one streaming pass over the tasks.
+
+    Each distinct key and metric is computed once per task and shared by
+    every view that uses it, so adding a view costs a dict update per task
+    rather than another read of the trace.
+    """
+
+    views: dict[str, GroupView] = field(default_factory=dict)
+    total_tasks: int = 0
+    warnings: list[str] = field(default_factory=list)
+    _timestamps: _TimestampTally = field(default_factory=_TimestampTally, repr=False, compare=False)
+
+    @classmethod
+    def from_specs(
+        cls, group_bys: Sequence[Sequence[str]], aggregators: Sequence[str],
+    ) -> MultiAggregator:
+        """One view per key list, all sharing ``aggregators`` (spec strings)."""
+        aggs = tuple(Aggregator.parse(a) for a in aggregators)
+        return cls(views={
+            ",".join(keys): GroupView(keys=tuple(keys), aggregators=aggs) for keys in group_bys
+        })
+
+    def add(self, task: TaskRecord) -> None:
+        self.total_tasks += 1
+        keys: dict[str, str] = {}
+        values: dict[str, float] = {}
+        for view in self.views.values():
+            for k in view.keys:
+                if k not in keys:
+                    keys[k] = GROUP_KEYS[k](task)
+            for agg in view.aggregators:
+                if agg.metric and agg.metric not in values:
+                    values[agg.metric] = GROUP_METRICS[agg.metric](task)
+            view.add(tuple(keys[k] for k in view.keys), values)
+
+    def add_row(self, row: dict[str, str]) -> None:
+        try:
+            self.add(_task_from_row(row, self.warnings, self._timestamps))
+        except (ValueError, KeyError):
+            self.warnings.append(f"Could not parse trace row: {row.get('name', '?')}")
+
+    def merge(self, other: MultiAggregator) -> None:
+        self.total_tasks += other.total_tasks
+        for name, view in other.views.items():
+            if name in self.views:
+                self.views[name].merge(view)
+            else:
+                self.views[name] = view
+        self.warnings.extend(other.warnings)
+
+    def results(self) -> dict[str, list[dict]]:
+        return {name: view.rows() for name, view in self.views.items()}
+
+
+def group_trace(
+    path: str, group_bys: Sequence[Sequence[str]], aggregators: Sequence[str],
+) -> MultiAggregator:
+    """Stream a trace once into every requested group-by view."""
+    multi = MultiAggregator.from_specs(group_bys, aggregators)
+    try:
+        for row in iter_trace_rows(path):
+            multi.add_row(row)
+    except (FileNotFoundError, ValueError) as exc:
+        multi.warnings.append(str(exc))
+    return multi
+
+
+class TraceFollower:
+    """Incrementally aggregate a trace.txt that Nextflow is still appending to.
+
+    Each :meth:`poll` reads only bytes written since the previous poll,
+    holds back a trailing partial line until its newline arrives, and folds
+    complete rows into the same :class:`TraceAccumulator`.  If the file is
+    truncated or replaced (rotation, new run), aggregation restarts from the
+    beginning of the new file.  Replacement is detected by a new inode, a
+    size below the consumed offset, or a change in the file's first bytes
+    (header plus the first rows) — the last catches ``trace.overwrite = true``
+    rewriting the same inode past the old offset.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.acc = TraceAccumulator()
+        self.rotations = 0
+        self._offset = 0
+        self._inode: int | None = None
+        self._header: list[str] | None = None
+        self._pending = b""
+        self._prefix = b""
+
+    def _reset(self) -> None:
+        self.acc = TraceAccumulator()
+        self._offset = 0
+        self._header = None
+        self._pending = b""
+        self._prefix = b""
+
+    def poll(self) -> int:
+        """Consume newly appended rows; return how many rows were added."""
+        p = Path(self.path)
+        try:
+            st = p.stat()
+        except FileNotFoundError:
+            return 0
+        if self._inode is not None and (st.st_ino != self._inode or st.st_size < self._offset):
+            self._reset()
+            self.rotations += 1
+        self._inode = st.st_ino
+
+        added = 0
+        with p.open("rb") as fh:
+            if self._prefix and fh.read(len(self._prefix)) != self._prefix:
+                self._reset()
+                self.rotations += 1
+            if st.st_size == self._offset:
+                return 0
+            fh.seek(self._offset)
+            while chunk := fh.read(_FOLLOW_CHUNK_BYTES):
+                if len(self._prefix) < _FOLLOW_PREFIX_BYTES:
+                    # Offset and prefix grow together until the cap, so this is file[:n].
+                    self._prefix += chunk[:_FOLLOW_PREFIX_BYTES - len(self._prefix)]
+                self._offset += len(chunk)
+                data = self._pending + chunk
+                cut = data.rfind(b"\n") + 1
+                self._pending = data[cut:]
+                if self._header is None and data.startswith(b"\x1f\x8b"):
+                    raise ValueError(f"Cannot follow compressed trace file: {self.path}")
+                if cut:
+                    added += self._consume(data[:cut].decode("utf-8", errors="replace").splitlines())
+        return added
+
+    def _consume(self, lines: list[str]) -> int:
+        added = 0
+        for fields in csv.reader(lines, delimiter="\t"):
+            if not fields:
+                continue
+            if self._header is None:
+                self._header = fields
+                continue
+            self.acc.add_row(dict(zip(self._header, fields)))
+            added += 1
+        return added
+
+    def summary(self) -> TraceSummary:
+        if self._header is None:
+            return TraceSummary(
+                trace_file=self.path, total_tasks=0, failed_tasks=0,
+                total_walltime_s=0, total_cpu_hours=0,
+                warnings=["Waiting for trace header"],
+            )
+        return self.acc.to_summary(self.path)
+
+
+# ── columnar cache ───────────────────────────────────────────────────────────
+#
+# Sidecar layout (native byte order, recorded in the metadata):
+#   8-byte magic | u64 metadata length | metadata JSON | pad to 8 |
+#   one 8-byte-aligned typed array per column, offsets relative to data start.
+
+_COLUMNAR_MAGIC = b"HXCOL1\x00\x00"
+_COLUMNAR_VERSION = 2
+_COLUMNAR_SUFFIX = ".hxcol"
+_COLUMNS: tuple[tuple[str, str], ...] = (
+    ("duration_ms", "q"),
+    ("realtime_ms", "q"),
+    ("submit_ms", "q"),
+    ("start_ms", "q"),
+    ("complete_ms", "q"),
+    ("cpu_pct", "d"),
+    ("peak_rss_mb", "d"),
+    ("peak_vmem_mb", "d"),
+    ("path_id", "I"),      # index into meta["paths"] (interned `task_path`)
+    ("status_id", "B"),
+)
+
+
+def _pad8(n: int) -> int:
+    return (8 - n % 8) % 8
+
+
+def _source_signature(p: Path) -> dict[str, object]:
+    st = p.stat()
+    with _open_trace(p) as fh:
+        header_line = fh.readline()
+    return {
+        "source_size": st.st_size,
+        "source_mtime_ns": st.st_mtime_ns,
+        "header_sha256": hashlib.sha256(header_line.encode("utf-8")).hexdigest(),
+    }
+
+
+class ColumnarTrace:
+    """Typed, per-column view of a parsed trace, optionally backed by mmap.
+
+    Keeps each task's fully qualified process path (interned), status,
+    submit/start/complete timestamps and resource usage.  Sample tags, task
+    ids, hashes, exit codes and request columns are not cached, so tasks
+    come back named by their process path alone.
+    """
+
+    def __init__(self, meta: dict, columns: dict[str, Sequence], mm: mmap.mmap | None = None) -> None:
+        self.meta = meta
+        self.columns = columns
+        self.paths: list[str] = meta["paths"]
+        self.statuses: list[str] = meta["statuses"]
+        self._mm = mm
+
+    def __len__(self) -> int:
+        return int(self.meta["rows"])
+
+    def __enter__(self) -> ColumnarTrace:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    @property
+    def memory_mapped(self) -> bool:
+        return self._mm is not None
+
+    def close(self) -> None:
+        if self._mm is not None:
+            for view in self.columns.values():
+                view.release()
+            self.columns = {}
+            self._mm.close()
+            self._mm = None
+
+    def iter_tasks(self) -> Iterator[TaskRecord]:
+        c = self.columns
+        for i in range(len(self)):
+            path = self.paths[c["path_id"][i]]
+            yield TaskRecord(
+                task_id="",
+                name=path,
+                process=_extract_process_name(path),
+                status=self.statuses[c["status_id"][i]],
+                exit_code="",
+                duration_ms=c["duration_ms"][i],
+                realtime_ms=c["realtime_ms"][i],
+                cpu_pct=c["cpu_pct"][i],
+                peak_rss_mb=c["peak_rss_mb"][i],
+                peak_vmem_mb=c["peak_vmem_mb"][i],
+                submit_ms=c["submit_ms"][i],
+                start_ms=c["start_ms"][i],
+                complete_ms=c["complete_ms"][i],
+            )
+
+    def to_accumulator(self) -> TraceAccumulator:
+        acc = TraceAccumulator(warnings=list(self.meta.get("warnings", [])))
+        for task in self.iter_tasks():
+            acc.add(task)
+        return acc
+
+    def write(self, out_path: Path) -> None:
+        meta = json.dumps(self.meta).encode("utf-8")
+        tmp = out_path.with_name(out_path.name + ".tmp")
+        with tmp.open("wb") as fh:
+            fh.write(_COLUMNAR_MAGIC)
+            fh.write(struct.pack("<Q", len(meta)))
+            fh.write(meta)
+            fh.write(b"\x00" * _pad8(len(_COLUMNAR_MAGIC) + 8 + len(meta)))
+            for name, _ in _COLUMNS:
+                raw = memoryview(self.columns[name]).cast("B")
+                fh.write(raw)
+                fh.write(b"\x00" * _pad8(len(raw)))
+        tmp.replace(out_path)
+
+
+def _build_columnar(p: Path, signature: dict[str, object]) -> ColumnarTrace:
+    cols: dict[str, array] = {name: array(code) for name, code in _COLUMNS}
+    path_ids: dict[str, int] = {}
+    status_ids: dict[str, int] = {}
+    warnings: list[str] = []
+    tally = _TimestampTally()
+    for row in iter_trace_rows(str(p)):
+        try:
+            t = _task_from_row(row, warnings, tally)
+        except (ValueError, KeyError):
+            warnings.append(f"Could not parse trace row: {row.get('name', '?')}")
+            continue
+        cols["duration_ms"].append(t.duration_ms)
+        cols["realtime_ms"].append(t.realtime_ms)
+        cols["submit_ms"].append(t.submit_ms)
+        cols["start_ms"].append(t.start_ms)
+        cols["complete_ms"].append(t.complete_ms)
+        cols["cpu_pct"].append(t.cpu_pct)
+        cols["peak_rss_mb"].append(t.peak_rss_mb)
+        cols["peak_vmem_mb"].append(t.peak_vmem_mb)
+        cols["path_id"].append(path_ids.setdefault(task_path(t.name), len(path_ids)))
+        cols["status_id"].append(status_ids.setdefault(t.status, len(status_ids)))
+    if len(status_ids) > 255:
+        raise ValueError("Too many distinct task statuses for columnar cache")
+
+    offsets: dict[str, int] = {}
+    pos = 0
+    for name, _ in _COLUMNS:
+        offsets[name] = pos
+        nbytes = len(cols[name]) * cols[name].itemsize
+        pos += nbytes + _pad8(nbytes)
+    meta = {
+        "version": _COLUMNAR_VERSION,
+        "byteorder": sys.byteorder,
+        **signature,
+        "rows": len(cols["duration_ms"]),
+        "paths": list(path_ids),
+        "statuses": list(status_ids),
+        "offsets": offsets,
+        "warnings": warnings,
+    }
+    return ColumnarTrace(meta, cols)
+
+
+def _map_columnar(cache_path: Path, signature: dict[str, object]) -> ColumnarTrace | None:
+    """Memory-map a sidecar; return None if it is missing, stale or foreign."""
+    try:
+        with cache_path.open("rb") as fh:
+            if fh.read(len(_COLUMNAR_MAGIC)) != _COLUMNAR_MAGIC:
+                return None
+            (meta_len,) = struct.unpack("<Q", fh.read(8))
+            meta = json.loads(fh.read(meta_len))
+            if (
+                meta.get("version") != _COLUMNAR_VERSION
+                or meta.get("byteorder") != sys.byteorder
+                or any(meta.get(k) != v for k, v in signature.items())
+            ):
+                return None
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError, struct.error):
+        return None
+
+    data_start = len(_COLUMNAR_MAGIC) + 8 + meta_len
+    data_start += _pad8(data_start)
+    rows = int(meta["rows"])
+    base = memoryview(mm)
+    columns: dict[str, Sequence] = {}
+    try:
+        for name, code in _COLUMNS:
+            start = data_start + meta["offsets"][name]
+            size = rows * array(code).itemsize
+            if start + size > len(mm):
+                raise ValueError("truncated columnar cache")
+            columns[name] = base[start:start + size].cast(code)
+    except (KeyError, TypeError, ValueError):
+        for view in columns.values():
+            view.release()
+        base.release()
+        mm.close()
+        return None
+    base.release()
+    return ColumnarTrace(meta, columns, mm)
+
+
+def columnar_cache_path(path: str, cache_dir: str | None = None) -> Path:
+    p = Path(path)
+    if cache_dir is None:
+        return p.with_name(p.name + _COLUMNAR_SUFFIX)
+    digest = hashlib.sha256(str(p.resolve()).encode("utf-8")).hexdigest()[:16]
+    return Path(cache_dir) / f"{p.name}.{digest}{_COLUMNAR_SUFFIX}"
+
+
+def load_columnar_trace(path: str, cache_dir: str | None = None) -> ColumnarTrace:
+    """Return a columnar view of a trace, reusing a valid sidecar when present.
+
+    The sidecar is keyed on the source file's size, mtime and a SHA-256 of
+    its header line; any mismatch triggers a re-parse and rewrite.  If the
+    sidecar cannot be written (e.g. read-only results directory) the freshly
+    parsed in-memory columns are returned instead.
+    """
+    p = Path(path)
+    if not p.exists():
+        raise FileNotFoundError(f"Trace file not found: {path}")
+    signature = _source_signature(p)
+    cache_path = columnar_cache_path(path, cache_dir)
+    cached = _map_columnar(cache_path, signature)
+    if cached is not None:
+        return cached
+    built = _build_columnar(p, signature)
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        built.write(cache_path)
+    except OSError:
+        return built
+    return _map_columnar(cache_path, signature) or built
+
+
+def parse_trace(path: str, use_cache: bool = False, cache_dir: str | None = None) -> TraceSummary:
+    """Parse a Nextflow trace.txt (optionally .gz) and return a TraceSummary.
+
+    Rows are aggregated as they are read, so memory use is bounded by the
+    number of distinct processes rather than the number of tasks.  With
+    ``use_cache`` the typed columnar sidecar is read (or written) instead.
+    """
+    if use_cache and Path(path).exists():
+        try:
+            with load_columnar_trace(path, cache_dir) as cols:
+                return cols.to_accumulator().to_summary(path)
+        except ValueError as exc:
+            acc = TraceAccumulator(warnings=[str(exc)])
+            return acc.to_summary(path)
+        except (OSError, EOFError, zlib.error, csv.Error) as exc:
+            # Damaged source: summarise the readable rows without caching them.
+            acc = aggregate_trace(path)
+            acc.warnings.insert(0, f"Columnar cache not built: {exc}")
+            return acc.to_summary(path)
+    return aggregate_trace(path).to_summary(path)
@@ -0,0 +1,162 @@
+"""Run-to-run performance regression detection on Nextflow traces.
+
+Both traces are streamed into per-process quantile sketches (see
+`helixsh.sketch`), so comparison cost does not depend on holding either
+trace in memory.  For each process and metric the two distributions are
+compared with a Mann–Whitney U test computed directly from the sketches'
+shared log-spaced buckets: values in the same bucket (within the sketch's
+1% relative accuracy) count as ties.  The normal approximation omits the
+tie correction, which makes p-values slightly conservative.
+
+A change is reported as a regression or improvement only when it is both
+statistically significant (p < alpha) and practically large: the median
+moves by at least ``min_change`` and Cliff's delta reaches ``min_effect``.
+
+Sketches are kept per fully qualified process path (`trace.task_path`);
+pooling every tool of an nf-core run under its top-level workflow would
+let the unchanged processes hide a regression in one.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+
+from helixsh.sketch import QuantileSketch
+from helixsh.trace import aggregate_traces
+
+DEFAULT_METRICS = ("realtime_s", "peak_rss_mb")
+DEFAULT_ALPHA = 0.01
+DEFAULT_MIN_CHANGE = 0.10
+# Cliff's delta of 0.147 is the conventional "small effect" threshold.
+DEFAULT_MIN_EFFECT = 0.147
+MIN_TASKS = 5
+
+
+@dataclass
+class MetricDiff:
+    process: str
+    metric: str
+    n_old: int
+    n_new: int
+    median_old: float
+    median_new: float
+    p95_old: float
+    p95_new: float
+    median_change_pct: float
+    cliffs_delta: float      # P(new > old) - P(new < old); positive = larger in new
+    p_value: float
+    verdict: str             # regression | improvement | unchanged | insufficient-data
+
+
+@dataclass
+class TraceDiffReport:
+    old_trace: str
+    new_trace: str
+    alpha: float
+    min_change: float
+    regressions: int
+    improvements: int
+    diffs: list[MetricDiff] = field(default_factory=list)
+    added_processes: list[str] = field(default_factory=list)
+    removed_processes: list[str] = field(default_factory=list)
+    warnings: list[str] = field(default_factory=list)
+
+
+def mann_whitney_sketch(old: QuantileSketch, new: QuantileSketch) -> tuple[float, float]:
+    """Return (cliffs_delta, two-sided p-value) comparing ``new`` against ``old``.
+
+    Both sketches must share the same relative accuracy so their buckets align.
+    """
+    if old.relative_accuracy != new.relative_accuracy:
+        raise ValueError("Sketches must share relative accuracy to be compared")
+    n1, n2 = old.count, new.count
+    if not n1 or not n2:
+        return 0.0, 1.0
+
+    # Zero bucket sorts below every positive bucket.
+    keys = sorted(set(old.bins) | set(new.bins))
+    old_counts = [old.zero_count] + [old.bins.get(k, 0) for k in keys]
+    new_counts = [new.zero_count] + [new.bins.get(k, 0) for k in keys]
+
+    # U = number of (old, new) pairs with new > old, ties counted as half.
+    u = 0.0
+    old_below = 0
+    for c_old, c_new in zip(old_counts, new_counts):
+        u += c_new * (old_below + 0.5 * c_old)
+        old_below += c_old
+
+    delta = 2 * u / (n1 * n2) - 1
+    sigma = math.sqrt(n1 * n2 * (n1 + n2 + 1) / 12)
+    z = (u - n1 * n2 / 2) / sigma if sigma else 0.0
+    p = math.erfc(abs(z) / math.sqrt(2))
+    return delta, p
+
+
+def _compare(
+    process: str, metric: str, old: QuantileSketch, new: QuantileSketch,
+    alpha: float, min_change: float, min_effect: float,
+) -> MetricDiff:
+    med_old, med_new = old.quantile(0.5), new.quantile(0.5)
+    change = (med_new - med_old) / med_old if med_old else 0.0
+    if old.count < MIN_TASKS or new.count < MIN_TASKS:
+        delta, p, verdict = 0.0, 1.0, "insufficient-data"
+    else:
+        delta, p = mann_whitney_sketch(old, new)
+        verdict = "unchanged"
+        if p < alpha and abs(change) >= min_change and abs(delta) >= min_effect:
+            verdict = "regression" if change > 0 else "improvement"
+    return MetricDiff(
+        process=process,
+        metric=metric,
+        n_old=old.count,
+        n_new=new.count,
+        median_old=round(med_old, 2),
+        median_new=round(med_new, 2),
+        p95_old=round(old.quantile(0.95), 2),
+        p95_new=round(new.quantile(0.95), 2),
+        median_change_pct=round(change * 100, 1),
+        cliffs_delta=round(delta, 3),
+        p_value=float(f"{p:.3g}"),
+        verdict=verdict,
+    )
+
+
+def diff_traces(
+    old_path: str,
+    new_path: str,
+    metrics: tuple[str, ...] = DEFAULT_METRICS,
+    alpha: float = DEFAULT_ALPHA,
+    min_change: float = DEFAULT_MIN_CHANGE,
+    min_effect: float = DEFAULT_MIN_EFFECT,
+    workers: int | None = None,
+) -> TraceDiffReport:
+    """Compare per-process metric distributions between two traces."""
+    old_acc, new_acc = aggregate_traces([old_path, new_path], workers=workers, track_paths=True)
+    warnings = [f"old: {w}" for w in old_acc.warnings] + [f"new: {w}" for w in new_acc.warnings]
+
+    diffs: list[MetricDiff] = []
+    for name in sorted(set(old_acc.paths) & set(new_acc.paths)):
+        old_p, new_p = old_acc.paths[name], new_acc.paths[name]
+        for metric in metrics:
+            if metric not in old_p.sketches:
+                raise ValueError(f"Unknown metric '{metric}'")
+            diffs.append(_compare(name, metric, old_p.sketches[metric], new_p.sketches[metric],
+                                  alpha, min_change, min_effect))
+
+    # Worst regressions first, then improvements, then the rest.
+    rank = {"regression": 0, "improvement": 1, "unchanged": 2, "insufficient-data": 3}
+    diffs.sort(key=lambda d: (rank[d.verdict], -abs(d.median_change_pct)))
+
+    return TraceDiffReport(
+        old_trace=old_path,
+        new_trace=new_path,
+        alpha=alpha,
+        min_change=min_change,
+        regressions=sum(d.verdict == "regression" for d in diffs),
+        improvements=sum(d.verdict == "improvement" for d in diffs),
+        diffs=diffs,
+        added_processes=sorted(set(new_acc.paths) - set(old_acc.paths)),
+        removed_processes=sorted(set(old_acc.paths) - set(new_acc.paths)),
+        warnings=warnings,
+    )
@@ -0,0 +1,207 @@
+"""Allocation efficiency and wasted-spend accounting from Nextflow traces.
+
+When the trace includes the requested `cpus`, `memory` and `time` columns,
+each task's reservation can be compared with what it actually used:
+
+  - CPU-hours reserved  = cpus × realtime;  used = %cpu / 100 × realtime
+  - GB-hours reserved   = memory × realtime; used = peak_rss × realtime
+  - time-limit use      = realtime / time
+
+Idle CPU-hours and GB-hours are priced with the `helixsh.cloud_cost` unit
+prices, giving a ranked list of the processes whose over-requests waste
+the most money — the ones to fix first to fit more work into a fixed
+allocation.  Peak RSS is an upper bound on memory in use, so memory waste
+is, if anything, understated.
+
+Processes are ranked by their fully qualified path (`trace.task_path`), so
+each row of an nf-core report names a process whose request can be fixed.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from helixsh.cloud_cost import unit_prices
+from helixsh.trace import TaskRecord, iter_trace_tasks, task_path
+
+
+@dataclass
+class ProcessWaste:
+    process: str
+    tasks: int
+    cpu_hours_reserved: float
+    cpu_hours_used: float
+    cpu_efficiency: float
+    gb_hours_reserved: float
+    gb_hours_used: float
+    memory_efficiency: float
+    time_limit_use: float      # mean realtime / requested time (0 if unknown)
+    idle_cpu_hours: float
+    idle_gb_hours: float
+    wasted_usd: float
+    recommendation: str = ""
+
+
+@dataclass
+class RunWaste:
+    trace_file: str
+    tasks: int
+    tasks_without_requests: int
+    cpu_efficiency: float
+    memory_efficiency: float
+    wasted_usd: float
+    reserved_usd: float
+
+
+@dataclass
+class WasteReport:
+    provider: str
+    instance_family: str
+    price_per_cpu_hour: float
+    price_per_gb_hour: float
+    total_wasted_usd: float
+    total_reserved_usd: float
+    runs: list[RunWaste] = field(default_factory=list)
+    processes: list[ProcessWaste] = field(default_factory=list)
+    warnings: list[str] = field(default_factory=list)
+
+
+@dataclass
+class WasteAccumulator:
+    tasks: int = 0
+    cpu_h_reserved: float = 0.0
+    cpu_h_used: float = 0.0
+    gb_h_reserved: float = 0.0
+    gb_h_used: float = 0.0
+    time_use_sum: float = 0.0
+    time_use_n: int = 0
+
+    def add(self, task: TaskRecord) -> None:
+        hours = task.realtime_ms / 3_600_000
+        self.tasks += 1
+        self.cpu_h_reserved += task.cpus * hours
+        # Cap usage at the reservation so one oversubscribed task can't offset idle ones.
+        self.cpu_h_used += min(task.cpu_pct / 100, task.cpus) * hours
+        self.gb_h_reserved += task.memory_req_mb / 1024 * hours
+        self.gb_h_used += min(task.peak_rss_mb, task.memory_req_mb) / 1024 * hours
+        if task.time_req_ms:
+            self.time_use_sum += task.realtime_ms / task.time_req_ms
+            self.time_use_n += 1
+
+    def merge(self, other: WasteAccumulator) -> None:
+        self.tasks += other.tasks
+        self.cpu_h_reserved += other.cpu_h_reserved
+        self.cpu_h_used += other.cpu_h_used
+        self.gb_h_reserved += other.gb_h_reserved
+        self.gb_h_used += other.gb_h_used
+        self.time_use_sum += other.time_use_sum
+        self.time_use_n += other.time_use_n
+
+    @property
+    def idle_cpu_hours(self) -> float:
+        return max(self.cpu_h_reserved - self.cpu_h_used, 0.0)
+
+    @property
+    def idle_gb_hours(self) -> float:
+        return max(self.gb_h_reserved - self.gb_h_used, 0.0)
+
+    def cost(self, prices: dict[str, float]) -> tuple[float, float]:
+        """Return (wasted_usd, reserved_usd)."""
+        wasted = self.idle_cpu_hours * prices["cpu"] + self.idle_gb_hours * prices["mem"]
+        reserved = self.cpu_h_reserved * prices["cpu"] + self.gb_h_reserved * prices["mem"]
+        return wasted, reserved
+
+
+def _ratio(used: float, reserved: float) -> float:
+    return round(used / reserved, 3) if reserved else 0.0
+
+
+def analyze_waste(
+    paths: list[str],
+    provider: str = "aws",
+    instance_family: str = "general",
+) -> WasteReport:
+    """Rank processes by money spent on reserved-but-idle CPU and memory."""
+    prices = unit_prices(provider, instance_family)
+    warnings: list[str] = []
+    by_process: dict[str, WasteAccumulator] = {}
+    runs: list[RunWaste] = []
+
+    for path in paths:
+        run = WasteAccumulator()
+        # Merged into by_process only once the whole file has been read, so a
+        # run that fails partway leaves per-process and per-run totals in step.
+        run_processes: dict[str, WasteAccumulator] = {}
+        missing = 0
+        try:
+            for t in iter_trace_tasks(path, warnings):
+                if not t.cpus or not t.memory_req_mb:
+                    missing += 1
+                    continue
+                run.add(t)
+                process = task_path(t.name)
+                acc = run_processes.get(process)
+                if acc is None:
+                    acc = run_processes[process] = WasteAccumulator()
+                acc.add(t)
+        except (OSError, EOFError, ValueError) as exc:
+            warnings.append(f"{path}: {exc} — run skipped")
+            continue
+        for name, acc in run_processes.items():
+            if name in by_process:
+                by_process[name].merge(acc)
+            else:
+                by_process[name] = acc
+        if missing:
+            warnings.append(
+                f"{path}: {missing} task(s) lack requested cpus/memory — add them to trace.fields"
+            )
+        wasted, reserved = run.cost(prices)
+        runs.append(RunWaste(
+            trace_file=path,
+            tasks=run.tasks,
+            tasks_without_requests=missing,
+            cpu_efficiency=_ratio(run.cpu_h_used, run.cpu_h_reserved),
+            memory_efficiency=_ratio(run.gb_h_used, run.gb_h_reserved),
+            wasted_usd=round(wasted, 4),
+            reserved_usd=round(reserved, 4),
+        ))
+
+    processes: list[ProcessWaste] = []
+    for name, acc in by_process.items():
+        wasted, _ = acc.cost(prices)
+        cpu_eff = _ratio(acc.cpu_h_used, acc.cpu_h_reserved)
+        mem_eff = _ratio(acc.gb_h_used, acc.gb_h_reserved)
+        rec = ""
+        if wasted > 0:
+            worst = "memory" if acc.idle_gb_hours * prices["mem"] > acc.idle_cpu_hours * prices["cpu"] else "cpus"
+            eff = mem_eff if worst == "memory" else cpu_eff
+            rec = f"Only {eff:.0%} of reserved {worst} used — lower the request (see trace-rightsize)"
+        processes.append(ProcessWaste(
+            process=name,
+            tasks=acc.tasks,
+            cpu_hours_reserved=round(acc.cpu_h_reserved, 4),
+            cpu_hours_used=round(acc.cpu_h_used, 4),
+            cpu_efficiency=cpu_eff,
+            gb_hours_reserved=round(acc.gb_h_reserved, 4),
+            gb_hours_used=round(acc.gb_h_used, 4),
+            memory_efficiency=mem_eff,
+            time_limit_use=round(acc.time_use_sum / acc.time_use_n, 3) if acc.time_use_n else 0.0,
+            idle_cpu_hours=round(acc.idle_cpu_hours, 4),
+            idle_gb_hours=round(acc.idle_gb_hours, 4),
+            wasted_usd=round(wasted, 4),
+            recommendation=rec,
+        ))
+    processes.sort(key=lambda p: p.wasted_usd, reverse=True)
+
+    return WasteReport(
+        provider=provider.strip().lower(),
+        instance_family=instance_family.strip().lower(),
+        price_per_cpu_hour=prices["cpu"],
+        price_per_gb_hour=prices["mem"],
+        total_wasted_usd=round(sum(r.wasted_usd for r in runs), 4),
+        total_reserved_usd=round(sum(r.reserved_usd for r in runs), 4),
+        runs=runs,
+        processes=processes,
+        warnings=warnings,
+    )
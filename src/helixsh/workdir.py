@@ -0,0 +1,235 @@
+"""Rebuild trace rows from a Nextflow work directory.
+
+When a run crashes or is killed, `trace.txt` is often missing or truncated,
+but every task directory (`work/ab/cdef…/`) still records what happened:
+
+  - `.command.run`    — written at submission; its header names the task;
+  - `.command.begin`  — touched when the task starts;
+  - `.exitcode`       — written on completion, holding the exit status;
+  - `.command.trace`  — `key=value` metrics from Nextflow's wrapper
+    (`realtime` in ms, `%cpu` in tenths of a percent, memory in KB, I/O
+    counters in bytes).
+
+File modification times give submit/start/complete timestamps.  Each task
+becomes a row with the standard trace.txt column names, so it feeds
+`TraceAccumulator` (and the rest of the trace tooling) unchanged.
+
+On network filesystems the scan is dominated by per-file metadata round
+trips, not CPU, so the 256 hash-prefix directories are spread over a thread
+pool; the threads overlap their stat/open latency.
+"""
+
+from __future__ import annotations
+
+import csv
+import os
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from helixsh.trace import TraceAccumulator, TraceSummary
+
+DEFAULT_SCAN_WORKERS = 32
+# Columns written by `write_trace`; names match Nextflow's trace.txt.
+TRACE_COLUMNS = (
+    "task_id", "hash", "name", "status", "exit", "submit", "start", "complete",
+    "duration", "realtime", "%cpu", "peak_rss", "peak_vmem", "rchar", "wchar",
+    "syscr", "syscw", "read_bytes", "write_bytes", "vol_ctxt", "inv_ctxt",
+)
+# `.command.trace` keys reported in KB, converted to bytes for trace rows.
+_KB_KEYS = ("peak_rss", "peak_vmem")
+_BYTE_KEYS = ("rchar", "wchar", "read_bytes", "write_bytes")
+_COUNT_KEYS = ("syscr", "syscw", "vol_ctxt", "inv_ctxt")
+_RUN_HEADER_BYTES = 4096
+
+
+@dataclass
+class WorkdirScan:
+    work_dir: str
+    task_dirs: int
+    rows: int
+    not_started: int
+    unfinished: int
+    summary: TraceSummary | None = None
+    warnings: list[str] = field(default_factory=list)
+
+
+def _mtime_ms(path: str) -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns // 1_000_000
+    except FileNotFoundError:
+        return None
+
+
+def _read_text(path: str, limit: int = -1) -> str | None:
+    try:
+        with open(path, encoding="utf-8", errors="replace") as fh:
+            return fh.read(limit)
+    except FileNotFoundError:
+        return None
+
+
+def _task_name(run_header: str | None) -> str:
+    """Task name from the `.command.run` header (current and older formats)."""
+    for line in (run_header or "").splitlines():
+        line = line.strip()
+        if line.startswith("### name:"):
+            return line.split(":", 1)[1].strip().strip("'\"")
+        if line.startswith("# NEXTFLOW TASK:"):
+            return line.split(":", 1)[1].strip()
+    return ""
+
+
+def parse_command_trace(text: str) -> dict[str, str]:
+    """Parse a `.command.trace` file into trace.txt-style string values."""
+    raw: dict[str, str] = {}
+    for line in text.splitlines():
+        key, sep, value = line.partition("=")
+        if sep:
+            raw[key.strip()] = value.strip()
+    row: dict[str, str] = {}
+    if raw.get("realtime", "").isdigit():
+        row["realtime"] = raw["realtime"]
+    if raw.get("%cpu", "").isdigit():
+        row["%cpu"] = f"{int(raw['%cpu']) / 10:g}"
+    for key in _KB_KEYS:
+        if raw.get(key, "").isdigit():
+            row[key] = str(int(raw[key]) * 1024)
+    for key in _BYTE_KEYS + _COUNT_KEYS:
+        if raw.get(key, "").isdigit():
+            row[key] = raw[key]
+    return row
+
+
+def read_task_dir(path: str) -> dict[str, str] | None:
+    """Build one trace row from a task directory; None if the task never started."""
+    begin_ms = _mtime_ms(os.path.join(path, ".command.begin"))
+    if begin_ms is None:
+        return None
+    run_path = os.path.join(path, ".command.run")
+    submit_ms = _mtime_ms(run_path) or begin_ms
+    exit_text = _read_text(os.path.join(path, ".exitcode"))
+    complete_ms = _mtime_ms(os.path.join(path, ".exitcode")) if exit_text is not None else None
+    exit_code = (exit_text or "").strip()
+
+    if complete_ms is None or not exit_code:
+        status, exit_code = "ABORTED", "-"
+    else:
+        status = "COMPLETED" if exit_code == "0" else "FAILED"
+
+    prefix, task_dir = os.path.split(os.path.normpath(path))
+    row = {
+        "hash": f"{os.path.basename(prefix)}/{task_dir[:6]}",
+        "name": _task_name(_read_text(run_path, _RUN_HEADER_BYTES)),
+        "status": status,
+        "exit": exit_code,
+        "submit": str(submit_ms),
+        "start": str(begin_ms),
+    }
+    if complete_ms is not None:
+        row["complete"] = str(complete_ms)
+        row["duration"] = str(max(complete_ms - submit_ms, 0))
+        row["realtime"] = str(max(complete_ms - begin_ms, 0))
+    trace_text = _read_text(os.path.join(path, ".command.trace"))
+    if trace_text:
+        row.update(parse_command_trace(trace_text))
+    return row
+
+
+def _scan_prefix(prefix_dir: str) -> tuple[int, int, list[dict[str, str]]]:
+    """Scan one `work/xx/` directory: (task dirs, not started, rows)."""
+    rows: list[dict[str, str]] = []
+    dirs = not_started = 0
+    try:
+        entries = list(os.scandir(prefix_dir))
+    except (FileNotFoundError, NotADirectoryError):
+        return 0, 0, rows
+    for entry in entries:
+        if not entry.is_dir(follow_symlinks=False):
+            continue
+        dirs += 1
+        row = read_task_dir(entry.path)
+        if row is None:
+            not_started += 1
+        else:
+            rows.append(row)
+    return dirs, not_started, rows
+
+
+def _prefix_dirs(work_dir: str) -> list[str]:
+    root = Path(work_dir)
+    if not root.is_dir():
+        raise FileNotFoundError(f"Work directory not found: {work_dir}")
+    return sorted(
+        entry.path for entry in os.scandir(root)
+        if len(entry.name) == 2 and entry.is_dir(follow_symlinks=False)
+        and all(c in "0123456789abcdef" for c in entry.name)
+    )
+
+
+def iter_workdir_rows(
+    work_dir: str, workers: int = DEFAULT_SCAN_WORKERS, stats: dict[str, int] | None = None,
+) -> Iterator[dict[str, str]]:
+    """Yield reconstructed trace rows as each hash-prefix directory finishes.
+
+    Row order is not deterministic.  If ``stats`` is given it receives
+    ``task_dirs`` and ``not_started`` counts.
+    """
+    prefixes = _prefix_dirs(work_dir)
+    counts = stats if stats is not None else {}
+    counts.setdefault("task_dirs", 0)
+    counts.setdefault("not_started", 0)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for future in as_completed([pool.submit(_scan_prefix, p) for p in prefixes]):
+            dirs, not_started, rows = future.result()
+            counts["task_dirs"] += dirs
+            counts["not_started"] += not_started
+            yield from rows
+
+
+def rebuild_trace(
+    work_dir: str, workers: int = DEFAULT_SCAN_WORKERS, out: str | None = None,
+) -> WorkdirScan:
+    """Summarise a run from its work directory, optionally writing a trace.txt."""
+    stats: dict[str, int] = {}
+    acc = TraceAccumulator()
+    kept: list[dict[str, str]] | None = [] if out else None
+    unfinished = 0
+    try:
+        for row in iter_workdir_rows(work_dir, workers, stats):
+            acc.add_row(row)
+            unfinished += row["status"] == "ABORTED"
+            if kept is not None:
+                kept.append(row)
+    except FileNotFoundError as exc:
+        return WorkdirScan(work_dir=work_dir, task_dirs=0, rows=0, not_started=0, unfinished=0,
+                           warnings=[str(exc)])
+
+    warnings: list[str] = []
+    if unfinished:
+        warnings.append(f"{unfinished} task(s) started but have no exit code — reported as ABORTED")
+    if kept is not None:
+        write_trace(kept, out)
+    return WorkdirScan(
+        work_dir=work_dir,
+        task_dirs=stats["task_dirs"],
+        rows=acc.total_tasks,
+        not_started=stats["not_started"],
+        unfinished=unfinished,
+        summary=acc.to_summary(work_dir),
+        warnings=warnings,
+    )
+
+
+def write_trace(rows: list[dict[str, str]], out: str) -> None:
+    """Write rows as a tab-separated trace.txt, ordered by submit time."""
+    p = Path(out)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    rows = sorted(rows, key=lambda r: (int(r.get("submit") or 0), r.get("hash", "")))
+    with p.open("w", encoding="utf-8", newline="") as fh:
+        writer = csv.DictWriter(fh, fieldnames=TRACE_COLUMNS, delimiter="\t",
+                                restval="-", extrasaction="ignore", lineterminator="\n")
+        writer.writeheader()
+        for task_id, row in enumerate(rows, start=1):
+            writer.writerow({**row, "task_id": str(task_id)})
@@ -1,4 +1,12 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+
+@pytest.fixture(autouse=True)
+def _isolated_hash_cache(tmp_path, monkeypatch):
+    # Keep the persistent file-hash cache out of the real home directory.
+    monkeypatch.setenv("HELIXSH_HASH_CACHE", str(tmp_path / "hash_cache.sqlite"))
@@ -6,3 +6,46 @@ def test_summarize_cache_with_invalidations():
     assert r.cached_percent == 83
     assert r.invalidated_processes == ("ALIGN_READS",)
     assert "Pin inputs" in r.recommendation
+
+
+def test_summarize_cache_from_traces_finds_invalidated(tmp_path):
+    from helixsh.cache import summarize_cache_from_traces
+
+    header = "task_id\thash\tname\tstatus\n"
+    run1 = tmp_path / "run1.txt"
+    run1.write_text(header + "".join([
+        "1\taa/000001\tFASTQC (S1)\tCOMPLETED\n",
+        "2\taa/000002\tALIGN (S1)\tCOMPLETED\n",
+        "3\taa/000003\tALIGN (S2)\tCOMPLETED\n",
+    ]), encoding="utf-8")
+    run2 = tmp_path / "run2.txt"
+    run2.write_text(header + "".join([
+        "1\taa/000001\tFASTQC (S1)\tCACHED\n",
+        "2\tbb/000002\tALIGN (S1)\tCOMPLETED\n",
+        "3\taa/000003\tALIGN (S2)\tCACHED\n",
+        "4\tcc/000004\tALIGN (S3)\tCOMPLETED\n",
+    ]), encoding="utf-8")
+
+    r = summarize_cache_from_traces(str(run2), str(run1))
+    assert (r.total_tasks, r.cached_tasks, r.new_tasks) == (4, 2, 1)
+    assert r.report.cached_percent == 50
+    assert r.report.invalidated_processes == ("ALIGN",)
+    align = next(p for p in r.processes if p.process == "ALIGN")
+    assert (align.total, align.cached, align.invalidated) == (3, 1, 1)
+
+
+def test_cache_report_names_the_nf_core_process_that_broke(tmp_path):
+    from helixsh.cache import summarize_cache_from_traces
+
+    header = "task_id\thash\tname\tstatus\n"
+    qc, star = "NFCORE_RNASEQ:RNASEQ:FASTQC", "NFCORE_RNASEQ:RNASEQ:ALIGN_STAR:STAR_ALIGN"
+    run1 = tmp_path / "run1.txt"
+    run1.write_text(header + f"1\taa/000001\t{qc} (S1)\tCOMPLETED\n2\taa/000002\t{star} (S1)\tCOMPLETED\n",
+                    encoding="utf-8")
+    run2 = tmp_path / "run2.txt"
+    run2.write_text(header + f"1\taa/000001\t{qc} (S1)\tCACHED\n2\tbb/000002\t{star} (S1)\tCOMPLETED\n",
+                    encoding="utf-8")
+
+    r = summarize_cache_from_traces(str(run2), str(run1))
+    assert r.report.invalidated_processes == (star,)
+    assert {p.process for p in r.processes} == {qc, star}
@@ -11,3 +11,27 @@ def test_auditor_can_doctor(capsys):
     rc = cli.main(["--role", "auditor", "doctor"])
     assert rc == 0
     assert "nextflow" in capsys.readouterr().out
+
+
+def test_auditor_cannot_write_trace_config(tmp_path, capsys):
+    trace = tmp_path / "trace.txt"
+    trace.write_text("task_id\tname\tstatus\trealtime\t%cpu\tpeak_rss\n1\tA\tCOMPLETED\t1m\t100\t1 GB\n", encoding="utf-8")
+    out = tmp_path / "io.config"
+    for argv in (["trace-io", "--file", str(trace), "--config-out", str(out)],
+                 ["trace-rightsize", "--file", str(trace), "--out", str(out)],
+                 ["trace-timeline", "--file", str(trace), "--out", str(tmp_path / "t.csv")],
+                 ["trace-summary", "--file", str(trace), "--cache"]):
+        assert cli.main(["--role", "auditor", *argv]) == 2
+        assert "write files" in capsys.readouterr().err
+    assert not out.exists() and not list(tmp_path.glob("*.hxcol"))
+    assert cli.main(["--role", "auditor", "trace-rightsize", "--file", str(trace)]) == 0
+
+
+def test_auditor_cannot_update_fingerprint_manifest(tmp_path, capsys):
+    reads = tmp_path / "r1.fq"
+    reads.write_text("@r\nACGT\n+\nIIII\n", encoding="utf-8")
+    manifest = tmp_path / "fingerprints.json"
+    assert cli.main(["--role", "auditor", "preflight", "--input", str(reads), "--fingerprints", str(manifest)]) == 2
+    assert "write files" in capsys.readouterr().err
+    assert not manifest.exists()
+    assert cli.main(["--role", "auditor", "preflight", "--input", str(reads)]) == 0
@@ -36,3 +36,30 @@ def test_preflight_fail_on_workflow_violation(tmp_path, capsys):
     assert rc == 2
     payload = json.loads(capsys.readouterr().out)
     assert payload["checks"]["workflow"]["ok"] is False
+
+
+def test_preflight_fingerprints_inputs(tmp_path, capsys):
+    reads = tmp_path / "r1.fastq.gz"
+    reads.write_bytes(b"@r1\nACGT\n+\nIIII\n")
+    manifest = tmp_path / "fingerprints.json"
+    args = ["preflight", "--input", str(reads), "--fingerprints", str(manifest)]
+
+    assert cli.main(args) == 0
+    inputs = json.loads(capsys.readouterr().out)["checks"]["inputs"]
+    assert inputs["new"] == [str(reads)] and inputs["scheme"] == "sampled-v1"
+
+    assert cli.main(args) == 0
+    assert json.loads(capsys.readouterr().out)["checks"]["inputs"]["unchanged"] == [str(reads)]
+
+    assert cli.main(["preflight", "--input", str(tmp_path / "missing.bam")]) == 2
+    assert json.loads(capsys.readouterr().out)["checks"]["inputs"]["missing"]
+
+
+def test_preflight_malformed_fingerprint_manifest(tmp_path, capsys):
+    reads = tmp_path / "r1.fq"
+    reads.write_bytes(b"ACGT")
+    manifest = tmp_path / "fingerprints.json"
+    manifest.write_text("[]", encoding="utf-8")
+    rc = cli.main(["preflight", "--input", str(reads), "--fingerprints", str(manifest)])
+    assert rc == 2
+    assert "fingerprints.json" in capsys.readouterr().err
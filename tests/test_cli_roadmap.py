@@ -19,6 +19,23 @@ def test_cache_report_command(capsys):
     assert out["cached_percent"] == 80
 
 
+def test_cache_report_from_trace(tmp_path, capsys):
+    trace = tmp_path / "trace.txt"
+    trace.write_text("task_id\thash\tname\tstatus\n1\taa/1\tA\tCACHED\n2\tbb/2\tB\tCOMPLETED\n",
+                     encoding="utf-8")
+    rc = cli.main(["cache-report", "--trace", str(trace)])
+    assert rc == 0
+    out = json.loads(capsys.readouterr().out)
+    assert out["cached_percent"] == 50
+    assert out["cached_tasks"] == 1
+
+
+def test_cache_report_requires_counts_or_trace(capsys):
+    rc = cli.main(["cache-report", "--total", "10"])
+    assert rc == 2
+    assert "--trace" in capsys.readouterr().err
+
+
 def test_diagnose_command(capsys):
     rc = cli.main(["diagnose", "--process", "QUANTIFY", "--exit-code", "137", "--memory-gb", "4"])
     assert rc == 2
@@ -0,0 +1,76 @@
+import json
+
+from helixsh import cli
+from helixsh.contention import detect_contention, thread_flag_for
+
+HEADER = "task_id\tname\tstatus\trealtime\t%cpu\tcpus\tvol_ctxt\tinv_ctxt\n"
+
+
+def _trace(tmp_path):
+    rows = []
+    for i in range(10):
+        # bwa hard-coded to 16 threads under cpus 4
+        rows.append(f"{i}\tBWA_MEM (s{i})\tCOMPLETED\t1h\t1450\t4\t1000\t9000\n")
+        # samtools given 8 cpus but run single-threaded
+        rows.append(f"{100 + i}\tSAMTOOLS_SORT (s{i})\tCOMPLETED\t30m\t98\t8\t5000\t100\n")
+        rows.append(f"{200 + i}\tFASTQC (s{i})\tCOMPLETED\t10m\t190\t2\t300\t20\n")
+    trace = tmp_path / "trace.txt"
+    trace.write_text(HEADER + "".join(rows), encoding="utf-8")
+    return str(trace)
+
+
+def test_thread_flag_for():
+    assert thread_flag_for("NFCORE_RNASEQ:ALIGN:SAMTOOLS_SORT (s1)") == "-@ ${task.cpus - 1}"
+    assert thread_flag_for("STAR_ALIGN") == "--runThreadN ${task.cpus}"
+    assert thread_flag_for("MULTIQC") == ""
+
+
+def test_detect_contention(tmp_path):
+    report = detect_contention(_trace(tmp_path))
+    assert report.tasks == 30
+    assert report.oversubscribed_processes == ["BWA_MEM"]
+    assert report.underused_processes == ["SAMTOOLS_SORT"]
+    by_name = {p.process: p for p in report.processes}
+
+    bwa = by_name["BWA_MEM"]
+    assert bwa.oversubscribed_tasks == 10
+    assert bwa.suggested_cpus == 15
+    assert bwa.involuntary_ctxt_share == 0.9
+    assert "-t ${task.cpus}" in bwa.recommendation and "preemptions" in bwa.recommendation
+    assert 100 < bwa.excess_core_hours < 110
+
+    sam = by_name["SAMTOOLS_SORT"]
+    assert sam.suggested_cpus == 1
+    assert "lower cpus to 1" in sam.recommendation
+    assert by_name["FASTQC"].verdict == "ok"
+
+
+def test_detect_contention_needs_cpus(tmp_path):
+    trace = tmp_path / "trace.txt"
+    trace.write_text("task_id\tname\tstatus\trealtime\t%cpu\n1\tA\tCOMPLETED\t1m\t100\n", encoding="utf-8")
+    report = detect_contention(str(trace))
+    assert report.tasks == 0
+    assert any("cpus" in w for w in report.warnings)
+
+
+def test_trace_contention_cli(tmp_path, capsys):
+    assert cli.main(["trace-contention", "--file", _trace(tmp_path)]) == 0
+    data = json.loads(capsys.readouterr().out)
+    assert data["processes"][0]["verdict"] != "ok"
+
+
+def test_detect_contention_separates_nested_nf_core_processes(tmp_path):
+    prefix = "NFCORE_SAREK:SAREK:"
+    trace = tmp_path / "trace.txt"
+    text = open(_trace(tmp_path), encoding="utf-8").read()
+    trace.write_text(
+        text.replace("\tBWA_MEM (", f"\t{prefix}FASTQ_ALIGN_BWAMEM:BWA_MEM (")
+        .replace("\tSAMTOOLS_SORT (", f"\t{prefix}BAM_SORT:SAMTOOLS_SORT ("),
+        encoding="utf-8",
+    )
+    report = detect_contention(str(trace))
+    by_name = {p.process: p for p in report.processes}
+    bwa = by_name[prefix + "FASTQ_ALIGN_BWAMEM:BWA_MEM"]
+    sort = by_name[prefix + "BAM_SORT:SAMTOOLS_SORT"]
+    assert (bwa.verdict, bwa.thread_flag) == ("oversubscribed", "-t ${task.cpus}")
+    assert (sort.verdict, sort.thread_flag) == ("underused", "-@ ${task.cpus - 1}")
@@ -0,0 +1,45 @@
+import json
+
+from helixsh import cli
+from helixsh.critical_path import analyze_critical_path
+
+# FASTQC runs alongside the ALIGN -> MERGE chain but never gates it.
+DAG_TRACE = """\
+task_id\tname\tstatus\tsubmit\tstart\tcomplete\tduration\trealtime\t%cpu\tpeak_rss
+1\tALIGN (S1)\tCOMPLETED\t2026-01-01 00:00:00.000\t2026-01-01 00:00:10.000\t2026-01-01 00:05:00.000\t5m\t4m 50s\t400\t4 GB
+2\tALIGN (S2)\tCOMPLETED\t2026-01-01 00:00:00.000\t2026-01-01 00:00:05.000\t2026-01-01 00:03:00.000\t3m\t2m 55s\t400\t4 GB
+3\tFASTQC (S1)\tCOMPLETED\t2026-01-01 00:00:00.000\t2026-01-01 00:00:01.000\t2026-01-01 00:01:00.000\t1m\t59s\t100\t1 GB
+4\tMERGE\tCOMPLETED\t2026-01-01 00:05:02.000\t2026-01-01 00:05:30.000\t2026-01-01 00:07:30.000\t2m 28s\t2m\t100\t2 GB
+"""
+
+
+def test_critical_path_follows_gating_chain(tmp_path):
+    trace = tmp_path / "trace.txt"
+    trace.write_text(DAG_TRACE, encoding="utf-8")
+    report = analyze_critical_path(str(trace))
+    assert [t.name for t in report.path] == ["ALIGN (S1)", "MERGE"]
+    assert report.makespan_s == 450
+    assert report.sum_task_walltime_s > report.makespan_s
+    assert report.path_run_s + report.path_wait_s == report.makespan_s
+    assert report.processes[0].process == "ALIGN"
+    assert report.processes[0].saving_if_2x_s == 145
+
+
+def test_trace_critical_path_cli(tmp_path, capsys):
+    trace = tmp_path / "trace.txt"
+    trace.write_text(DAG_TRACE, encoding="utf-8")
+    rc = cli.main(["trace-critical-path", "--file", str(trace), "--top", "1"])
+    assert rc == 0
+    data = json.loads(capsys.readouterr().out)
+    assert len(data["processes"]) == 1
+    assert data["path"][-1]["process"] == "MERGE"
+
+
+def test_critical_path_ranks_nf_core_processes(tmp_path):
+    qualified = DAG_TRACE.replace("\tALIGN (", "\tNFCORE_X:X:ALIGN_READS:ALIGN (").replace(
+        "\tFASTQC (", "\tNFCORE_X:X:FASTQC (").replace("\tMERGE\t", "\tNFCORE_X:X:MERGE\t")
+    trace = tmp_path / "trace.txt"
+    trace.write_text(qualified, encoding="utf-8")
+    report = analyze_critical_path(str(trace))
+    assert [p.process for p in report.processes] == ["NFCORE_X:X:ALIGN_READS:ALIGN", "NFCORE_X:X:MERGE"]
+    assert report.path[-1].process == "NFCORE_X:X:MERGE"
@@ -1,4 +1,4 @@
-from helixsh.diagnostics import diagnose_failure
+from helixsh.diagnostics import diagnose_failure, is_out_of_memory
 
 
 def test_diagnose_oom_exit_137():
@@ -10,3 +10,10 @@ def test_diagnose_oom_exit_137():
 def test_diagnose_success():
     d = diagnose_failure("ANY", 0)
     assert d.likely_cause == "No failure"
+
+
+def test_is_out_of_memory_accepts_trace_strings():
+    assert is_out_of_memory(137)
+    assert is_out_of_memory(" 137 ")
+    assert not is_out_of_memory("1")
+    assert not is_out_of_memory("-")
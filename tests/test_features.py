@@ -231,6 +231,8 @@ def test_trace_summary_aggregates_processes(tmp_path, capsys):
     star = next(p for p in data["processes"] if p["process"] == "STAR_ALIGN")
     assert star["task_count"] == 2
     assert star["max_peak_rss_mb"] > 0
+    rss = star["percentiles"]["peak_rss_mb"]
+    assert 12 * 1024 <= rss["p50"] <= rss["p99"] <= 14 * 1024
 
 
 def test_trace_summary_missing_file(tmp_path, capsys):
@@ -241,12 +243,150 @@ def test_trace_summary_missing_file(tmp_path, capsys):
     assert data["warnings"]
 
 
+def test_trace_summary_reads_gzip(tmp_path, capsys):
+    import gzip
+    trace = tmp_path / "trace.txt.gz"
+    with gzip.open(trace, "wt", encoding="utf-8") as fh:
+        fh.write(TRACE_CONTENT)
+    cli.main(["trace-summary", "--file", str(trace)])
+    data = json.loads(capsys.readouterr().out)
+    assert data["total_tasks"] == 4
+    assert data["failed_tasks"] == 1
+
+
+def test_trace_accumulators_merge_like_single_pass(tmp_path):
+    from helixsh.trace import aggregate_trace, parse_trace
+    header, *rows = TRACE_CONTENT.splitlines(keepends=True)
+    part_a = tmp_path / "a.txt"
+    part_b = tmp_path / "b.txt"
+    part_a.write_text(header + "".join(rows[:2]), encoding="utf-8")
+    part_b.write_text(header + "".join(rows[2:]), encoding="utf-8")
+    whole = tmp_path / "trace.txt"
+    whole.write_text(TRACE_CONTENT, encoding="utf-8")
+
+    merged = aggregate_trace(str(part_a))
+    merged.merge(aggregate_trace(str(part_b)))
+    assert merged.to_summary(str(whole)) == parse_trace(str(whole))
+
+
+def test_trace_follower_handles_partial_lines_and_truncation(tmp_path):
+    from helixsh.trace import TraceFollower
+    header, *rows = TRACE_CONTENT.splitlines(keepends=True)
+    trace = tmp_path / "trace.txt"
+    trace.write_text(header + rows[0] + rows[1][:10], encoding="utf-8")
+
+    follower = TraceFollower(str(trace))
+    assert follower.poll() == 1
+    with trace.open("a", encoding="utf-8") as fh:
+        fh.write(rows[1][10:] + rows[2])
+    assert follower.poll() == 2
+    assert follower.poll() == 0
+    star = next(p for p in follower.summary().processes if p.process == "STAR_ALIGN")
+    assert star.task_count == 2
+
+    trace.write_text(header + rows[3], encoding="utf-8")
+    assert follower.poll() == 1
+    assert follower.rotations == 1
+    assert follower.summary().total_tasks == 1
+
+
+def test_trace_summary_follow_cli(tmp_path, capsys):
+    trace = tmp_path / "trace.txt"
+    trace.write_text(TRACE_CONTENT, encoding="utf-8")
+    rc = cli.main(["trace-summary", "--file", str(trace), "--follow",
+                   "--interval", "0", "--max-polls", "2"])
+    assert rc == 2
+    lines = capsys.readouterr().out.strip().splitlines()
+    assert len(lines) == 1
+    data = json.loads(lines[0])
+    assert data["new_rows"] == 4
+    assert data["total_tasks"] == 4
+
+
+def test_trace_follower_invalid_bytes_and_compressed(tmp_path):
+    import gzip
+
+    import pytest
+    from helixsh.trace import TraceFollower
+    header, *rows = TRACE_CONTENT.splitlines(keepends=True)
+    trace = tmp_path / "trace.txt"
+    trace.write_bytes(header.encode() + rows[0].encode().replace(b"STAR_ALIGN", b"STAR_\xff"))
+    assert TraceFollower(str(trace)).poll() == 1
+
+    gz = tmp_path / "trace.txt.gz"
+    gz.write_bytes(gzip.compress(TRACE_CONTENT.encode()))
+    with pytest.raises(ValueError, match="compressed"):
+        TraceFollower(str(gz)).poll()
+
+
+def test_trace_summary_follow_rejects_dir_and_cache(tmp_path, capsys):
+    import pytest
+    for extra in (["--dir", str(tmp_path)], ["--file", "t.txt", "--cache"], ["--file", "t.txt", "--cache-dir", "c"]):
+        with pytest.raises(SystemExit) as exc:
+            cli.main(["trace-summary", "--follow", *extra])
+        assert exc.value.code == 2
+    assert "--follow" in capsys.readouterr().err
+
+
+def test_trace_columnar_cache_reused_and_invalidated(tmp_path):
+    import os
+    from helixsh.trace import columnar_cache_path, load_columnar_trace, parse_trace
+    trace = tmp_path / "trace.txt"
+    trace.write_text(TRACE_CONTENT, encoding="utf-8")
+
+    assert parse_trace(str(trace), use_cache=True) == parse_trace(str(trace))
+    sidecar = columnar_cache_path(str(trace))
+    assert sidecar.exists()
+    with load_columnar_trace(str(trace)) as cols:
+        assert cols.memory_mapped
+        assert len(cols) == 4
+        assert cols.paths[cols.columns["path_id"][2]] == "SALMON_QUANT"
+
+    header, *rows = TRACE_CONTENT.splitlines(keepends=True)
+    trace.write_text(header + rows[0], encoding="utf-8")
+    os.utime(trace, ns=(0, 1))
+    assert parse_trace(str(trace), use_cache=True).total_tasks == 1
+
+
+def test_trace_summary_cache_dir_cli(tmp_path, capsys):
+    trace = tmp_path / "trace.txt"
+    trace.write_text(TRACE_CONTENT, encoding="utf-8")
+    cache_dir = tmp_path / "cols"
+    cli.main(["trace-summary", "--file", str(trace), "--cache-dir", str(cache_dir)])
+    data = json.loads(capsys.readouterr().out)
+    assert data["total_tasks"] == 4
+    assert len(list(cache_dir.glob("*.hxcol"))) == 1
+
+
+def test_trace_summary_dir_combines_runs(tmp_path, capsys):
+    for run in ("run1", "run2", "run3"):
+        (tmp_path / run / "pipeline_info").mkdir(parents=True)
+        (tmp_path / run / "pipeline_info" / "execution_trace.txt").write_text(TRACE_CONTENT, encoding="utf-8")
+    rc = cli.main(["trace-summary", "--dir", str(tmp_path), "--workers", "2"])
+    assert rc == 2
+    data = json.loads(capsys.readouterr().out)
+    assert data["run_count"] == 3
+    assert data["combined"]["total_tasks"] == 12
+    star = next(p for p in data["combined"]["processes"] if p["process"] == "STAR_ALIGN")
+    assert star["task_count"] == 6
+    assert all(r["total_tasks"] == 4 for r in data["runs"])
+
+
+def test_trace_summary_dir_no_matches(tmp_path, capsys):
+    rc = cli.main(["trace-summary", "--dir", str(tmp_path)])
+    assert rc == 2
+    data = json.loads(capsys.readouterr().out)
+    assert data["run_count"] == 0
+    assert data["combined"]["warnings"]
+
+
 def test_trace_duration_parsing():
     from helixsh.trace import _parse_duration
     assert _parse_duration("2m 30s") == 150_000
     assert _parse_duration("1h 30m") == 5_400_000
     assert _parse_duration("500 ms") == 500
     assert _parse_duration("-") == 0
+    assert _parse_duration("90000") == 90_000   # raw milliseconds (trace.raw = true)
 
 
 def test_trace_memory_parsing():
@@ -255,6 +395,7 @@ def test_trace_memory_parsing():
     assert _parse_memory("512 MB") == 512.0
     assert _parse_memory("2 KB") == pytest.approx(2 / 1024, rel=1e-3)
     assert _parse_memory("-") == 0.0
+    assert _parse_memory("1048576") == 1.0   # raw byte counts (trace.raw = true)
 
 
 # ─────────────────────────── cloud_cost ──────────────────────────────────────
@@ -564,3 +705,90 @@ def test_rbac_analyst_can_tower_submit():
 def test_rbac_auditor_cannot_snakemake_import():
     from helixsh.rbac import check_access
     assert check_access("auditor", "snakemake-import").allowed is False
+
+
+def test_trace_summary_truncated_gzip_keeps_partial_summary(tmp_path, capsys):
+    import gzip
+    import random
+    header, *rows = TRACE_CONTENT.splitlines(keepends=True)
+    rng = random.Random(7)
+    body = "".join(rows[0].replace("(S1)", f"(S{rng.getrandbits(64)})") for _ in range(5000))
+    data = gzip.compress((header + body).encode())
+    trace = tmp_path / "trace.txt.gz"
+    trace.write_bytes(data[: len(data) // 2])
+
+    rc = cli.main(["trace-summary", "--file", str(trace)])
+    assert rc == 0
+    summary = json.loads(capsys.readouterr().out)
+    assert 0 < summary["total_tasks"] < 5000
+    assert any("only rows before the error" in w for w in summary["warnings"])
+
+
+def test_trace_summary_survives_stray_bytes(tmp_path, capsys):
+    trace = tmp_path / "trace.txt"
+    trace.write_bytes(TRACE_CONTENT.encode().replace(b"SALMON_QUANT", b"SALMON_\xffQUANT"))
+    cli.main(["trace-summary", "--file", str(trace)])
+    data = json.loads(capsys.readouterr().out)
+    assert data["total_tasks"] == 4
+    assert any(p["process"] == "STAR_ALIGN" and p["task_count"] == 2 for p in data["processes"])
+
+
+def test_trace_summary_dir_survives_corrupt_run(tmp_path, capsys, monkeypatch):
+    from helixsh import trace as trace_mod
+    for run in ("run1", "run2"):
+        (tmp_path / run).mkdir()
+    (tmp_path / "run1" / "trace.txt").write_text(TRACE_CONTENT, encoding="utf-8")
+    # Valid gzip header, undecodable deflate stream.
+    (tmp_path / "run2" / "trace.txt.gz").write_bytes(b"\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\x03" + b"\xff" * 64)
+    rc = cli.main(["trace-summary", "--dir", str(tmp_path), "--workers", "2"])
+    assert rc == 2   # MULTIQC failed in run1
+    data = json.loads(capsys.readouterr().out)
+    assert data["combined"]["total_tasks"] == 4
+    bad = next(r for r in data["runs"] if r["trace_file"].endswith(".gz"))
+    assert bad["total_tasks"] == 0 and bad["warnings"]
+
+    def explode(path, **_):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(trace_mod, "aggregate_trace", explode)
+    (acc,) = trace_mod.aggregate_traces([str(tmp_path / "run1" / "trace.txt")], workers=1)
+    assert acc.total_tasks == 0 and "boom" in acc.warnings[0]
+
+
+def test_trace_follower_detects_overwrite_on_same_inode(tmp_path):
+    from helixsh.trace import TraceFollower
+    header, *rows = TRACE_CONTENT.splitlines(keepends=True)
+    trace = tmp_path / "trace.txt"
+    trace.write_text(header + "".join(rows[:3]), encoding="utf-8")
+    follower = TraceFollower(str(trace))
+    assert follower.poll() == 3
+
+    # trace.overwrite = true: same inode, new run's rows, file grows past the old offset.
+    rerun = [r.replace("ab/123", "zz/999").replace("cd/456", "yy/888") for r in rows] * 2
+    with trace.open("r+", encoding="utf-8") as fh:
+        fh.truncate(0)
+        fh.write(header + "".join(rerun))
+    assert follower.poll() == 8
+    assert follower.rotations == 1
+    assert follower.summary().total_tasks == 8
+    assert follower.poll() == 0 and follower.rotations == 1
+
+
+def test_trace_columnar_cache_keeps_paths_and_timestamps(tmp_path):
+    from helixsh.trace import iter_trace_tasks, load_columnar_trace, parse_trace
+    star = "NFCORE_RNASEQ:RNASEQ:ALIGN_STAR:STAR_ALIGN"
+    trace = tmp_path / "trace.txt"
+    trace.write_text(
+        "task_id\tname\tstatus\tsubmit\tstart\tcomplete\tduration\trealtime\t%cpu\tpeak_rss\n"
+        f"1\t{star} (S1)\tCOMPLETED\t2026-01-01 00:00:00.000\t2026-01-01 00:00:10.000\t"
+        "2026-01-01 00:05:00.000\t5m\t4m 50s\t400\t4 GB\n",
+        encoding="utf-8",
+    )
+    assert parse_trace(str(trace), use_cache=True) == parse_trace(str(trace))
+    with load_columnar_trace(str(trace)) as cols:
+        (cached,) = cols.iter_tasks()
+    (parsed,) = iter_trace_tasks(str(trace))
+    assert (cached.name, cached.process) == (star, "NFCORE_RNASEQ")
+    assert (cached.submit_ms, cached.start_ms, cached.complete_ms) == (
+        parsed.submit_ms, parsed.start_ms, parsed.complete_ms)
+    assert cached.complete_ms - cached.start_ms == 290_000
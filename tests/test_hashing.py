@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+
+import pytest
+
+from helixsh import cli, hashing
+from helixsh.hashing import HashCache, default_cache_path, file_digest
+from helixsh.lifecycle import hash_inputs, sha256_file
+from helixsh.ref_genome import sha256_file as ref_sha256_file
+
+
+def _old_file(path, data: bytes):
+    path.write_bytes(data)
+    # Backdate so the file is outside the racy window and gets cached.
+    os.utime(path, ns=(1_600_000_000_000_000_000, 1_600_000_000_000_000_000))
+    return path
+
+
+def _count_reads(monkeypatch):
+    calls = []
+    real = hashing.hash_file
+
+    def counting(path, algorithm="sha256"):
+        calls.append(str(path))
+        return real(path, algorithm)
+
+    monkeypatch.setattr(hashing, "hash_file", counting)
+    return calls
+
+
+def test_cache_skips_rehash_until_signature_changes(tmp_path, monkeypatch):
+    f = _old_file(tmp_path / "reads.fq", b"ACGT" * 1000)
+    calls = _count_reads(monkeypatch)
+
+    expected = hashlib.sha256(b"ACGT" * 1000).hexdigest()
+    assert sha256_file(str(f)) == expected
+    assert sha256_file(str(f)) == expected
+    assert ref_sha256_file(f) == expected  # shared with ref_genome
+    assert len(calls) == 1
+
+    _old_file(f, b"TTTT" * 1001)
+    assert sha256_file(str(f)) == hashlib.sha256(b"TTTT" * 1001).hexdigest()
+    assert len(calls) == 2
+
+
+def test_verify_forces_rehash_and_refreshes_cache(tmp_path, monkeypatch):
+    f = _old_file(tmp_path / "a.bam", b"x" * 10)
+    calls = _count_reads(monkeypatch)
+    first = hash_inputs([str(f)])
+    assert hash_inputs([str(f)], verify=True) == first
+    assert len(calls) == 2
+    assert hash_inputs([str(f)]) == first
+    assert len(calls) == 2
+
+
+def test_recently_modified_files_are_not_cached(tmp_path, monkeypatch):
+    f = tmp_path / "fresh.fq"
+    f.write_bytes(b"ACGT")
+    calls = _count_reads(monkeypatch)
+    file_digest(f)
+    file_digest(f)
+    assert len(calls) == 2
+
+
+def test_cache_disabled_or_unwritable_falls_back(tmp_path, monkeypatch):
+    f = _old_file(tmp_path / "a.fq", b"A")
+    monkeypatch.setenv("HELIXSH_HASH_CACHE", "off")
+    assert default_cache_path() is None
+    assert file_digest(f) == hashlib.sha256(b"A").hexdigest()
+
+    blocker = tmp_path / "not_a_dir"
+    blocker.write_text("", encoding="utf-8")
+    with HashCache(blocker / "cache.sqlite") as cache:
+        assert cache.digest(f) == hashlib.sha256(b"A").hexdigest()
+
+
+def _legacy_hash_inputs(paths):
+    # The pre-cache, single-stream implementation; results must not change.
+    from pathlib import Path
+
+    digest = hashlib.sha256()
+    for file_path in sorted(paths):
+        p = Path(file_path)
+        digest.update(str(p.resolve()).encode("utf-8"))
+        digest.update(hashlib.sha256(p.read_bytes()).hexdigest().encode("utf-8"))
+    return digest.hexdigest()
+
+
+def test_parallel_hash_inputs_matches_serial_digest(tmp_path):
+    paths = [str(_old_file(tmp_path / f"s{i}.fq", bytes([i]) * (1000 * i + 1))) for i in range(12)]
+    expected = _legacy_hash_inputs(paths)
+    assert hash_inputs(paths, workers=4) == expected
+    assert hash_inputs(list(reversed(paths)), workers=1, verify=True) == expected
+
+
+def test_mmap_path_matches_streaming(tmp_path, monkeypatch):
+    f = tmp_path / "big.bam"
+    data = os.urandom(3 * 1024 * 1024 + 17)
+    f.write_bytes(data)
+    monkeypatch.setattr(hashing, "MMAP_MIN_SIZE", 1024)
+    monkeypatch.setattr(hashing, "READ_SIZE", 1024 * 1024)
+    assert hashing.hash_file(f) == hashlib.sha256(data).hexdigest()
+
+
+def test_blake2b_mode_is_labelled(tmp_path):
+    f = _old_file(tmp_path / "a.fq", b"ACGT")
+    digests = hashing.hash_files([f], "blake2b")
+    assert digests[str(f)] == hashlib.blake2b(b"ACGT").hexdigest()
+    combined = hash_inputs([str(f)], algorithm="blake2b")
+    assert combined.startswith("blake2b:") and combined != hash_inputs([str(f)])
+    with pytest.raises(ValueError):
+        hash_inputs([str(f)], algorithm="md5")
+
+
+def test_cli_execution_start_blake2b_inputs(tmp_path, capsys):
+    f = _old_file(tmp_path / "r1.fq", b"ACGT")
+    db = tmp_path / "db.sqlite"
+    rc = cli.main(["--role", "analyst", "execution-start", "--command", "nextflow run x", "--db", str(db),
+                   "--input", str(f), "--hash-algorithm", "blake2b", "--hash-workers", "2"])
+    assert rc == 0
+    ctx = json.loads(capsys.readouterr().out)["execution_context"]
+    assert ctx["input_hash"].startswith("blake2b:")
+    rc = cli.main(["--role", "analyst", "audit-show", "--execution-id", ctx["execution_id"], "--db", str(db)])
+    assert rc == 0
+    bundle = json.loads(capsys.readouterr().out)
+    assert bundle["inputs"][0]["sha256"] == "blake2b:" + hashlib.blake2b(b"ACGT").hexdigest()
+
+
+def test_cli_execution_start_reads_each_input_once(tmp_path, capsys, monkeypatch):
+    monkeypatch.setenv(hashing.HASH_CACHE_ENV, "off")
+    files = [_old_file(tmp_path / f"r{i}.fq", b"ACGT" * (i + 1)) for i in range(3)]
+    reads = []
+    real_hash_file = hashing.hash_file
+
+    def counting_hash_file(path, algorithm="sha256"):
+        reads.append(path)
+        return real_hash_file(path, algorithm)
+
+    monkeypatch.setattr(hashing, "hash_file", counting_hash_file)
+    db = tmp_path / "db.sqlite"
+    argv = ["--role", "analyst", "execution-start", "--command", "nextflow run x", "--db", str(db)]
+    for f in files:
+        argv += ["--input", str(f)]
+    assert cli.main(argv) == 0
+    assert sorted(reads) == sorted(str(f) for f in files)
+    ctx = json.loads(capsys.readouterr().out)["execution_context"]
+    assert ctx["input_hash"] == hash_inputs([str(f) for f in files])
+    cli.main(["--role", "analyst", "audit-show", "--execution-id", ctx["execution_id"], "--db", str(db)])
+    bundle = json.loads(capsys.readouterr().out)
+    assert {i["sha256"] for i in bundle["inputs"]} == {hashlib.sha256(f.read_bytes()).hexdigest() for f in files}
@@ -0,0 +1,59 @@
+import json
+
+from helixsh import cli
+from helixsh.io_profile import profile_io
+
+IO_TRACE = """\
+task_id\tname\tstatus\trealtime\t%cpu\tcpus\trchar\twchar\tsyscr\tsyscw\tread_bytes\twrite_bytes
+1\tMARKDUP (S1)\tCOMPLETED\t100s\t90\t4\t20 GB\t10 GB\t200000\t100000\t18 GB\t10 GB
+2\tMARKDUP (S2)\tCOMPLETED\t100s\t110\t4\t20 GB\t10 GB\t200000\t100000\t18 GB\t10 GB
+3\tBWA_MEM (S1)\tCOMPLETED\t1000s\t780\t8\t30 GB\t20 GB\t300000\t200000\t30 GB\t20 GB
+"""
+
+
+def test_profile_io_flags_io_bound_process(tmp_path):
+    trace = tmp_path / "trace.txt"
+    trace.write_text(IO_TRACE, encoding="utf-8")
+    report = profile_io(str(trace))
+    assert report.tasks == 3
+    markdup = next(p for p in report.processes if p.process == "MARKDUP")
+    assert markdup.read_mb_s == 204.8
+    assert markdup.cpu_efficiency == 0.25
+    assert markdup.io_bound
+    assert report.io_bound_processes == ["MARKDUP"]
+    assert "withName: 'MARKDUP'" in report.to_nextflow_config()
+    assert report.total_read_gb == 70
+
+
+def test_profile_io_warns_without_io_columns(tmp_path):
+    trace = tmp_path / "trace.txt"
+    trace.write_text("task_id\tname\tstatus\n1\tA\tCOMPLETED\n", encoding="utf-8")
+    report = profile_io(str(trace))
+    assert not report.io_bound_processes
+    assert any("rchar" in w for w in report.warnings)
+
+
+def test_trace_io_cli_writes_config(tmp_path, capsys):
+    trace = tmp_path / "trace.txt"
+    trace.write_text(IO_TRACE, encoding="utf-8")
+    out = tmp_path / "io.config"
+    rc = cli.main(["trace-io", "--file", str(trace), "--config-out", str(out)])
+    assert rc == 0
+    data = json.loads(capsys.readouterr().out)
+    assert data["io_bound_processes"] == ["MARKDUP"]
+    assert "scratch = true" in out.read_text()
+
+
+def test_profile_io_keys_nf_core_processes_by_full_path(tmp_path):
+    prefix = "NFCORE_SAREK:SAREK:"
+    trace = tmp_path / "trace.txt"
+    trace.write_text(
+        IO_TRACE.replace("MARKDUP (", prefix + "BAM_MARKDUPLICATES:GATK4_MARKDUPLICATES (")
+        .replace("BWA_MEM (", prefix + "FASTQ_ALIGN_BWAMEM:BWA_MEM ("),
+        encoding="utf-8",
+    )
+    report = profile_io(str(trace))
+    markdup = prefix + "BAM_MARKDUPLICATES:GATK4_MARKDUPLICATES"
+    assert sorted(p.process for p in report.processes) == sorted([markdup, prefix + "FASTQ_ALIGN_BWAMEM:BWA_MEM"])
+    assert report.io_bound_processes == [markdup]
+    assert f"withName: '{markdup}'" in report.to_nextflow_config()
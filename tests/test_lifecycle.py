@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from helixsh.lifecycle import compare_fingerprints, fingerprint_file
+
+
+def test_fingerprint_samples_head_tail_and_blocks(tmp_path):
+    f = tmp_path / "big.bam"
+    data = bytearray(b"A" * (1024 * 1024))
+    f.write_bytes(data)
+    base = fingerprint_file(str(f), blocks=4, block_size=1024)
+    assert base.startswith("sampled-v1:b4x1024:1048576:")
+
+    # The tail is always sampled.
+    data[-1:] = b"T"
+    f.write_bytes(data)
+    assert fingerprint_file(str(f), blocks=4, block_size=1024) != base
+
+    # A byte between sampled blocks is invisible: not cryptographic.
+    data[-1:] = b"A"
+    data[100_000] = ord("G")
+    f.write_bytes(data)
+    assert fingerprint_file(str(f), blocks=4, block_size=1024) == base
+
+    # Size is always part of the fingerprint.
+    f.write_bytes(bytes(data) + b"A")
+    assert fingerprint_file(str(f), blocks=4, block_size=1024) != base
+
+
+def test_small_files_are_fingerprinted_whole(tmp_path):
+    f = tmp_path / "small.fq"
+    f.write_bytes(b"ACGT" * 100)
+    before = fingerprint_file(str(f), blocks=2, block_size=1024)
+    f.write_bytes(b"ACGT" * 50 + b"TGCA" + b"ACGT" * 49)
+    assert fingerprint_file(str(f), blocks=2, block_size=1024) != before
+    with pytest.raises(ValueError):
+        fingerprint_file(str(f), blocks=-1)
+
+
+def test_compare_fingerprints_against_manifest(tmp_path):
+    a, b = tmp_path / "a.fq", tmp_path / "b.fq"
+    a.write_bytes(b"AAAA")
+    b.write_bytes(b"CCCC")
+    manifest = tmp_path / "fp.json"
+
+    first = compare_fingerprints([str(a), str(b)], str(manifest))
+    assert first.new == [str(a), str(b)] and first.cryptographic is False
+
+    b.write_bytes(b"CCCCG")
+    second = compare_fingerprints([str(a), str(b), str(tmp_path / "gone.fq")], str(manifest))
+    assert second.unchanged == [str(a)]
+    assert second.changed == [str(b)]
+    assert second.missing == [str(tmp_path / "gone.fq")]
+    assert compare_fingerprints([str(b)], str(manifest)).unchanged == [str(b)]
+
+
+def test_fingerprints_with_other_sampling_are_not_comparable(tmp_path):
+    a, b = tmp_path / "a.fq", tmp_path / "b.fq"
+    a.write_bytes(b"AAAA")
+    b.write_bytes(b"CCCC")
+    manifest = tmp_path / "fp.json"
+    compare_fingerprints([str(a)], str(manifest))
+    data = json.loads(manifest.read_text())
+    data["fingerprints"][str(b.resolve())] = "sampled-v1:4:0123456789abcdef"   # pre-parameter format
+    manifest.write_text(json.dumps(data))
+
+    report = compare_fingerprints([str(a), str(b)], str(manifest), blocks=4)
+    assert report.not_comparable == [str(a), str(b)]
+    assert report.changed == [] and report.unchanged == []
+    assert compare_fingerprints([str(a), str(b)], str(manifest), blocks=4).unchanged == [str(a), str(b)]
+
+
+@pytest.mark.parametrize("content", ["{not json", "[1, 2]", '{"fingerprints": {"/a": 1}}', '{"fingerprints": []}'])
+def test_compare_fingerprints_rejects_malformed_manifest(tmp_path, content):
+    reads = tmp_path / "a.fq"
+    reads.write_bytes(b"AAAA")
+    manifest = tmp_path / "fp.json"
+    manifest.write_text(content, encoding="utf-8")
+    with pytest.raises(ValueError, match="fp.json"):
+        compare_fingerprints([str(reads)], str(manifest))
+    assert manifest.read_text(encoding="utf-8") == content
@@ -1,4 +1,11 @@
+import sqlite3
+
+import pytest
+
 from helixsh.provenance_db import (
+    SCHEMA_SQL,
+    SCHEMA_VERSION,
+    ProvenanceSession,
     add_audit_event,
     create_execution,
     finish_execution,
@@ -37,3 +44,85 @@ def test_sqlite_provenance_lifecycle(tmp_path):
     assert bundle["execution"]["status"] == "completed"
     assert bundle["execution"]["exit_code"] == 0
     assert bundle["audit_events"][0]["event_type"] == "execution_started"
+
+
+def _start(session, execution_id="e1"):
+    session.create_execution(
+        execution_id=execution_id,
+        command="nextflow run nf-core/sarek",
+        workflow="nf-core/sarek",
+        agent=None,
+        model=None,
+        status="running",
+        start_time="2026-01-01T00:00:00Z",
+        container_digest=None,
+        input_hash="hash",
+    )
+
+
+def test_session_bulk_inserts_in_one_transaction(tmp_path):
+    db = str(tmp_path / "helixsh.sqlite")
+    init_db(db)
+    with ProvenanceSession(db) as s:
+        _start(s)
+        s.insert_inputs("e1", [(f"s{i}.fastq.gz", f"h{i}", i) for i in range(500)])
+        s.insert_containers("e1", [("nfcore/sarek", "abc", "docker", None)])
+        s.insert_artifacts("e1", [("vcf", "out.vcf.gz", "h"), ("bam", "out.bam", "h2")])
+        s.add_audit_events("e1", [("start", "go"), ("note", "bulk")])
+
+    bundle = get_execution_bundle(db, "e1")
+    assert len(bundle["inputs"]) == 500
+    assert bundle["inputs"][499]["file_path"] == "s499.fastq.gz"
+    assert bundle["containers"][0]["image_name"] == "nfcore/sarek"
+    assert [a["artifact_type"] for a in bundle["artifacts"]] == ["vcf", "bam"]
+    assert [e["event_type"] for e in bundle["audit_events"]] == ["start", "note"]
+
+
+def test_session_rolls_back_on_error(tmp_path):
+    db = str(tmp_path / "helixsh.sqlite")
+    init_db(db)
+    with pytest.raises(ValueError):
+        with ProvenanceSession(db) as s:
+            _start(s)
+            s.insert_input(execution_id="e1", file_path="a.fq", sha256="h", size_bytes=1)
+            s.finish_execution(execution_id="missing", status="failed", end_time="t", output_hash=None, exit_code=1)
+
+    with pytest.raises(ValueError):
+        get_execution_bundle(db, "e1")
+
+
+def test_init_db_enables_wal_and_indexes(tmp_path):
+    db = str(tmp_path / "helixsh.sqlite")
+    init_db(db)
+    conn = sqlite3.connect(db)
+    try:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        plan = " ".join(
+            str(r[-1]) for r in conn.execute("EXPLAIN QUERY PLAN SELECT * FROM inputs WHERE execution_id = 'e1'")
+        )
+        assert "idx_inputs_execution_id" in plan
+    finally:
+        conn.close()
+
+
+def test_init_db_upgrades_unversioned_database_in_place(tmp_path):
+    db = str(tmp_path / "legacy.sqlite")
+    conn = sqlite3.connect(db)
+    conn.executescript(SCHEMA_SQL)
+    conn.execute("INSERT INTO executions (id, command) VALUES ('old', 'nextflow run x')")
+    conn.execute("INSERT INTO inputs (execution_id, file_path, sha256, size_bytes) VALUES ('old', 'a.fq', 'h', 1)")
+    conn.commit()
+    conn.close()
+
+    init_db(db)
+    init_db(db)  # idempotent once current
+
+    conn = sqlite3.connect(db)
+    try:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        names = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {"idx_inputs_sha256", "idx_executions_created_at", "idx_audit_events_execution_id"} <= names
+    finally:
+        conn.close()
+    assert get_execution_bundle(db, "old")["inputs"][0]["file_path"] == "a.fq"
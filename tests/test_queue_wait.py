@@ -0,0 +1,66 @@
+import json
+
+from helixsh import cli
+from helixsh.queue_wait import analyze_queue_wait, recommend_executor
+
+HEADER = "task_id\tname\tstatus\tsubmit\tstart\tcomplete\tduration\trealtime\t%cpu\tpeak_rss\n"
+
+
+def _row(i, name, submit_s, start_s, end_s):
+    ts = lambda s: f"2026-01-01 00:{s // 60:02d}:{s % 60:02d}.000"  # noqa: E731
+    return f"{i}\t{name}\tCOMPLETED\t{ts(submit_s)}\t{ts(start_s)}\t{ts(end_s)}\t1m\t1m\t100\t1 GB\n"
+
+
+def test_queue_wait_per_process_and_bursts(tmp_path):
+    rows = [_row(i, f"CALL ({i})", 0, 120, 600) for i in range(30)]
+    rows.append(_row(99, "MERGE", 600, 605, 700))
+    trace = tmp_path / "trace.txt"
+    trace.write_text(HEADER + "".join(rows), encoding="utf-8")
+
+    report = analyze_queue_wait(str(trace), bucket_s=300)
+    assert report.tasks == 31
+    call = next(p for p in report.processes if p.process == "CALL")
+    assert call.tasks == 30
+    assert call.mean_wait_s == 120
+    assert report.peak_submits_per_sec == 30
+    assert report.peak_in_flight == 30
+    assert report.peak_queued == 30
+    assert [b.submitted for b in report.buckets] == [30, 1]
+    rec = report.recommendation
+    assert rec.submit_rate_limit.endswith("/1min")
+    assert rec.queue_size == 30   # long waits: don't grow the queue past the observed peak
+
+
+def test_recommend_executor_raises_saturated_queue():
+    rec = recommend_executor(peak_in_flight=100, peak_submits_per_sec=5, peak_submits_per_min=100,
+                             p50_wait_s=3, p50_runtime_s=3600)
+    assert rec.queue_size == 150
+    assert rec.submit_rate_limit == "20/1sec"
+    assert rec.poll_interval == "3 min"
+    assert "queueSize = 150" in rec.to_nextflow_config()
+
+
+def test_trace_queue_wait_cli_writes_config(tmp_path, capsys):
+    trace = tmp_path / "trace.txt"
+    trace.write_text(HEADER + _row(1, "A", 0, 10, 70), encoding="utf-8")
+    out = tmp_path / "executor.config"
+    rc = cli.main(["trace-queue-wait", "--file", str(trace), "--config-out", str(out)])
+    assert rc == 0
+    data = json.loads(capsys.readouterr().out)
+    assert data["p50_wait_s"] == 10
+    assert out.read_text().startswith("// Auto-generated by helixsh trace-queue-wait")
+
+
+def test_queue_wait_keys_nf_core_processes_and_suggests_arrays(tmp_path):
+    call = "NFCORE_SAREK:SAREK:BAM_VARIANT_CALLING:GATK4_HAPLOTYPECALLER"
+    rows = [_row(i, f"{call} ({i})", 0, 300, 310) for i in range(25)]
+    rows += [_row(50 + i, f"NFCORE_SAREK:SAREK:FASTQC ({i})", 0, 5, 600) for i in range(5)]
+    trace = tmp_path / "trace.txt"
+    trace.write_text(HEADER + "".join(rows), encoding="utf-8")
+
+    report = analyze_queue_wait(str(trace))
+    assert {p.process for p in report.processes} == {call, "NFCORE_SAREK:SAREK:FASTQC"}
+    assert report.recommendation.job_arrays == {call: 25}
+    config = report.recommendation.to_nextflow_config()
+    assert f"withName: '{call}'" in config and "array = 25" in config
+    assert "withName: 'NFCORE_SAREK'" not in config
@@ -9,3 +9,10 @@ def test_rbac_admin_allowed():
 def test_rbac_auditor_denied_for_run():
     d = check_access("auditor", "run")
     assert d.allowed is False
+
+
+def test_rbac_write_options_need_analyst():
+    assert check_access("auditor", "trace-io").allowed is True
+    assert check_access("auditor", "trace-io", writes_files=True).allowed is False
+    assert check_access("analyst", "trace-io", writes_files=True).allowed is True
+    assert check_access("auditor", "trace-rightsize").allowed is True
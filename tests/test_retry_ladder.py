@@ -0,0 +1,117 @@
+import json
+
+import pytest
+
+from helixsh import cli
+from helixsh.cloud_cost import unit_prices
+from helixsh.retry_ladder import _ladder_cost, optimise_retry_ladders
+
+HEADER = "task_id\tname\tstatus\texit\trealtime\t%cpu\tpeak_rss\tcpus\tmemory\n"
+
+
+def _trace(tmp_path, big_every=10):
+    """20 STAR tasks needing 10 GB; every `big_every`-th needs 40 GB and OOMs first at 16 GB."""
+    rows, tid = [], 0
+    for i in range(20):
+        tid += 1
+        if i % big_every == 0:
+            rows.append(f"{tid}\tSTAR_ALIGN (s{i})\tFAILED\t137\t15m\t400\t16 GB\t8\t16 GB\n")
+            tid += 1
+            rows.append(f"{tid}\tSTAR_ALIGN (s{i})\tCOMPLETED\t0\t1h\t400\t40 GB\t8\t64 GB\n")
+        else:
+            rows.append(f"{tid}\tSTAR_ALIGN (s{i})\tCOMPLETED\t0\t1h\t400\t10 GB\t8\t16 GB\n")
+    rows.append("900\tMULTIQC\tCOMPLETED\t0\t5m\t100\t1 GB\t1\t2 GB\n")
+    trace = tmp_path / "trace.txt"
+    trace.write_text(HEADER + "".join(rows), encoding="utf-8")
+    return str(trace)
+
+
+def test_ladder_cost_counts_failed_attempts():
+    prices = {"cpu": 1.0, "mem": 1024.0}   # $1 per cpu-h, $1 per MB-h
+    # need 30 MB, ladder 10 → 20 → 40: two failures at half runtime, then success.
+    cost, failed, uncovered, top = _ladder_cost([(30, 1.0, 1)], 10, 2.0, 2, prices, 0.5)
+    assert (failed, uncovered, top) == (2, 0, 2)
+    assert cost == pytest.approx(0.5 * (1 + 10) + 0.5 * (1 + 20) + (1 + 40))
+    _, _, uncovered, _ = _ladder_cost([(100, 1.0, 1)], 10, 2.0, 2, prices, 0.5)
+    assert uncovered == 1
+
+
+def test_optimiser_prefers_retrying_rare_large_tasks(tmp_path):
+    report = optimise_retry_ladders([_trace(tmp_path)])
+    assert report.fail_fraction == 0.25
+    (plan,) = report.plans
+    assert plan.process == "STAR_ALIGN"
+    assert plan.oom_attempts == 2
+    assert plan.initial_memory_gb == 11
+    assert plan.uncovered_tasks == 0
+    assert plan.max_retries >= 1
+    assert plan.expected_cost_usd < plan.fixed_max_cost_usd
+    assert any("MULTIQC" in w for w in report.warnings)
+
+    config = report.to_nextflow_config()
+    assert "withName: 'STAR_ALIGN'" in config
+    assert f"memory = {{ 11.GB * ({plan.multiplier:g} ** (task.attempt - 1)) }}" in config
+    assert "errorStrategy =" not in config
+    assert "task.exitStatus in [137] ? 'retry' : 'terminate'" in report.to_nextflow_config(error_strategy=True)
+
+
+def test_optimiser_respects_memory_cap(tmp_path):
+    report = optimise_retry_ladders([_trace(tmp_path)], max_memory_gb=32, fail_fraction=0.5)
+    (plan,) = report.plans
+    assert plan.initial_memory_gb * plan.multiplier ** plan.max_retries <= 32
+    assert plan.uncovered_tasks == 2
+    assert any("exceed the largest reachable" in w for w in report.warnings)
+
+
+def test_optimiser_without_retries_sizes_for_max(tmp_path):
+    report = optimise_retry_ladders([_trace(tmp_path)], max_retries=0)
+    (plan,) = report.plans
+    assert plan.max_retries == 0
+    assert plan.initial_memory_gb == 42
+    assert plan.expected_cost_usd == plan.fixed_max_cost_usd
+    prices = unit_prices()
+    assert plan.expected_cost_usd == pytest.approx(20 * (8 * prices["cpu"] + 42 * prices["mem"]), rel=1e-3)
+
+
+def test_trace_retry_ladder_cli_writes_config(tmp_path, capsys):
+    out = tmp_path / "retry.config"
+    rc = cli.main(["--role", "analyst", "trace-retry-ladder", "--file", _trace(tmp_path), "--out", str(out)])
+    assert rc == 0
+    data = json.loads(capsys.readouterr().out)
+    assert data["plans"][0]["process"] == "STAR_ALIGN"
+    config = out.read_text(encoding="utf-8")
+    assert "maxRetries" in config
+    assert "errorStrategy =" not in config
+
+
+def test_trace_retry_ladder_cli_sets_error_strategy_on_request(tmp_path, capsys):
+    rc = cli.main(["--role", "analyst", "trace-retry-ladder", "--file", _trace(tmp_path), "--set-error-strategy"])
+    assert rc == 0
+    assert "errorStrategy = { task.exitStatus in [137] ? 'retry' : 'terminate' }" in capsys.readouterr().out
+
+
+def test_optimiser_separates_nf_core_processes(tmp_path):
+    star = "NFCORE_RNASEQ:RNASEQ:ALIGN_STAR:STAR_ALIGN"
+    fastqc = "NFCORE_RNASEQ:RNASEQ:FASTQ_QC:FASTQC"
+    rows = [f"{i}\t{star} (S{i})\tCOMPLETED\t0\t1h\t400\t30 GB\t8\t32 GB\n" for i in range(5)]
+    rows += [f"{10 + i}\t{fastqc} (S{i})\tCOMPLETED\t0\t5m\t95\t500 MB\t1\t2 GB\n" for i in range(5)]
+    trace = tmp_path / "trace.txt"
+    trace.write_text(HEADER + "".join(rows), encoding="utf-8")
+
+    report = optimise_retry_ladders([str(trace)], fail_fraction=0.5)
+    by_name = {p.process: p for p in report.plans}
+    assert set(by_name) == {star, fastqc}
+    assert by_name[fastqc].initial_memory_gb == 1
+    assert by_name[star].initial_memory_gb == 32
+    config = report.to_nextflow_config()
+    assert f"withName: '{fastqc}'" in config
+    assert "withName: 'NFCORE_RNASEQ'" not in config
+
+
+def test_cmd_trace_retry_ladder_callable_without_namespace(tmp_path, capsys):
+    rc = cli.cmd_trace_retry_ladder(
+        files=[_trace(tmp_path)], max_retries=2, max_memory_gb=None, fail_fraction=None,
+        provider="aws", instance_family="general", set_error_strategy=False, out=None,
+    )
+    assert rc == 0
+    assert "withName: 'STAR_ALIGN'" in capsys.readouterr().out
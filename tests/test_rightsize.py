@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from helixsh import cli
+from helixsh.rightsize import rightsize_trace
+
+HEADER = "task_id\tname\tstatus\trealtime\t%cpu\tpeak_rss\n"
+
+
+def _trace(tmp_path):
+    rows = [f"{i}\tSTAR_ALIGN (S{i})\tCOMPLETED\t40m\t780\t{20 + i % 3} GB\n" for i in range(40)]
+    rows.append("99\tSTAR_ALIGN (OUTLIER)\tCOMPLETED\t3h\t790\t60 GB\n")
+    rows.append("100\tMULTIQC\tCOMPLETED\t2m\t40\t300 MB\n")
+    trace = tmp_path / "trace.txt"
+    trace.write_text(HEADER + "".join(rows), encoding="utf-8")
+    return str(trace)
+
+
+def test_rightsize_uses_percentile_not_outlier(tmp_path):
+    config = rightsize_trace(_trace(tmp_path), percentile=95, margin=0.2)
+    star = next(e for e in config.entries if e.process_selector == "STAR_ALIGN")
+    assert star.cpus == 8
+    assert star.memory_gb == 27          # ~22 GB * 1.2, not 60 GB * 1.2
+    assert 48 <= star.time_min <= 50     # 40 min * 1.2, within sketch accuracy
+    multiqc = next(e for e in config.entries if e.process_selector == "MULTIQC")
+    assert (multiqc.cpus, multiqc.memory_gb, multiqc.time) == (1, 1, "10.m")
+    rendered = config.to_nextflow_config()
+    assert "withName: 'STAR_ALIGN'" in rendered
+    assert "memory = 27.GB" in rendered
+
+
+def test_rightsize_rejects_bad_percentile(tmp_path):
+    with pytest.raises(ValueError):
+        rightsize_trace(_trace(tmp_path), percentile=0)
+
+
+def test_trace_rightsize_cli_writes_config(tmp_path, capsys):
+    out = tmp_path / "resources.config"
+    rc = cli.main(["trace-rightsize", "--file", _trace(tmp_path), "--min-tasks", "2", "--out", str(out)])
+    assert rc == 0
+    data = json.loads(capsys.readouterr().out)
+    assert data["processes"] == 1
+    assert any("MULTIQC" in w for w in data["warnings"])
+    assert out.read_text().startswith("// Auto-generated by helixsh trace-rightsize")
+
+
+def test_rightsize_separates_nf_core_processes(tmp_path):
+    star = "NFCORE_RNASEQ:RNASEQ:ALIGN_STAR:STAR_ALIGN"
+    fastqc = "NFCORE_RNASEQ:RNASEQ:FASTQ_QC:FASTQC"
+    rows = [f"{i}\t{star} (S{i})\tCOMPLETED\t40m\t780\t30 GB\n" for i in range(5)]
+    rows += [f"{10 + i}\t{fastqc} (S{i})\tCOMPLETED\t5m\t95\t500 MB\n" for i in range(5)]
+    trace = tmp_path / "trace.txt"
+    trace.write_text(HEADER + "".join(rows), encoding="utf-8")
+
+    config = rightsize_trace(str(trace))
+    by_name = {e.process_selector: e for e in config.entries}
+    assert set(by_name) == {star, fastqc}
+    assert (by_name[star].cpus, by_name[fastqc].cpus) == (8, 1)
+    assert by_name[fastqc].memory_gb == 1
+    rendered = config.to_nextflow_config()
+    assert f"withName: '{fastqc}'" in rendered
+    assert "withName: 'NFCORE_RNASEQ'" not in rendered
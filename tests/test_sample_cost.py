@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from helixsh import cli
+from helixsh.cloud_cost import unit_prices
+from helixsh.sample_cost import attribute_samples
+from helixsh.trace import TraceAccumulator, aggregate_trace
+
+HEADER = "task_id\tname\tstatus\trealtime\t%cpu\tpeak_rss\tcpus\tmemory\n"
+
+
+def _trace(tmp_path, name="trace.txt"):
+    rows = []
+    for i in range(1, 11):
+        rows.append(f"{i}\tSTAR_ALIGN (s{i})\tCOMPLETED\t1h\t400\t20 GB\t4\t32 GB\n")
+        rows.append(f"{100 + i}\tSALMON (s{i})\tCOMPLETED\t30m\t100\t2 GB\t1\t4 GB\n")
+    # s10 needs a second, much longer alignment pass.
+    rows.append("200\tSTAR_ALIGN (s10)\tCOMPLETED\t20h\t400\t30 GB\t4\t32 GB\n")
+    rows.append("300\tMULTIQC\tCOMPLETED\t5m\t100\t1 GB\t1\t2 GB\n")
+    trace = tmp_path / name
+    trace.write_text(HEADER + "".join(rows), encoding="utf-8")
+    return str(trace)
+
+
+def test_accumulator_tracks_samples_only_when_asked(tmp_path):
+    path = _trace(tmp_path)
+    assert aggregate_trace(path).samples == {}
+    acc = aggregate_trace(path, track_samples=True)
+    s1 = acc.samples["s1"]
+    assert s1.task_count == 2
+    assert s1.billed_cpu_hours == pytest.approx(4 + 0.5)
+    assert s1.billed_gb_hours == pytest.approx(32 + 2)
+    assert s1.cpu_hours == pytest.approx(4 + 0.5)
+    assert acc.samples[""].task_count == 1
+
+
+def test_sample_accumulators_merge(tmp_path):
+    a = aggregate_trace(_trace(tmp_path, "a.txt"), track_samples=True)
+    b = aggregate_trace(_trace(tmp_path, "b.txt"), track_samples=True)
+    merged = TraceAccumulator(track_samples=True)
+    merged.merge(a)
+    merged.merge(b)
+    assert merged.samples["s10"].task_count == 6
+    assert merged.samples["s10"].max_peak_rss_mb == pytest.approx(30 * 1024)
+
+
+def test_attribute_samples_flags_expensive_sample(tmp_path):
+    report = attribute_samples([_trace(tmp_path)], outlier_factor=5)
+    prices = unit_prices("aws", "general")
+    assert report.samples_count == 10
+    assert report.untagged_tasks == 1
+    top = report.samples[0]
+    assert top.sample == "s10"
+    assert top.outlier and report.outliers == ["s10"]
+    assert report.median_cost_usd == pytest.approx(4.5 * prices["cpu"] + 34 * prices["mem"], rel=1e-3)
+    assert top.wall_hours == pytest.approx(21.5)
+
+
+def test_attribute_samples_rejects_bad_factor(tmp_path):
+    with pytest.raises(ValueError):
+        attribute_samples([_trace(tmp_path)], outlier_factor=1)
+
+
+def test_trace_samples_cli(tmp_path, capsys):
+    rc = cli.main(["trace-samples", "--file", _trace(tmp_path), "--top", "3"])
+    assert rc == 0
+    data = json.loads(capsys.readouterr().out)
+    assert len(data["samples"]) == 3
+    assert data["samples_count"] == 10
+    assert data["outliers"] == ["s10"]
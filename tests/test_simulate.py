@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+from helixsh import cli
+from helixsh.cloud_cost import unit_prices
+from helixsh.resources import estimate_resources
+from helixsh.simulate import (
+    ClusterShape, SimTask, parse_shape, simulate, sweep_shapes, tasks_from_estimate, tasks_from_trace,
+)
+
+
+def _bag(n, cpus=4, memory_gb=8.0, runtime_s=3600.0):
+    return [SimTask(name=f"t{i}", cpus=cpus, memory_gb=memory_gb, runtime_s=runtime_s) for i in range(n)]
+
+
+def test_parse_shape():
+    assert parse_shape("20x16:64") == ClusterShape(20, 16, 64.0)
+    with pytest.raises(ValueError):
+        parse_shape("20 nodes")
+    with pytest.raises(ValueError):
+        parse_shape("0x16:64")
+
+
+def test_simulate_packs_waves():
+    # 8 four-core tasks on 2 x 8-core nodes: two waves of one hour each.
+    result = simulate(_bag(8), ClusterShape(2, 8, 64))
+    assert result.makespan_hours == pytest.approx(2.0)
+    assert result.cpu_utilisation == pytest.approx(1.0)
+    assert result.peak_running == 4
+    assert result.mean_wait_s == pytest.approx(1800)
+    prices = unit_prices()
+    assert result.cost_usd == pytest.approx(2 * 2 * (8 * prices["cpu"] + 64 * prices["mem"]), rel=1e-3)
+
+
+def test_simulate_memory_limits_packing():
+    result = simulate(_bag(4, cpus=1, memory_gb=40), ClusterShape(1, 16, 64))
+    assert result.makespan_hours == pytest.approx(4.0)
+
+
+def test_simulate_backfills_small_tasks():
+    tasks = [SimTask("big", 8, 8, 3600), SimTask("blocker", 4, 4, 7200), SimTask("small", 4, 4, 3600)]
+    result = simulate(tasks, ClusterShape(1, 8, 64), discipline="fifo", release="none")
+    # big runs first, then blocker and small share the node.
+    assert result.makespan_hours == pytest.approx(3.0)
+
+
+def test_ljf_shortens_makespan():
+    tasks = _bag(6, cpus=1, memory_gb=1, runtime_s=600) + [SimTask("long", 1, 1, 3000)]
+    fifo = simulate(tasks, ClusterShape(1, 2, 8), discipline="fifo")
+    ljf = simulate(tasks, ClusterShape(1, 2, 8), discipline="ljf")
+    assert ljf.makespan_hours < fifo.makespan_hours
+
+
+def test_release_offsets_are_respected():
+    tasks = [SimTask("a", 1, 1, 60), SimTask("b", 1, 1, 60, release_s=3540)]
+    assert simulate(tasks, ClusterShape(1, 4, 8)).makespan_hours == pytest.approx(1.0)
+    assert simulate(tasks, ClusterShape(1, 4, 8), release="none").makespan_hours == pytest.approx(60 / 3600, abs=1e-4)
+
+
+def test_sweep_ranks_by_cost_and_flags_oversized():
+    tasks = _bag(16) + [SimTask("huge", 32, 128, 60)]
+    report = sweep_shapes(tasks, [ClusterShape(20, 16, 64), ClusterShape(2, 32, 128)], disciplines=("fifo", "ljf"))
+    assert len(report.results) == 4
+    assert report.results[0].shape == "2x32:128"
+    assert any("20x16:64" in w for w in report.warnings)
+
+
+def test_tasks_from_estimate_and_trace(tmp_path):
+    tasks = tasks_from_estimate(estimate_resources("star", "rnaseq", 3), runtime_hours=2)
+    assert len(tasks) == 3 and tasks[0].cpus == 8 and tasks[0].memory_gb == 40
+
+    trace = tmp_path / "trace.txt"
+    trace.write_text(
+        "task_id\tname\tstatus\tsubmit\trealtime\t%cpu\tpeak_rss\tcpus\tmemory\n"
+        "1\tA (s1)\tCOMPLETED\t1700000000000\t1h\t350\t3 GB\t4\t8 GB\n"
+        "2\tB (s1)\tCOMPLETED\t1700000060000\t30m\t180\t2 GB\t-\t-\n",
+        encoding="utf-8",
+    )
+    a, b = tasks_from_trace(str(trace))
+    assert (a.cpus, a.memory_gb, a.runtime_s, a.release_s) == (4, 8, 3600, 0)
+    assert (b.cpus, b.memory_gb, b.release_s) == (2, 2, 60)
+
+
+def test_cluster_simulate_cli(capsys):
+    rc = cli.main([
+        "cluster-simulate", "--tool", "bwa", "--assay", "wgs", "--samples", "10", "--task-hours", "2",
+        "--shape", "5x16:64", "--shape", "2x64:256",
+    ])
+    assert rc == 0
+    data = json.loads(capsys.readouterr().out)
+    assert data["tasks"] == 10
+    assert {r["shape"] for r in data["results"]} == {"5x16:64", "2x64:256"}
+
+
+def test_cmd_cluster_simulate_callable_without_namespace(capsys):
+    rc = cli.cmd_cluster_simulate(
+        trace=None, tool="bwa", assay="wgs", samples=4, task_hours=1.0, shapes=["2x16:64"],
+        disciplines=["ljf"], release="none", provider="aws", instance_family="general", workers=1,
+    )
+    assert rc == 0
+    data = json.loads(capsys.readouterr().out)
+    assert [r["discipline"] for r in data["results"]] == ["ljf"]
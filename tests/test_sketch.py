@@ -0,0 +1,34 @@
+import pytest
+
+from helixsh.sketch import QuantileSketch
+
+
+def test_sketch_quantiles_within_relative_accuracy():
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    values = list(range(1, 10_001))
+    for v in values:
+        sketch.add(v)
+    assert sketch.count == 10_000
+    assert sketch.quantile(0.5) == pytest.approx(5000, rel=0.02)
+    assert sketch.quantile(0.95) == pytest.approx(9500, rel=0.02)
+    assert sketch.quantile(1.0) == 10_000
+    assert len(sketch.bins) < 1000
+
+
+def test_sketch_merge_is_exact():
+    a, b, whole = QuantileSketch(), QuantileSketch(), QuantileSketch()
+    for v in range(0, 500):
+        (a if v % 2 else b).add(float(v))
+        whole.add(float(v))
+    a.merge(b)
+    assert a == whole
+    assert a.quantiles() == whole.quantiles()
+
+
+def test_sketch_empty_and_invalid():
+    sketch = QuantileSketch()
+    assert sketch.quantile(0.99) == 0.0
+    with pytest.raises(ValueError):
+        QuantileSketch(relative_accuracy=1.5)
+    with pytest.raises(ValueError):
+        sketch.merge(QuantileSketch(relative_accuracy=0.05))
@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from helixsh import cli
+from helixsh.stragglers import find_stragglers
+from helixsh.trace import extract_task_tag
+
+HEADER = "task_id\thash\tname\tstatus\trealtime\t%cpu\tpeak_rss\n"
+
+
+def _trace(tmp_path):
+    rows = [
+        f"{i}\tab/{i:06d}\tGATK_HC (chr{i})\tCOMPLETED\t{600 + (i % 5) * 10}s\t100\t{4 + i % 2} GB\n"
+        for i in range(1, 21)
+    ]
+    rows.append("99\tff/999999\tGATK_HC (chrUn)\tCOMPLETED\t3600s\t100\t5 GB\n")
+    rows.append("100\tee/000001\tMULTIQC\tCOMPLETED\t10000s\t100\t1 GB\n")
+    trace = tmp_path / "trace.txt"
+    trace.write_text(HEADER + "".join(rows), encoding="utf-8")
+    return str(trace)
+
+
+def test_extract_task_tag():
+    assert extract_task_tag("STAR_ALIGN (sample1)") == "sample1"
+    assert extract_task_tag("NFCORE:ALIGN (S1 (lane 2))") == "S1 (lane 2)"
+    assert extract_task_tag("MULTIQC") == ""
+
+
+def test_find_stragglers_flags_slow_shard(tmp_path):
+    report = find_stragglers(_trace(tmp_path))
+    assert report.straggler_count == 1
+    proc = report.processes[0]
+    assert proc.process == "GATK_HC"
+    s = proc.stragglers[0]
+    assert (s.tag, s.hash) == ("chrUn", "ff/999999")
+    assert s.ratio_to_median == pytest.approx(5.8, abs=0.1)
+    assert any("fewer than 5" in w for w in report.warnings)
+
+
+def test_find_stragglers_memory_metric_has_none(tmp_path):
+    report = find_stragglers(_trace(tmp_path), metric="peak_rss_mb")
+    assert report.straggler_count == 0
+
+
+def test_trace_stragglers_cli(tmp_path, capsys):
+    rc = cli.main(["trace-stragglers", "--file", _trace(tmp_path), "--threshold", "5"])
+    assert rc == 0
+    data = json.loads(capsys.readouterr().out)
+    assert data["processes"][0]["stragglers"][0]["tag"] == "chrUn"
+
+
+def test_find_stragglers_uses_full_process_path_as_sibling_group(tmp_path):
+    hc = "NFCORE_SAREK:SAREK:BAM_VARIANT_CALLING:GATK4_HAPLOTYPECALLER"
+    fastqc = "NFCORE_SAREK:SAREK:FASTQC"
+    rows = [f"{i}\tab/{i:06d}\t{hc} (chr{i})\tCOMPLETED\t{3000 + i * 10}s\t100\t4 GB\n" for i in range(1, 11)]
+    rows += [f"{20 + i}\tcd/{i:06d}\t{fastqc} (S{i})\tCOMPLETED\t{60 + i}s\t100\t1 GB\n" for i in range(1, 11)]
+    rows.append(f"99\tff/999999\t{fastqc} (S99)\tCOMPLETED\t600s\t100\t1 GB\n")
+    trace = tmp_path / "trace.txt"
+    trace.write_text(HEADER + "".join(rows), encoding="utf-8")
+
+    report = find_stragglers(str(trace))
+    # Pooled with the long HaplotypeCaller shards, the 600 s FASTQC task looked normal.
+    assert [p.process for p in report.processes] == [fastqc]
+    assert [s.tag for s in report.processes[0].stragglers] == ["S99"]
+
+
+def test_find_stragglers_tolerates_trace_growing_between_passes(tmp_path, monkeypatch):
+    from helixsh import stragglers
+
+    path = _trace(tmp_path)
+    real = stragglers.iter_trace_tasks
+    calls = []
+
+    def growing(p, warnings=None):
+        calls.append(p)
+        yield from real(p, warnings)
+        if len(calls) > 1:
+            with open(p, "a", encoding="utf-8") as fh:
+                fh.write("101\tdd/000001\tNEW_PROC (x)\tCOMPLETED\t5s\t100\t1 GB\n")
+            yield from list(real(p))[-1:]
+            raise EOFError("Compressed file ended before the end-of-stream marker was reached")
+
+    monkeypatch.setattr(stragglers, "iter_trace_tasks", growing)
+    report = find_stragglers(path)
+    assert report.straggler_count == 1
+    assert report.processes[0].stragglers[0].hash == "ff/999999"
+    assert any("Second pass stopped early" in w for w in report.warnings)
@@ -0,0 +1,92 @@
+import csv
+import json
+
+from helixsh import cli
+from helixsh.timeline import build_timeline, write_timeline
+
+TIMED_TRACE = """\
+task_id\thash\tname\tstatus\texit\tsubmit\tstart\tcomplete\tduration\trealtime\t%cpu\tpeak_rss
+1\taa/111\tALIGN (S1)\tCOMPLETED\t0\t2026-01-01 00:00:00.000\t2026-01-01 00:00:00.000\t2026-01-01 00:01:40.000\t1m 40s\t1m 40s\t400\t4 GB
+2\tbb/222\tALIGN (S2)\tCOMPLETED\t0\t2026-01-01 00:00:00.000\t2026-01-01 00:00:50.000\t2026-01-01 00:02:30.000\t2m 30s\t1m 40s\t400\t8 GB
+3\tcc/333\tMERGE\tCOMPLETED\t0\t2026-01-01 00:02:30.000\t2026-01-01 00:02:30.000\t2026-01-01 00:03:20.000\t50s\t50s\t100\t1 GB
+"""
+
+
+def _write(tmp_path, text=TIMED_TRACE):
+    trace = tmp_path / "trace.txt"
+    trace.write_text(text, encoding="utf-8")
+    return str(trace)
+
+
+def test_timeline_peaks_and_averages(tmp_path):
+    tl = build_timeline(_write(tmp_path))
+    assert tl.tasks == 3
+    assert tl.makespan_s == 200
+    assert tl.peak_tasks == 2
+    assert tl.peak_cpu_cores == 8
+    assert tl.peak_rss_gb == 12
+    # Back-to-back tasks at t=150s must not be counted as overlapping.
+    assert [p.running_tasks for p in tl.points] == [1, 2, 1, 1, 0]
+    # (4*50 + 8*50 + 4*50 + 1*50) core-seconds over 200 s
+    assert tl.avg_cpu_cores == 4.25
+
+
+def test_timeline_derives_start_from_submit_and_durations(tmp_path):
+    text = "\n".join(
+        "\t".join(cols) for cols in (
+            ["task_id", "name", "status", "submit", "duration", "realtime", "%cpu", "peak_rss"],
+            ["1", "A", "COMPLETED", "2026-01-01 00:00:00.000", "2m", "1m", "100", "1 GB"],
+            ["2", "B", "COMPLETED", "2026-01-01 00:00:30.000", "1m", "1m", "100", "1 GB"],
+        )
+    ) + "\n"
+    tl = build_timeline(_write(tmp_path, text))
+    assert tl.peak_tasks == 2
+    assert tl.makespan_s == 90
+
+
+def test_timeline_write_csv_and_json(tmp_path):
+    tl = build_timeline(_write(tmp_path), bucket_s=60)
+    assert [p.offset_s for p in tl.points] == [0, 60, 120, 180]
+    assert tl.points[1].running_tasks == 2
+    write_timeline(tl, str(tmp_path / "tl.csv"))
+    write_timeline(tl, str(tmp_path / "tl.json"))
+    rows = list(csv.DictReader((tmp_path / "tl.csv").open()))
+    assert len(rows) == 4
+    assert len(json.loads((tmp_path / "tl.json").read_text())) == 4
+
+
+def test_trace_timeline_cli_without_timestamps(tmp_path, capsys):
+    text = "task_id\tname\tstatus\n1\tA\tCOMPLETED\n"
+    rc = cli.main(["trace-timeline", "--file", _write(tmp_path, text)])
+    assert rc == 2
+    data = json.loads(capsys.readouterr().out)
+    assert data["skipped_tasks"] == 1
+    assert data["warnings"]
+
+
+def test_bad_timestamp_is_missing_not_dropped(tmp_path):
+    from helixsh.trace import parse_trace
+
+    bad = TIMED_TRACE.replace("2026-01-01 00:02:30.000\t2026-01-01 00:02:30.000", "not-a-time\t2026-01-01 00:02:30.000")
+    path = _write(tmp_path, bad)
+
+    summary = parse_trace(path)
+    assert summary.total_tasks == 3
+    assert any("Unparseable submit timestamp in 1 row(s)" in w and "'not-a-time'" in w for w in summary.warnings)
+    assert not any("Could not parse trace row" in w for w in summary.warnings)
+
+    tl = build_timeline(path)
+    assert tl.tasks == 3
+    assert any("not-a-time" in w for w in tl.warnings)
+
+
+def test_bad_timestamp_warnings_are_one_per_column(tmp_path):
+    from helixsh.trace import parse_trace
+
+    header, *rows = TIMED_TRACE.splitlines(keepends=True)
+    body = "".join(r.replace("2026-01-01", "garbage") for r in rows) * 200
+    summary = parse_trace(_write(tmp_path, header + body))
+    assert summary.total_tasks == 600
+    stamp_warnings = [w for w in summary.warnings if w.startswith("Unparseable")]
+    assert len(stamp_warnings) == 3
+    assert all("in 600 row(s)" in w and "garbage" in w for w in stamp_warnings)
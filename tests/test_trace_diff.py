@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from helixsh import cli
+from helixsh.sketch import QuantileSketch
+from helixsh.trace_diff import diff_traces, mann_whitney_sketch
+
+HEADER = "task_id\tname\tstatus\trealtime\t%cpu\tpeak_rss\n"
+
+
+def _trace(path, align_s, align_gb, qc_s):
+    rows = []
+    for i in range(50):
+        rows.append(f"{i}\tALIGN (S{i})\tCOMPLETED\t{align_s + i % 7}s\t400\t{align_gb + (i % 5) / 10} GB\n")
+        rows.append(f"{i + 100}\tQC (S{i})\tCOMPLETED\t{qc_s + i % 3}s\t100\t1 GB\n")
+    path.write_text(HEADER + "".join(rows), encoding="utf-8")
+    return str(path)
+
+
+def test_mann_whitney_sketch_identical_and_shifted():
+    a, b, c = QuantileSketch(), QuantileSketch(), QuantileSketch()
+    for v in range(1, 101):
+        a.add(v)
+        b.add(v)
+        c.add(v * 2)
+    delta, p = mann_whitney_sketch(a, b)
+    assert delta == pytest.approx(0.0)
+    assert p == pytest.approx(1.0)
+    delta, p = mann_whitney_sketch(a, c)
+    assert delta > 0.3
+    assert p < 1e-6
+
+
+def test_diff_traces_flags_regression_and_improvement(tmp_path):
+    old = _trace(tmp_path / "old.txt", align_s=600, align_gb=10, qc_s=60)
+    new = _trace(tmp_path / "new.txt", align_s=800, align_gb=10, qc_s=30)
+    report = diff_traces(old, new, workers=1)
+    assert report.regressions == 1
+    assert report.improvements == 1
+    first = report.diffs[0]
+    assert (first.process, first.metric, first.verdict) == ("ALIGN", "realtime_s", "regression")
+    assert first.median_change_pct == pytest.approx(33, abs=2)
+    rss = next(d for d in report.diffs if d.process == "ALIGN" and d.metric == "peak_rss_mb")
+    assert rss.verdict == "unchanged"
+
+
+def test_trace_diff_cli_exit_code(tmp_path, capsys):
+    old = _trace(tmp_path / "old.txt", align_s=600, align_gb=10, qc_s=60)
+    assert cli.main(["trace-diff", "--old", old, "--new", old]) == 0
+    capsys.readouterr()
+    new = _trace(tmp_path / "new.txt", align_s=600, align_gb=16, qc_s=60)
+    assert cli.main(["trace-diff", "--old", old, "--new", new, "--metric", "peak_rss_mb"]) == 2
+    data = json.loads(capsys.readouterr().out)
+    assert data["diffs"][0]["verdict"] == "regression"
+    assert {d["metric"] for d in data["diffs"]} == {"peak_rss_mb"}
+
+
+def test_diff_traces_compares_nf_core_processes_separately(tmp_path):
+    def qualify(path):
+        text = path.read_text(encoding="utf-8")
+        path.write_text(text.replace("\tALIGN (", "\tNFCORE_X:X:ALIGN (").replace("\tQC (", "\tNFCORE_X:X:QC ("),
+                        encoding="utf-8")
+        return str(path)
+
+    _trace(tmp_path / "old.txt", align_s=600, align_gb=10, qc_s=60)
+    _trace(tmp_path / "new.txt", align_s=800, align_gb=10, qc_s=30)
+    old = qualify(tmp_path / "old.txt")
+    with (tmp_path / "new.txt").open("a", encoding="utf-8") as fh:
+        fh.write("999\tNFCORE_X:X:MULTIQC\tCOMPLETED\t30s\t100\t1 GB\n")
+    new = qualify(tmp_path / "new.txt")
+
+    report = diff_traces(old, new, workers=1)
+    verdicts = {(d.process, d.metric): d.verdict for d in report.diffs}
+    assert verdicts[("NFCORE_X:X:ALIGN", "realtime_s")] == "regression"
+    assert verdicts[("NFCORE_X:X:QC", "realtime_s")] == "improvement"
+    assert report.added_processes == ["NFCORE_X:X:MULTIQC"]
+    assert report.removed_processes == []
@@ -0,0 +1,89 @@
+import json
+import pickle
+
+import pytest
+
+from helixsh import cli
+from helixsh.trace import (
+    Aggregator, MultiAggregator, group_trace, leaf_process_name, subworkflow_path, task_path,
+)
+
+HEADER = "task_id\tname\tstatus\tstart\trealtime\t%cpu\tpeak_rss\n"
+ROWS = [
+    "1\tNFCORE_RNASEQ:RNASEQ:ALIGN_STAR:STAR_ALIGN (s1)\tCOMPLETED\t2026-01-01 10:05:00\t1h\t400\t30 GB\n",
+    "2\tNFCORE_RNASEQ:RNASEQ:ALIGN_STAR:STAR_ALIGN (s2)\tFAILED\t2026-01-01 10:10:00\t30m\t400\t32 GB\n",
+    "3\tNFCORE_RNASEQ:RNASEQ:ALIGN_STAR:SAMTOOLS_SORT (s1)\tCOMPLETED\t2026-01-01 11:00:00\t10m\t100\t2 GB\n",
+    "4\tNFCORE_RNASEQ:RNASEQ:FASTQC (s1)\tCOMPLETED\t2026-01-01 09:59:59\t5m\t100\t1 GB\n",
+    "5\tMULTIQC\tCOMPLETED\t2026-01-01 12:00:00\t1m\t100\t1 GB\n",
+]
+
+
+def _trace(tmp_path, rows=ROWS):
+    trace = tmp_path / "trace.txt"
+    trace.write_text(HEADER + "".join(rows), encoding="utf-8")
+    return str(trace)
+
+
+def test_name_helpers():
+    name = "NFCORE_RNASEQ:RNASEQ:ALIGN_STAR:STAR_ALIGN (s1)"
+    assert task_path(name) == "NFCORE_RNASEQ:RNASEQ:ALIGN_STAR:STAR_ALIGN"
+    assert leaf_process_name(name) == "STAR_ALIGN"
+    assert subworkflow_path(name) == "NFCORE_RNASEQ:RNASEQ:ALIGN_STAR"
+    assert subworkflow_path("MULTIQC") == ""
+
+
+def test_aggregator_parse_and_validation():
+    assert Aggregator.parse("sum:cpu_hours") == Aggregator("sum", "cpu_hours")
+    assert Aggregator.parse("count").label == "count"
+    with pytest.raises(ValueError):
+        Aggregator.parse("mean:cpu_hours")
+    with pytest.raises(ValueError):
+        Aggregator.parse("max:bogus")
+    with pytest.raises(ValueError):
+        MultiAggregator.from_specs([["nope"]], ["count"])
+
+
+def test_group_trace_many_views_one_pass(tmp_path):
+    multi = group_trace(
+        _trace(tmp_path),
+        [["leaf"], ["subworkflow"], ["leaf", "sample"], ["status"], ["hour"]],
+        ["count", "sum:cpu_hours", "max:peak_rss_mb", "sketch:realtime_s", "sum:failed"],
+    )
+    assert multi.total_tasks == 5
+    views = multi.results()
+
+    leaf = {r["leaf"]: r for r in views["leaf"]}
+    assert set(leaf) == {"STAR_ALIGN", "SAMTOOLS_SORT", "FASTQC", "MULTIQC"}
+    star = leaf["STAR_ALIGN"]
+    assert star["count"] == 2
+    assert star["sum_cpu_hours"] == pytest.approx(6.0)
+    assert star["max_peak_rss_mb"] == pytest.approx(32 * 1024)
+    assert star["sum_failed"] == 1
+    assert star["sketch_realtime_s"]["p50"] == pytest.approx(1800, rel=0.02)
+
+    sub = {r["subworkflow"]: r["count"] for r in views["subworkflow"]}
+    assert sub == {"": 1, "NFCORE_RNASEQ:RNASEQ": 1, "NFCORE_RNASEQ:RNASEQ:ALIGN_STAR": 3}
+    assert {(r["leaf"], r["sample"]) for r in views["leaf,sample"]} >= {("STAR_ALIGN", "s1"), ("STAR_ALIGN", "s2")}
+    assert {r["status"]: r["count"] for r in views["status"]} == {"COMPLETED": 4, "FAILED": 1}
+    hours = {r["hour"]: r["count"] for r in views["hour"]}
+    assert hours == {
+        "2026-01-01T09:00Z": 1, "2026-01-01T10:00Z": 2, "2026-01-01T11:00Z": 1, "2026-01-01T12:00Z": 1,
+    }
+
+
+def test_group_views_merge_and_pickle(tmp_path):
+    a = group_trace(_trace(tmp_path), [["leaf"]], ["count", "max:peak_rss_mb", "sketch:realtime_s"])
+    b = pickle.loads(pickle.dumps(a))
+    a.merge(b)
+    rows = {r["leaf"]: r for r in a.results()["leaf"]}
+    assert a.total_tasks == 10
+    assert rows["STAR_ALIGN"]["count"] == 4
+    assert rows["STAR_ALIGN"]["max_peak_rss_mb"] == pytest.approx(32 * 1024)
+
+
+def test_trace_groupby_cli(tmp_path, capsys):
+    rc = cli.main(["trace-groupby", "--file", _trace(tmp_path), "--by", "leaf", "--by", "path,status"])
+    assert rc == 0
+    data = json.loads(capsys.readouterr().out)
+    assert set(data["views"]) == {"leaf", "path,status"}
+    assert "sketch_realtime_s" in data["views"]["leaf"][0]
@@ -0,0 +1,64 @@
+import gzip
+import json
+
+import pytest
+
+from helixsh import cli
+from helixsh.waste import analyze_waste
+
+WASTE_TRACE = """\
+task_id\tname\tstatus\trealtime\t%cpu\tpeak_rss\tcpus\tmemory\ttime
+1\tBWA_MEM (S1)\tCOMPLETED\t1h\t1600\t10 GB\t16\t32 GB\t4h
+2\tFASTQC (S1)\tCOMPLETED\t1h\t100\t1 GB\t8\t64 GB\t2h
+3\tMULTIQC\tCOMPLETED\t10m\t100\t1 GB\t\t\t
+"""
+
+
+def test_waste_ranks_over_requesting_process_first(tmp_path):
+    trace = tmp_path / "trace.txt"
+    trace.write_text(WASTE_TRACE, encoding="utf-8")
+    report = analyze_waste([str(trace)], provider="aws", instance_family="general")
+    assert [p.process for p in report.processes] == ["FASTQC", "BWA_MEM"]
+    fastqc = report.processes[0]
+    assert fastqc.idle_cpu_hours == 7
+    assert fastqc.idle_gb_hours == 63
+    assert fastqc.wasted_usd == pytest.approx(7 * 0.048 + 63 * 0.006)
+    assert fastqc.time_limit_use == 0.5
+    assert report.processes[1].cpu_efficiency == 1.0
+    assert report.runs[0].tasks_without_requests == 1
+    assert report.total_wasted_usd == pytest.approx(7 * 0.048 + 63 * 0.006 + 22 * 0.006)
+
+
+def test_trace_waste_cli_uses_provider_pricing(tmp_path, capsys):
+    trace = tmp_path / "trace.txt"
+    trace.write_text(WASTE_TRACE, encoding="utf-8")
+    rc = cli.main(["trace-waste", "--file", str(trace), "--provider", "gcp", "--top", "1"])
+    assert rc == 0
+    data = json.loads(capsys.readouterr().out)
+    assert data["price_per_cpu_hour"] == 0.0475
+    assert len(data["processes"]) == 1
+
+
+def test_waste_skips_corrupt_run_consistently(tmp_path):
+    good = tmp_path / "run1.txt"
+    good.write_text(WASTE_TRACE, encoding="utf-8")
+    # A truncated gzip: valid rows are decoded before the stream ends early.
+    rows = "".join(f"{i}\tFASTQC (S{i})\tCOMPLETED\t1h\t100\t1 GB\t8\t64 GB\t2h\n" for i in range(5000))
+    data = gzip.compress((WASTE_TRACE + rows).encode())
+    corrupt = tmp_path / "run2.txt.gz"
+    corrupt.write_bytes(data[: len(data) // 2])
+
+    report = analyze_waste([str(good), str(corrupt)])
+    assert len(report.runs) == 1
+    assert sum(p.tasks for p in report.processes) == report.runs[0].tasks == 2
+    assert report.total_wasted_usd == pytest.approx(report.runs[0].wasted_usd)
+    assert any("run2.txt.gz" in w and "skipped" in w for w in report.warnings)
+
+
+def test_waste_ranks_nf_core_processes_separately(tmp_path):
+    qualified = WASTE_TRACE.replace("\tBWA_MEM (", "\tNFCORE_SAREK:SAREK:FASTQ_ALIGN:BWA_MEM (").replace(
+        "\tFASTQC (", "\tNFCORE_SAREK:SAREK:FASTQC (")
+    trace = tmp_path / "trace.txt"
+    trace.write_text(qualified, encoding="utf-8")
+    report = analyze_waste([str(trace)])
+    assert [p.process for p in report.processes] == ["NFCORE_SAREK:SAREK:FASTQC", "NFCORE_SAREK:SAREK:FASTQ_ALIGN:BWA_MEM"]
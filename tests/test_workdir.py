@@ -0,0 +1,98 @@
+import json
+import os
+
+from helixsh import cli
+from helixsh.trace import parse_trace
+from helixsh.workdir import parse_command_trace, read_task_dir, rebuild_trace
+
+COMMAND_TRACE = """nextflow.trace/v2
+realtime=3600000
+%cpu=3985
+rchar=1048576
+wchar=2097152
+syscr=10
+syscw=20
+read_bytes=0
+write_bytes=4096
+%mem=12
+vmem=1000
+rss=900
+peak_vmem=8388608
+peak_rss=4194304
+vol_ctxt=100
+inv_ctxt=5
+"""
+
+
+def _task(work, prefix, tail, name, t0, exit_code="0", trace=True, begun=True):
+    d = work / prefix / tail
+    d.mkdir(parents=True)
+    run = d / ".command.run"
+    run.write_text(f"#!/bin/bash\n### ---\n### name: '{name}'\n", encoding="utf-8")
+    os.utime(run, (t0, t0))
+    if begun:
+        begin = d / ".command.begin"
+        begin.touch()
+        os.utime(begin, (t0 + 60, t0 + 60))
+    if exit_code is not None:
+        ec = d / ".exitcode"
+        ec.write_text(exit_code, encoding="utf-8")
+        os.utime(ec, (t0 + 3660, t0 + 3660))
+    if trace:
+        (d / ".command.trace").write_text(COMMAND_TRACE, encoding="utf-8")
+    return d
+
+
+def _work(tmp_path):
+    work = tmp_path / "work"
+    t0 = 1_700_000_000
+    _task(work, "ab", "123456789abcdef", "NFCORE:RNASEQ:STAR_ALIGN (s1)", t0)
+    _task(work, "ab", "fedcba987654321", "NFCORE:RNASEQ:STAR_ALIGN (s2)", t0, exit_code="137")
+    _task(work, "0c", "aaaaaaaaaaaaaaa", "NFCORE:RNASEQ:FASTQC (s1)", t0 + 10, exit_code=None, trace=False)
+    _task(work, "0c", "bbbbbbbbbbbbbbb", "NFCORE:RNASEQ:MULTIQC", t0 + 20, exit_code=None, trace=False, begun=False)
+    (work / "stage-1234").mkdir()
+    return work
+
+
+def test_parse_command_trace_units():
+    row = parse_command_trace(COMMAND_TRACE)
+    assert row["%cpu"] == "398.5"
+    assert row["peak_rss"] == str(4194304 * 1024)
+    assert row["realtime"] == "3600000"
+    assert row["inv_ctxt"] == "5"
+
+
+def test_read_task_dir(tmp_path):
+    d = _work(tmp_path) / "ab" / "123456789abcdef"
+    row = read_task_dir(str(d))
+    assert row["hash"] == "ab/123456"
+    assert row["name"] == "NFCORE:RNASEQ:STAR_ALIGN (s1)"
+    assert (row["status"], row["exit"]) == ("COMPLETED", "0")
+    assert int(row["complete"]) - int(row["submit"]) == 3_660_000
+
+
+def test_rebuild_trace_summary_and_output(tmp_path):
+    out = tmp_path / "rebuilt" / "trace.txt"
+    scan = rebuild_trace(str(_work(tmp_path)), workers=4, out=str(out))
+    assert (scan.task_dirs, scan.rows, scan.not_started, scan.unfinished) == (4, 3, 1, 1)
+    assert scan.summary.total_tasks == 3
+    assert scan.summary.failed_tasks == 2
+    assert any("ABORTED" in w for w in scan.warnings)
+
+    rebuilt = parse_trace(str(out))
+    assert rebuilt.total_tasks == 3
+    (proc,) = rebuilt.processes
+    assert proc.max_peak_rss_mb == 4096
+
+
+def test_rebuild_trace_missing_dir(tmp_path):
+    scan = rebuild_trace(str(tmp_path / "nope"))
+    assert scan.summary is None and "not found" in scan.warnings[0]
+
+
+def test_trace_summary_work_dir_cli(tmp_path, capsys):
+    rc = cli.main(["trace-summary", "--work-dir", str(_work(tmp_path)), "--workers", "2"])
+    assert rc == 2  # run has failed tasks
+    data = json.loads(capsys.readouterr().out)
+    assert data["total_tasks"] == 3
+    assert data["not_started"] == 1